@@ -0,0 +1,6 @@
+import os
+
+
+def app_data_dir() -> str:
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ProgramMoverPro")
@@ -0,0 +1,81 @@
+"""Copy benchmark: legacy pre-scan + recursive copy2 vs CopyEngine.
+
+Run it on tmpfs to measure the engine rather than the disk:
+
+    python -m benchmarks.bench_copy --base-dir /dev/shm --files 20000 --large 8
+"""
+import argparse
+import os
+import shutil
+
+from benchmarks.synthetic import build_install_tree, temp_tree_base, timed
+from copy_engine import CopyEngine
+
+
+def legacy_pre_scan(src_path):
+    file_count = 0
+    for item in os.listdir(src_path):
+        item_path = os.path.join(src_path, item)
+        if os.path.isfile(item_path):
+            file_count += 1
+        elif os.path.isdir(item_path):
+            file_count += legacy_pre_scan(item_path)
+    return file_count
+
+
+def legacy_copy(src, dst):
+    os.makedirs(dst, exist_ok=True)
+    for item in os.listdir(src):
+        s = os.path.join(src, item)
+        d = os.path.join(dst, item)
+        if os.path.isdir(s):
+            legacy_copy(s, d)
+        elif not os.path.exists(d) or os.path.getsize(s) != os.path.getsize(d):
+            shutil.copy2(s, d)
+
+
+def add_large_files(root, count, size_mb):
+    chunk = os.urandom(1024 * 1024)
+    for i in range(count):
+        with open(os.path.join(root, f"large{i}.pak"), "wb") as f:
+            for _ in range(size_mb):
+                f.write(chunk)
+    return count * size_mb * 1024 * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20000, help="small files")
+    parser.add_argument("--large", type=int, default=4, help="large files")
+    parser.add_argument("--large-mb", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--base-dir", default="/dev/shm" if os.path.isdir("/dev/shm") else None)
+    args = parser.parse_args()
+
+    with temp_tree_base(base_dir=args.base_dir) as base:
+        src = os.path.join(base, "src")
+        total = build_install_tree(src, args.files, max_size=8 * 1024)
+        total += add_large_files(src, args.large, args.large_mb)
+        files = args.files + args.large
+        mb = total / (1024 * 1024)
+        print(f"tree: {files} files, {mb:.1f} MB under {base}")
+
+        timings = {}
+        with timed("legacy", timings):
+            legacy_pre_scan(src)
+            legacy_copy(src, os.path.join(base, "legacy"))
+        shutil.rmtree(os.path.join(base, "legacy"))
+        t = timings["legacy"]
+        print(f"{'legacy':>16}: {t:.2f}s  {files / t:8.0f} files/s  {mb / t:7.1f} MB/s")
+
+        for workers in args.workers:
+            dst = os.path.join(base, f"engine{workers}")
+            stats = CopyEngine(max_workers=workers).copy_tree(src, dst)
+            assert stats.files_copied == files and not stats.errors, stats
+            shutil.rmtree(dst)
+            print(f"{f'CopyEngine x{workers}':>16}: {stats.elapsed:.2f}s  {stats.files_per_second:8.0f} files/s  "
+                  f"{stats.mb_per_second:7.1f} MB/s  ({t / stats.elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
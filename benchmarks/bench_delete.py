@@ -0,0 +1,58 @@
+"""Delete benchmark: legacy os.walk(topdown=False) list + per-item delete vs DeleteEngine.
+
+Each run deletes a fresh copy of the same synthetic install tree:
+
+    python -m benchmarks.bench_delete --base-dir /dev/shm --files 20000
+"""
+import argparse
+import os
+import shutil
+
+from benchmarks.synthetic import build_install_tree, temp_tree_base, timed
+from delete_engine import DeleteEngine
+
+
+def legacy_delete(path):
+    all_items_to_delete = []
+    for root, dirs, files in os.walk(path, topdown=False):
+        for f_name in files: all_items_to_delete.append(os.path.join(root, f_name))
+        for d_name in dirs: all_items_to_delete.append(os.path.join(root, d_name))
+    all_items_to_delete.append(path)
+    for item_path in all_items_to_delete:
+        if os.path.isfile(item_path) or os.path.islink(item_path):
+            os.remove(item_path)
+        elif os.path.isdir(item_path):
+            os.rmdir(item_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--base-dir", default="/dev/shm" if os.path.isdir("/dev/shm") else None)
+    args = parser.parse_args()
+
+    with temp_tree_base(base_dir=args.base_dir) as base:
+        template = os.path.join(base, "template")
+        build_install_tree(template, args.files, max_size=1024)
+        print(f"tree: {args.files} files under {base}")
+
+        target = os.path.join(base, "target")
+        timings = {}
+        shutil.copytree(template, target)
+        with timed("legacy", timings):
+            legacy_delete(target)
+        assert not os.path.exists(target)
+        t = timings["legacy"]
+        print(f"{'legacy':>18}: {t:.2f}s  {args.files / t:8.0f} files/s")
+
+        for workers in args.workers:
+            shutil.copytree(template, target)
+            report = DeleteEngine(max_workers=workers).delete_tree(target)
+            assert report.ok and not os.path.exists(target), report.failures[:5]
+            print(f"{f'DeleteEngine x{workers}':>18}: {report.elapsed:.2f}s  {report.files_deleted / report.elapsed:8.0f} files/s  "
+                  f"({t / report.elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Memory benchmark: list of absolute path strings vs FileManifest.
+
+Builds an in-memory directory manifest shaped like a large install (no disk
+access) and measures the heap held by each representation with tracemalloc.
+
+    python -m benchmarks.bench_file_manifest --files 1000000
+"""
+import argparse
+import gc
+import os
+import random
+import time
+import tracemalloc
+
+from file_manifest import FileManifest
+
+
+def synthetic_dirs(files: int, files_per_dir: int = 40, max_depth: int = 5, seed: int = 0):
+    rng = random.Random(seed)
+    dirs = {"": [0, {}, []]}
+    rel_dirs = [""]
+    parents = [""]
+    for i in range(files):
+        if i % files_per_dir == 0:
+            parent = rng.choice(parents[-50:])
+            name = f"Component_{len(rel_dirs):05d}"
+            rel = os.path.join(parent, name) if parent else name
+            dirs[parent][2].append(name)
+            dirs[rel] = [0, {}, []]
+            rel_dirs.append(rel)
+            if rel.count(os.sep) < max_depth - 1: parents.append(rel)
+        dirs[rel_dirs[-1]][1][f"asset_{i:07d}.{rng.choice(['dll', 'pak', 'json', 'png'])}"] = rng.randint(0, 1 << 20)
+    return dirs
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - start
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--root", default=os.path.join("C:\\", "Program Files", "Example Studio", "Example Game"))
+    args = parser.parse_args()
+
+    dirs = synthetic_dirs(args.files)
+    root = args.root
+
+    def legacy_list():
+        return [os.path.join(root, rel, name) if rel else os.path.join(root, name)
+                for rel, (_mtime, own, _subdirs) in dirs.items() for name in own]
+
+    paths, list_bytes, list_time = measure(legacy_list)
+    manifest, manifest_bytes, manifest_time = measure(lambda: FileManifest.from_dirs(root, dirs))
+    assert len(paths) == len(manifest)
+
+    start = time.perf_counter()
+    page = manifest.page(len(manifest) // 2, 100)
+    page_time = time.perf_counter() - start
+    assert len(page) == min(100, len(manifest))
+
+    mib = 1024 * 1024
+    print(f"files: {len(manifest)} in {manifest.dir_count} directories")
+    print(f"{'list[str]':>14}: {list_bytes / mib:8.1f} MiB  built in {list_time:.2f}s")
+    print(f"{'FileManifest':>14}: {manifest_bytes / mib:8.1f} MiB  built in {manifest_time:.2f}s"
+          f"  ({list_bytes / max(manifest_bytes, 1):.1f}x smaller)")
+    print(f"{'page of 100':>14}: {page_time * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
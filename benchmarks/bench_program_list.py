@@ -0,0 +1,179 @@
+"""Program list benchmark: rebuilding the Treeview vs the virtual list.
+
+Types a query one key at a time and deletes it again, timing each
+keystroke the way the old filter_programs did it (delete every row,
+insert every match) and through VirtualTreeview (filter the model, diff
+one screenful of rows). Then sorts by size both ways. The Treeview is a
+stand-in that spends --op-us on every widget call, roughly what a Tk
+round trip costs, and counts the calls.
+
+    python -m benchmarks.bench_program_list --programs 10000 --op-us 30
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.synthetic import build_program_infos, timed
+from program_list import COLUMNS, KEYSTROKE_BUDGET_MS, ProgramListModel, VirtualTreeview, row_values
+
+
+SIZE_MULTIPLIERS = {'B': 1, 'KB': 1024, 'MB': 1024**2, 'GB': 1024**3, 'TB': 1024**4, 'PB': 1024**5}
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class FakeTreeview:
+    """Just enough of ttk.Treeview, with a fixed cost per call."""
+
+    def __init__(self, op_s):
+        self.op_s = op_s
+        self.calls = 0
+        self._rows = {}
+        self._order = []
+        self._selection = []
+
+    def _op(self):
+        self.calls += 1
+        if self.op_s:
+            busy_wait(self.op_s)
+
+    def bind(self, sequence, func): pass
+    def after(self, ms, func, *args):
+        time.sleep(ms / 1000)
+        func(*args)
+    def focus(self): return ""
+    def bbox(self, iid): return (0, 25, 800, 20)
+
+    def get_children(self, parent=""):
+        self._op()
+        return tuple(self._order)
+
+    def insert(self, parent, index, iid, values):
+        self._op()
+        self._rows[iid] = tuple(values)
+        self._order.insert(len(self._order) if index == "end" else index, iid)
+
+    def delete(self, *iids):
+        self._op()
+        for iid in iids:
+            del self._rows[iid]
+            self._order.remove(iid)
+
+    def move(self, iid, parent, index):
+        self._op()
+        self._order.remove(iid)
+        self._order.insert(index, iid)
+
+    def item(self, iid, values):
+        self._op()
+        self._rows[iid] = tuple(values)
+
+    def set(self, iid, column):
+        self._op()
+        return self._rows[iid][COLUMNS.index(column)]
+
+    def selection(self):
+        self._op()
+        return tuple(self._selection)
+
+    def selection_set(self, items):
+        self._op()
+        self._selection = list(items)
+
+
+class FakeScrollbar:
+    def configure(self, **kwargs): pass
+    def set(self, first, last): pass
+
+
+def legacy_filter(tree, programs, search_text):
+    search_text = search_text.lower()
+    for item in tree.get_children(): tree.delete(item)
+    for name, info in programs.items():
+        if ProgramListModel.matches(info, search_text):
+            tree.insert("", "end", iid=name, values=row_values(info))
+
+
+def legacy_size_key(size_text):
+    parts = size_text.split(' ')
+    try:
+        return float(parts[0]) * SIZE_MULTIPLIERS.get((parts[1] if len(parts) > 1 else 'B').upper(), 0)
+    except (ValueError, IndexError):
+        return -1
+
+
+def legacy_sort(tree, col):
+    rows = [(tree.set(k, col), k) for k in tree.get_children('')]
+    rows.sort(key=lambda item: legacy_size_key(item[0]))
+    for index, (_, k) in enumerate(rows): tree.move(k, '', index)
+
+
+def keystrokes(query):
+    texts = [query[:i] for i in range(1, len(query) + 1)]
+    return texts + texts[-2::-1] + [""]
+
+
+def report(label, latencies_ms, calls):
+    latencies_ms = sorted(latencies_ms)
+    p95 = latencies_ms[int(len(latencies_ms) * 0.95) - 1]
+    over = sum(1 for ms in latencies_ms if ms > KEYSTROKE_BUDGET_MS)
+    print(f"{label:>10}: p50 {statistics.median(latencies_ms):7.2f} ms  p95 {p95:7.2f} ms  max {latencies_ms[-1]:7.2f} ms  "
+          f"{over}/{len(latencies_ms)} over {KEYSTROKE_BUDGET_MS:.0f} ms  {calls} widget calls")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--programs", type=int, default=10000)
+    parser.add_argument("--op-us", type=float, default=30, help="simulated cost of one Treeview call")
+    parser.add_argument("--rows", type=int, default=30, help="visible rows")
+    parser.add_argument("--query", default="microsoft studio")
+    args = parser.parse_args()
+
+    programs = build_program_infos(args.programs)
+    texts = keystrokes(args.query)
+    print(f"{len(programs)} programs, {len(texts)} keystrokes, {args.op_us:g}us per widget call")
+
+    legacy_tree = FakeTreeview(args.op_us / 1e6)
+    legacy_filter(legacy_tree, programs, "")
+    legacy_tree.calls = 0
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        legacy_filter(legacy_tree, programs, text)
+        latencies.append((time.perf_counter() - start) * 1000)
+    report("rebuild", latencies, legacy_tree.calls)
+
+    tree = FakeTreeview(args.op_us / 1e6)
+    view = VirtualTreeview(tree, FakeScrollbar(), budget_ms=float("inf"))
+    view.capacity = args.rows
+    view.show(programs)
+    tree.calls = 0
+    latencies = [view.set_filter(text) for text in texts]
+    report("virtual", latencies, tree.calls)
+
+    timings = {}
+    legacy_filter(legacy_tree, programs, "")
+    legacy_tree.calls = 0
+    with timed("rebuild", timings):
+        legacy_sort(legacy_tree, "size")
+    tree.calls = 0
+    with timed("virtual", timings):
+        view.sort_by("size", False)
+    print(f"{'sort size':>10}: rebuild {timings['rebuild'] * 1000:.1f} ms ({legacy_tree.calls} widget calls), "
+          f"virtual {timings['virtual'] * 1000:.1f} ms ({tree.calls} widget calls)")
+    shown = [legacy_size_key(tree._rows[iid][COLUMNS.index("size")]) for iid in tree._order]
+    assert shown == sorted(shown) and shown[0] == legacy_size_key(legacy_tree._rows[legacy_tree._order[0]][COLUMNS.index("size")])
+
+    tree.calls = 0
+    with timed("scroll", timings):
+        for _ in range(100):
+            view.scroll_to(view.offset + 3)
+    print(f"{'scroll':>10}: {timings['scroll'] * 10:.2f} ms per wheel step ({tree.calls / 100:.0f} widget calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Progress channel benchmark: queue.Queue vs ProgressChannel.
+
+A worker thread reports one progress_copy tuple per file. A consumer thread
+plays the UI: every --poll-ms it drains what is pending and spends
+--handle-us per message (standing in for get_text + status_var.set).
+Reports worker throughput alone and with the consumer attached, the UI time
+spent and the peak backlog.
+
+    python -m benchmarks.bench_progress --messages 200000
+"""
+import argparse
+import queue
+import threading
+import time
+
+from progress_channel import ProgressChannel
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def run(sink, messages, consumer, poll_s, handle_s):
+    stop = threading.Event()
+    stats = {"handled": 0, "ui_time": 0.0, "peak_backlog": 0}
+
+    def drain():
+        if isinstance(sink, ProgressChannel):
+            stats["peak_backlog"] = max(stats["peak_backlog"], sink.pending_count())
+            return sink.drain()
+        stats["peak_backlog"] = max(stats["peak_backlog"], sink.qsize())
+        items = []
+        try:
+            while True: items.append(sink.get_nowait())
+        except queue.Empty:
+            return items
+
+    def ui_loop():
+        while not stop.is_set():
+            time.sleep(poll_s)
+            start = time.perf_counter()
+            for _ in drain():
+                busy_wait(handle_s)
+                stats["handled"] += 1
+            stats["ui_time"] += time.perf_counter() - start
+
+    ui = threading.Thread(target=ui_loop, daemon=True)
+    if consumer:
+        ui.start()
+    start = time.perf_counter()
+    for i in range(messages):
+        sink.put(("progress_copy", i + 1, messages, f"file{i}.dat", i * 4096))
+    sink.put(("finished_move", True))
+    worker_time = time.perf_counter() - start
+    if consumer:
+        while True:
+            time.sleep(poll_s)
+            if (sink.pending_count() if isinstance(sink, ProgressChannel) else sink.qsize()) == 0:
+                break
+        stop.set()
+        ui.join()
+    return worker_time, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--poll-ms", type=float, default=100)
+    parser.add_argument("--handle-us", type=float, default=20)
+    args = parser.parse_args()
+    poll_s, handle_s = args.poll_ms / 1000, args.handle_us / 1e6
+
+    for label, factory in (("queue.Queue", queue.Queue), ("ProgressChannel", ProgressChannel)):
+        alone, _ = run(factory(), args.messages, False, poll_s, handle_s)
+        attached, stats = run(factory(), args.messages, True, poll_s, handle_s)
+        print(f"{label:>16}: worker alone {args.messages / alone:10.0f} msg/s, with UI {args.messages / attached:10.0f} msg/s; "
+              f"UI handled {stats['handled']} in {stats['ui_time']:.2f}s, peak backlog {stats['peak_backlog']}")
+
+
+if __name__ == "__main__":
+    main()
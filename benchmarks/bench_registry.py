@@ -0,0 +1,159 @@
+"""Registry phase benchmark on a synthetic MemoryRegistry.
+
+Times the uninstall-key enumeration three ways: the legacy reader (one
+QueryValueEx per field, roots one after another), the one-pass EnumValue
+reader on sequential roots, and ProgramManager's concurrent roots. Every
+backend call can be given a latency (--call-us, a GIL-releasing sleep)
+to stand in for the round trip into the kernel that winreg pays. Then it
+times the InstallLocation update path.
+
+    python -m benchmarks.bench_registry --programs 5000 --call-us 20
+    python -m benchmarks.bench_registry --programs 5000 --save registry.json
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import re
+import threading
+import time
+
+from benchmarks.synthetic import build_uninstall_registry, timed
+from program_core import ProgramManager
+from registry import UNINSTALL_ROOTS, MemoryRegistry, RegistryBackend
+
+
+class NullQueue:
+    def put(self, message, block=True, timeout=None):
+        pass
+
+
+class SlowRegistry(RegistryBackend):
+    """Wraps a backend, counting calls and sleeping call_s in each one."""
+
+    requires_admin = False
+
+    def __init__(self, inner, call_s):
+        self.inner = inner
+        self.call_s = call_s
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _call(self, method, *args):
+        with self._lock:
+            self.calls += 1
+        if self.call_s:
+            time.sleep(self.call_s)
+        return method(*args)
+
+    def open_key(self, root, path, write=False): return self._call(self.inner.open_key, root, path, write)
+    def close_key(self, handle): return self._call(self.inner.close_key, handle)
+    def subkey_names(self, handle): return self._call(self.inner.subkey_names, handle)
+    def query_value(self, handle, name): return self._call(self.inner.query_value, handle, name)
+    def values(self, handle): return self._call(self.inner.values, handle)
+    def last_write_time(self, handle): return self._call(self.inner.last_write_time, handle)
+    def set_value(self, handle, name, value): return self._call(self.inner.set_value, handle, name, value)
+
+
+class LegacyReaderManager(ProgramManager):
+    def _read_uninstall_values(self, subkey):
+        query = self.registry.query_value
+        try: name = query(subkey, "DisplayName")
+        except OSError: return None
+        if not name or name.strip() == "": return None
+        try:
+            if query(subkey, "SystemComponent") == 1: return None
+        except OSError: pass
+        try:
+            if query(subkey, "ReleaseType").lower() in ["security update", "update rollup", "hotfix"]: return None
+        except OSError: pass
+        values = {'name': name}
+        try: values['version'] = query(subkey, "DisplayVersion")
+        except OSError: pass
+        try: values['publisher'] = query(subkey, "Publisher")
+        except OSError: pass
+        install_location = ""
+        try: install_location = query(subkey, "InstallLocation")
+        except OSError:
+            try: install_location = query(subkey, "InstallPath")
+            except OSError:
+                try:
+                    cleaned_path = query(subkey, "DisplayIcon").split(',')[0].strip('"')
+                    if cleaned_path.lower().endswith(".exe") and os.path.exists(cleaned_path):
+                        install_location = os.path.dirname(cleaned_path)
+                except OSError:
+                    try:
+                        match = re.search(r'"?(.*?\w+\.exe)"?', query(subkey, "UninstallString"), re.IGNORECASE)
+                        if match and os.path.exists(match.group(1).strip('"')):
+                            install_location = os.path.dirname(match.group(1).strip('"'))
+                    except (OSError, TypeError): pass
+        if install_location:
+            values['install_location'] = os.path.normpath(install_location.strip('"'))
+        try:
+            date_str = query(subkey, "InstallDate")
+            if date_str and len(date_str) == 8:
+                values['install_date'] = f"{date_str[0:4]}-{date_str[4:6]}-{date_str[6:8]}"
+        except OSError: pass
+        return values
+
+
+def enumerate_sequential(manager):
+    manager.programs.clear()
+    for root_name, subkey_path in UNINSTALL_ROOTS:
+        key = manager.registry.open_key(root_name, subkey_path)
+        for info in manager._process_registry_key(key, root_name, subkey_path, lambda: None):
+            manager.programs.setdefault(info.name, info)
+    return manager.programs
+
+
+def enumerate_concurrent(manager):
+    manager.programs.clear()
+    manager._enumerate_uninstall_keys(NullQueue())
+    return manager.programs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--programs", type=int, default=5000)
+    parser.add_argument("--call-us", type=float, default=0, help="simulated latency of each registry call")
+    parser.add_argument("--load", help="use a registry saved with --save instead of generating one")
+    parser.add_argument("--save", help="write the synthetic registry to this JSON file")
+    parser.add_argument("--profile", action="store_true", help="print the top functions of the enumeration")
+    args = parser.parse_args()
+
+    registry = MemoryRegistry.load(args.load) if args.load else build_uninstall_registry(args.programs)
+    if args.save:
+        registry.save(args.save)
+    print(f"registry: {registry.key_count()} keys, {args.call_us:g}us per call")
+
+    runs = (("legacy reader", LegacyReaderManager, enumerate_sequential),
+            ("one-pass reader", ProgramManager, enumerate_sequential),
+            ("one-pass + roots", ProgramManager, enumerate_concurrent))
+    baseline = None
+    for label, manager_class, enumerate_func in runs:
+        slow = SlowRegistry(registry, args.call_us / 1e6)
+        manager = manager_class(registry=slow)
+        timings = {}
+        with timed(label, timings):
+            programs = enumerate_func(manager)
+        t = timings[label]
+        baseline = baseline or t
+        print(f"{label:>18}: {t:.3f}s  {len(programs)} programs  {slow.calls:7d} calls  "
+              f"{len(programs) / t:8.0f} programs/s  ({baseline / t:.2f}x)")
+
+    keys = [key for info in programs.values() for key in info.registry_keys]
+    timings = {}
+    with timed("update", timings):
+        updated = manager._update_registry_location(keys, r"D:\Moved", NullQueue())
+    print(f"{'update':>18}: {timings['update']:.3f}s  {len(keys)} keys  {len(keys) / timings['update']:8.0f} keys/s  (ok={updated})")
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        enumerate_concurrent(ProgramManager(registry=registry))
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(12)
+
+
+if __name__ == "__main__":
+    main()
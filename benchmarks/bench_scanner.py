@@ -0,0 +1,77 @@
+"""Size scan benchmark: legacy os.walk loop vs SizeScanner.
+
+    python -m benchmarks.bench_scanner --programs 300 --files 400
+"""
+import argparse
+import os
+import time
+
+from benchmarks.synthetic import build_install_roots, temp_tree_base, timed
+from scanner import RACY_MTIME_WINDOW_NS, SizeScanner
+
+
+def legacy_scan(roots):
+    results = {}
+    for root in roots:
+        total_size_bytes = 0
+        file_list = []
+        for dirpath, _, filenames in os.walk(root):
+            for f in filenames:
+                fp = os.path.join(dirpath, f)
+                if os.path.exists(fp):
+                    try:
+                        total_size_bytes += os.path.getsize(fp)
+                        file_list.append(fp)
+                    except OSError: pass
+        results[root] = (total_size_bytes, len(file_list))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--programs", type=int, default=300)
+    parser.add_argument("--files", type=int, default=300, help="files per program")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--base-dir", default=None, help="where to build the tree (default: system temp)")
+    args = parser.parse_args()
+
+    with temp_tree_base(base_dir=args.base_dir) as base:
+        roots = build_install_roots(base, args.programs, args.files, max_size=1024)
+        print(f"tree: {args.programs} programs x {args.files} files under {base}")
+
+        timings = {}
+        for _ in range(args.repeat):
+            with timed("legacy", timings):
+                expected = legacy_scan(roots)
+            best = timings.setdefault("legacy_best", timings["legacy"])
+            timings["legacy_best"] = min(best, timings["legacy"])
+        print(f"{'legacy os.walk':>20}: {timings['legacy_best']:.3f}s")
+
+        for workers in args.workers:
+            scanner = SizeScanner(max_workers=workers)
+            best = None
+            for _ in range(args.repeat):
+                with timed("scan", timings):
+                    results = scanner.scan({r: r for r in roots})
+                best = timings["scan"] if best is None else min(best, timings["scan"])
+            for root, (size, count) in expected.items():
+                assert results[root].total_size == size and results[root].file_count == count, root
+            print(f"{f'SizeScanner x{workers}':>20}: {best:.3f}s  ({timings['legacy_best'] / best:.2f}x)")
+
+        # Incremental refresh: the second pass only stats directories against the recorded manifest.
+        scanner = SizeScanner(record_dirs=True)
+        with timed("record", timings):
+            recorded = scanner.scan({r: r for r in roots})
+        time.sleep(RACY_MTIME_WINDOW_NS / 1e9)
+        recorded = scanner.scan({r: r for r in roots})
+        with timed("incremental", timings):
+            rescanned = scanner.scan({r: r for r in roots}, previous={r: res.dirs for r, res in recorded.items()})
+        reused = sum(res.reused_dir_count for res in rescanned.values())
+        total_dirs = sum(res.dir_count for res in rescanned.values())
+        print(f"{'record manifests':>20}: {timings['record']:.3f}s")
+        print(f"{'incremental':>20}: {timings['incremental']:.3f}s  ({reused}/{total_dirs} dirs reused)")
+
+
+if __name__ == "__main__":
+    main()
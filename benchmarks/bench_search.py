@@ -0,0 +1,73 @@
+"""Search benchmark: per-keystroke linear scan vs SearchIndex.
+
+Types each query one key at a time and backspaces it away again, timing
+every keystroke three ways: the linear scan filter_programs used to do
+(lowercasing name, publisher and version of every program), the index
+with its result cache off (trigrams only), and the index as the UI uses
+it (trigrams plus narrowing from the previous query and cache hits on
+backspace). Every index answer is checked against the linear scan.
+
+    python -m benchmarks.bench_search --programs 10000
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.bench_program_list import keystrokes
+from benchmarks.synthetic import build_program_infos, timed
+from program_list import ProgramListModel
+from search_index import SearchIndex
+
+DEFAULT_QUERIES = ["microsoft studio", "redistributable", "nova", "2.1", "cloudware player", "zz"]
+
+
+def linear_search(programs, query):
+    query = query.lower()
+    return {name for name, info in programs.items() if ProgramListModel.matches(info, query)}
+
+
+def report(label, latencies_ms):
+    latencies_ms = sorted(latencies_ms)
+    p95 = latencies_ms[int(len(latencies_ms) * 0.95) - 1]
+    print(f"{label:>14}: mean {statistics.mean(latencies_ms):6.3f} ms  p50 {statistics.median(latencies_ms):6.3f} ms  "
+          f"p95 {p95:6.3f} ms  max {latencies_ms[-1]:6.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--programs", type=int, default=10000)
+    parser.add_argument("--query", action="append", help="query to type (repeatable)")
+    args = parser.parse_args()
+
+    programs = build_program_infos(args.programs)
+    texts = [text for query in (args.query or DEFAULT_QUERIES) for text in keystrokes(query) if text]
+    timings = {}
+    with timed("build", timings):
+        index = SearchIndex(programs)
+    print(f"{len(programs)} programs, {len(texts)} keystrokes, index built in {timings['build'] * 1000:.0f} ms")
+
+    expected = {}
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        expected[text] = linear_search(programs, text)
+        latencies.append((time.perf_counter() - start) * 1000)
+    report("linear", latencies)
+
+    for label, cache_size in (("trigrams", 0), ("trigrams+cache", 64)):
+        index.cache_size = cache_size
+        index.stats = dict.fromkeys(index.stats, 0)
+        latencies = []
+        for text in texts:
+            start = time.perf_counter()
+            matched = index.search(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert matched == expected[text], text
+        report(label, latencies)
+        stats = index.stats
+        print(f"{'':>14}  {stats['cache_hits']} cache hits, {stats['narrowed']} narrowed, {stats['indexed']} by trigram, "
+              f"{stats['scanned']} full scans, {stats['checked'] / len(texts):.0f} programs checked per keystroke")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Shortcut matching benchmark: legacy startswith loop vs InstallLocationIndex.
+
+    python -m benchmarks.bench_shortcut_index --programs 2000 --shortcuts 5000
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from shortcuts import InstallLocationIndex
+
+
+def synthetic_programs(count: int, nested_ratio: float, rng: random.Random):
+    programs = {}
+    locations = []
+    for i in range(count):
+        if locations and rng.random() < nested_ratio:
+            location = f"{rng.choice(locations)}\\Plugin{i:05d}"
+        else:
+            base = rng.choice(["C:\\Program Files", "C:\\Program Files (x86)", "C:\\Games"])
+            location = f"{base}\\Vendor{i % 97:02d}\\App{i:05d}"
+        locations.append(location)
+        programs[f"Program {i:05d}"] = SimpleNamespace(install_location=location)
+    return programs, locations
+
+
+def legacy_match(programs, target_path):
+    target_path_lower = target_path.lower()
+    for program_name, info in programs.items():
+        if info.install_location and target_path_lower.startswith(info.install_location.lower()):
+            return program_name
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--programs", type=int, default=2000)
+    parser.add_argument("--shortcuts", type=int, default=5000)
+    parser.add_argument("--nested", type=float, default=0.2, help="share of programs installed inside another")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    programs, locations = synthetic_programs(args.programs, args.nested, rng)
+    targets = [f"{rng.choice(locations)}\\bin\\app.exe".upper() if i % 3 == 0 else f"{rng.choice(locations)}\\app.exe"
+               for i in range(args.shortcuts)]
+    targets += [f"C:\\Unrelated\\Tool{i}\\tool.exe" for i in range(args.shortcuts // 10)]
+
+    start = time.perf_counter()
+    legacy = [legacy_match(programs, t) for t in targets]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = InstallLocationIndex.from_programs(programs)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed = [index.longest_match(t) for t in targets]
+    match_time = time.perf_counter() - start
+
+    reassigned = sum(1 for a, b in zip(legacy, indexed) if a != b)
+    print(f"{len(programs)} programs, {len(targets)} shortcut targets")
+    print(f"{'legacy loop':>16}: {legacy_time:.3f}s")
+    print(f"{'index build':>16}: {build_time:.3f}s")
+    print(f"{'index match':>16}: {match_time:.3f}s  ({legacy_time / max(build_time + match_time, 1e-9):.0f}x incl. build)")
+    print(f"{'reassigned':>16}: {reassigned} shortcuts now go to a more specific (nested) install")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Shortcut parsing benchmark: serial pylnk3 vs ShortcutParsePool.
+
+Generates .lnk fixtures with pylnk3.for_file (works on Linux) and parses
+them serially and on process pools of different sizes.
+
+    python -m benchmarks.bench_shortcut_parse --shortcuts 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.synthetic import temp_tree_base
+from shortcuts import ShortcutParsePool, read_lnk_targets
+
+try:
+    import pylnk3
+except ImportError:
+    pylnk3 = None
+
+
+def generate_shortcuts(base: str, count: int):
+    paths = []
+    for i in range(count):
+        folder = os.path.join(base, f"Vendor{i % 50:02d}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"App{i:05d}.lnk")
+        pylnk3.for_file(f"C:\\Program Files\\Vendor{i % 50:02d}\\App{i:05d}\\app.exe", path)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shortcuts", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+    if pylnk3 is None:
+        sys.exit("pylnk3 is required: pip install pylnk3")
+
+    with temp_tree_base() as base:
+        paths = generate_shortcuts(base, args.shortcuts)
+        print(f"{len(paths)} generated shortcuts, {os.cpu_count()} CPUs")
+
+        start = time.perf_counter()
+        expected = dict(read_lnk_targets(paths))
+        serial_time = time.perf_counter() - start
+        print(f"{'serial':>12}: {serial_time:.3f}s")
+
+        for workers in args.workers:
+            pool = ShortcutParsePool(max_workers=workers, batch_size=args.batch_size, min_parallel=0)
+            start = time.perf_counter()
+            first_result = None
+            parsed = {}
+            for shortcut_path, target in pool.parse(paths):
+                if first_result is None:
+                    first_result = time.perf_counter() - start
+                parsed[shortcut_path] = target
+            elapsed = time.perf_counter() - start
+            assert parsed == expected
+            print(f"{f'pool x{workers}':>12}: {elapsed:.3f}s  ({serial_time / elapsed:.2f}x, first result after {first_result:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
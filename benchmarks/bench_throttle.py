@@ -0,0 +1,112 @@
+"""Throttle benchmark: achieved MB/s and files/s of CopyEngine and DeleteEngine under IoThrottle caps.
+
+Caps are met when the achieved rate is at or just under the cap. The
+adaptive run uses a simulated disk whose probe latency climbs once the copy
+goes past --disk-mbps, so it shows the back-off on tmpfs as well; it
+copies the large files over and over for --adaptive-seconds. Pass
+--real-probe to time fsyncs in --base-dir instead.
+
+    python -m benchmarks.bench_throttle --base-dir /dev/shm
+"""
+import argparse
+import os
+import shutil
+import threading
+import time
+
+from benchmarks.bench_copy import add_large_files
+from benchmarks.synthetic import build_install_tree, temp_tree_base
+from copy_engine import CopyEngine
+from delete_engine import DeleteEngine
+from io_throttle import IoThrottle, fsync_probe, set_low_io_priority
+
+
+def simulated_disk_probe(throttle: IoThrottle, disk_mbps: float, base_latency: float = 0.002):
+    """Probe latency of a disk that queues up once it is asked for more than disk_mbps."""
+    state = {"at": time.perf_counter(), "bytes": 0}
+
+    def probe() -> float:
+        now = time.perf_counter()
+        rate = (throttle.bytes_granted - state["bytes"]) / max(now - state["at"], 1e-6) / (1024 * 1024)
+        state["at"], state["bytes"] = now, throttle.bytes_granted
+        return min(2.0, base_latency * (1 + (rate / disk_mbps) ** 4))
+
+    return probe
+
+
+def report(label: str, amount: float, unit: str, elapsed: float, cap: float):
+    rate = amount / elapsed
+    verdict = f"{rate / cap * 100:5.1f}% of cap" if cap else "unlimited"
+    print(f"{label:>26}: {elapsed:6.2f}s  {rate:9.1f} {unit}  ({verdict})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5000, help="small files for the ops/s runs")
+    parser.add_argument("--large", type=int, default=8, help="large files for the MB/s runs")
+    parser.add_argument("--large-mb", type=int, default=32)
+    parser.add_argument("--mbps", type=float, nargs="+", default=[0, 100, 40])
+    parser.add_argument("--ops", type=float, nargs="+", default=[0, 2000, 500])
+    parser.add_argument("--disk-mbps", type=float, default=30, help="knee of the simulated disk for the adaptive run")
+    parser.add_argument("--adaptive-seconds", type=float, default=8)
+    parser.add_argument("--real-probe", action="store_true", help="time fsyncs in --base-dir for the adaptive run")
+    parser.add_argument("--base-dir", default="/dev/shm" if os.path.isdir("/dev/shm") else None)
+    args = parser.parse_args()
+
+    print(f"low I/O priority available: {set_low_io_priority()}")
+    with temp_tree_base(base_dir=args.base_dir) as base:
+        large_src = os.path.join(base, "large")
+        os.makedirs(large_src)
+        large_mb = add_large_files(large_src, args.large, args.large_mb) / (1024 * 1024)
+        small_src = os.path.join(base, "small")
+        build_install_tree(small_src, args.files, max_size=1024)
+        dst = os.path.join(base, "dst")
+        print(f"trees: {args.large} x {args.large_mb} MB, {args.files} small files under {base}")
+
+        for mbps in args.mbps:
+            stats = CopyEngine(throttle=IoThrottle(mb_per_second=mbps)).copy_tree(large_src, dst)
+            assert stats.files_copied == args.large and not stats.errors, stats
+            shutil.rmtree(dst)
+            report(f"copy, {mbps:g} MB/s cap", large_mb, "MB/s", stats.elapsed, mbps)
+
+        for ops in args.ops:
+            stats = CopyEngine(throttle=IoThrottle(ops_per_second=ops)).copy_tree(small_src, dst)
+            assert stats.files_copied == args.files and not stats.errors, stats
+            report(f"copy, {ops:g} ops/s cap", args.files, "files/s", stats.elapsed, ops)
+            result = DeleteEngine(throttle=IoThrottle(ops_per_second=ops)).delete_tree(dst)
+            assert result.ok and not os.path.exists(dst), result.failures[:5]
+            report(f"delete, {ops:g} ops/s cap", result.files_deleted, "files/s", result.elapsed, ops)
+
+        throttle = IoThrottle(adaptive=True)
+        throttle.probe = fsync_probe(base) if args.real_probe else simulated_disk_probe(throttle, args.disk_mbps)
+        samples = []
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(0.5):
+                samples.append((time.perf_counter(), throttle.bytes_granted, throttle.bytes_per_second / (1024 * 1024),
+                                throttle.last_latency))
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        start, copied_mb = time.perf_counter(), 0.0
+        while time.perf_counter() - start < args.adaptive_seconds:
+            stats = CopyEngine(throttle=throttle).copy_tree(large_src, dst)
+            assert stats.files_copied == args.large and not stats.errors, stats
+            shutil.rmtree(dst)
+            copied_mb += large_mb
+        done.set()
+        sampler.join()
+        report("copy, adaptive", copied_mb, "MB/s", time.perf_counter() - start, 0 if args.real_probe else args.disk_mbps)
+        # The first probes start from an unlimited rate; the second half shows where the back-off settled.
+        (mid_at, mid_bytes, _, _), (end_at, end_bytes, _, _) = samples[len(samples) // 2], samples[-1]
+        report("copy, adaptive 2nd half", (end_bytes - mid_bytes) / (1024 * 1024), "MB/s", end_at - mid_at,
+               0 if args.real_probe else args.disk_mbps)
+        print(f"{'':>26}  {throttle}")
+        for _, _, rate, latency in samples:
+            limit = f"{rate:7.1f} MB/s" if rate else "  unlimited"
+            print(f"{'':>26}  limit {limit}  last probe {(latency or 0) * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from program_core import ProgramInfo, format_size
+from registry import UNINSTALL_ROOTS, MemoryRegistry
+
+
+def build_install_tree(root: str, files: int, depth: int = 3, fanout: int = 4,
+                       min_size: int = 0, max_size: int = 16 * 1024, seed: int = 0) -> int:
+    """Creates a fake install directory and returns the total bytes written."""
+    rng = random.Random(seed)
+    dirs = [root]
+    frontier = [root]
+    for level in range(depth):
+        next_frontier = []
+        for parent in frontier:
+            for i in range(rng.randint(1, fanout)):
+                d = os.path.join(parent, f"dir{level}_{i}")
+                next_frontier.append(d)
+        dirs.extend(next_frontier)
+        frontier = next_frontier
+    for d in dirs:
+        os.makedirs(d, exist_ok=True)
+
+    total = 0
+    payload = os.urandom(max_size) if max_size else b""
+    for i in range(files):
+        size = rng.randint(min_size, max_size)
+        with open(os.path.join(rng.choice(dirs), f"file{i}.dat"), "wb") as f:
+            f.write(payload[:size])
+        total += size
+    return total
+
+
+def build_install_roots(base: str, programs: int, files_per_program: int, **tree_kwargs) -> List[str]:
+    roots = []
+    for p in range(programs):
+        root = os.path.join(base, f"Program{p:04d}")
+        build_install_tree(root, files_per_program, seed=p, **tree_kwargs)
+        roots.append(root)
+    return roots
+
+
+def build_uninstall_registry(programs: int, install_roots: Optional[List[str]] = None, seed: int = 0) -> MemoryRegistry:
+    """Fills a MemoryRegistry with uninstall keys shaped like a real machine's.
+
+    Roughly one key in ten is a system component or an update that the
+    scan must skip, and the install location is spread over InstallLocation,
+    InstallPath, DisplayIcon and UninstallString so every fallback runs.
+    install_roots, when given, are used as the install locations in turn.
+    """
+    rng = random.Random(seed)
+    registry = MemoryRegistry()
+    for p in range(programs):
+        root_name, uninstall_path = UNINSTALL_ROOTS[p % len(UNINSTALL_ROOTS)]
+        location = install_roots[p % len(install_roots)] if install_roots else f"C:\\Program Files\\Vendor{p % 97}\\Program{p:05d}"
+        values = {
+            "DisplayName": f"Program {p:05d}",
+            "DisplayVersion": f"{rng.randint(1, 20)}.{rng.randint(0, 99)}.{rng.randint(0, 9999)}",
+            "Publisher": f"Vendor {p % 97}",
+            "InstallDate": f"20{rng.randint(10, 25)}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}",
+            "EstimatedSize": rng.randint(1, 4 * 1024 * 1024),
+            "NoModify": 1,
+            "NoRepair": 1,
+            "UninstallString": f'"{location}\\uninstall.exe" /S',
+        }
+        kind = rng.random()
+        if kind < 0.05:
+            values["SystemComponent"] = 1
+        elif kind < 0.10:
+            values["ReleaseType"] = rng.choice(["Security Update", "Hotfix", "Update Rollup"])
+        elif kind < 0.60:
+            values["InstallLocation"] = location
+        elif kind < 0.70:
+            values["InstallPath"] = location
+        elif kind < 0.85:
+            values["DisplayIcon"] = f"{location}\\app.exe,0"
+        registry.add_key(f"{root_name}\\{uninstall_path}\\{{{rng.getrandbits(128):032X}}}", values)
+    return registry
+
+
+def build_program_infos(count: int, seed: int = 0) -> Dict[str, ProgramInfo]:
+    """ProgramInfo objects with the name, publisher, version, size and date mix of a large machine."""
+    rng = random.Random(seed)
+    words = ["Studio", "Runtime", "Player", "Tools", "SDK", "Driver", "Update", "Client", "Launcher", "Editor",
+             "Redistributable", "Viewer", "Helper", "Service", "Suite", "Manager", "Converter", "Assistant"]
+    vendors = [f"{rng.choice(['Micro', 'Nova', 'Blue', 'Red', 'Open', 'Hyper', 'Cloud', 'Pixel'])}"
+               f"{rng.choice(['soft', 'works', 'labs', 'systems', 'ware', 'tech'])}" for _ in range(150)]
+    programs = {}
+    for p in range(count):
+        vendor = rng.choice(vendors)
+        size_bytes = int(rng.uniform(1, 1023) * 1024 ** rng.randint(1, 3))
+        name = f"{vendor} {rng.choice(words)} {rng.choice(words)} {p}"
+        info = ProgramInfo(name, version=f"{rng.randint(1, 30)}.{rng.randint(0, 99)}.{rng.randint(0, 9999)}",
+                           install_location=f"C:\\Program Files\\{vendor}\\Program{p:05d}",
+                           install_date=f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                           size=format_size(size_bytes), publisher=f"{vendor} Inc.")
+        info.size_bytes = size_bytes
+        programs[name] = info
+    return programs
+
+
+@contextmanager
+def temp_tree_base(prefix: str = "pmp-bench-", base_dir: str = None) -> Iterator[str]:
+    """Yields a scratch directory; pass base_dir=/dev/shm to benchmark on tmpfs."""
+    path = tempfile.mkdtemp(prefix=prefix, dir=base_dir)
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def timed(label: str, results: dict) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        results[label] = time.perf_counter() - start
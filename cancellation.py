@@ -0,0 +1,62 @@
+import threading
+import time
+
+
+class OperationCancelled(Exception):
+    """Raised by CancelToken.check() in the worker once the operation has been cancelled."""
+
+
+class CancelToken:
+    """Lets the UI cancel, pause and resume an operation running on worker threads.
+
+    Workers call check() between units of work (a directory, a file, a chunk
+    of a large file, a shortcut). It returns at once while the operation
+    runs, blocks while it is paused and raises OperationCancelled once it
+    has been cancelled, waking paused workers too. keep_partial tells a
+    cancelled move to leave what it copied so far instead of rolling it back.
+    """
+
+    def __init__(self):
+        self.keep_partial = False
+        self.paused_seconds = 0.0
+        self._cond = threading.Condition()
+        self._cancelled = False
+        self._paused = False
+        self._paused_at = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def paused(self) -> bool:
+        return self._paused and not self._cancelled
+
+    def cancel(self, keep_partial: bool = False):
+        with self._cond:
+            self.keep_partial = keep_partial
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def pause(self):
+        with self._cond:
+            if not self._paused:
+                self._paused = True
+                self._paused_at = time.monotonic()
+
+    def resume(self):
+        with self._cond:
+            if self._paused:
+                self._paused = False
+                self.paused_seconds += time.monotonic() - self._paused_at
+                self._cond.notify_all()
+
+    def check(self):
+        # Unlocked fast path: the flags are plain bools and a stale read only delays the stop by one unit.
+        if not self._paused and not self._cancelled:
+            return
+        with self._cond:
+            while self._paused and not self._cancelled:
+                self._cond.wait()
+            if self._cancelled:
+                raise OperationCancelled()
@@ -0,0 +1,311 @@
+"""Command-line entry point for scripted scans and moves; imports no tkinter.
+
+    python cli.py scan [--json]
+    python cli.py move "Program Name" [...] --target D: [--delete-source] [--keep-partial]
+    python cli.py revert [--keep-partial]
+    python cli.py watch ["Program Name" ...]
+
+Progress goes to stderr, results (tables or JSON) to stdout; the core
+modules' own diagnostics are sent to stderr too, so `scan --json` output
+can be piped straight into a JSON parser. The exit code
+is 0 on success and 1 when the scan, move or revert failed. Ctrl+C during a
+move or revert cancels it and removes the partial copy, unless
+--keep-partial asks to keep it for a later run to resume. --max-mbps,
+--max-ops, --adaptive and --low-priority keep a move or revert from
+saturating the disk; --verify compares every copied file with its source.
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app_paths import app_data_dir
+from cancellation import CancelToken
+from locale_strings import get_text, set_language, DEFAULT_LANG
+with contextlib.redirect_stdout(sys.stderr):
+    # program_core reports a missing pylnk3 on stdout as it is imported.
+    from program_core import ProgramInfo, ProgramManager, drive_target_location, is_admin
+from progress_channel import COALESCED_TYPES
+from registry import MemoryRegistry
+from scan_cache import ScanCache, default_cache_path
+
+
+def default_move_file() -> str:
+    return os.path.join(app_data_dir(), "last_move.json")
+
+
+class ConsoleProgress:
+    """progress_queue stand-in for the CLI.
+
+    Prints status lines, warnings and errors to the stream as they arrive
+    and rewrites a single progress line at most every min_interval seconds.
+    The finished_* / error message that ends an operation is kept in result.
+    """
+
+    def __init__(self, stream=None, quiet: bool = False, min_interval: float = 0.5):
+        self.stream = stream or sys.stderr
+        self.quiet = quiet
+        self.min_interval = min_interval
+        self.result: Optional[tuple] = None
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self._last_progress = 0.0
+
+    def put(self, message: tuple, block: bool = True, timeout: Any = None):
+        msg_type, payload = message[0], message[1:]
+        if msg_type in COALESCED_TYPES:
+            now = time.monotonic()
+            if not self.quiet and now - self._last_progress >= self.min_interval:
+                self._last_progress = now
+                self._write(f"  {msg_type[len('progress_'):]}: " + " ".join(str(part) for part in payload[:3]))
+        elif msg_type == "status":
+            raw, args = payload[0], (payload[1] if len(payload) > 1 else {})
+            if not self.quiet: self._write(get_text(raw, **args) if args else raw)
+        elif msg_type == "warning" or msg_type == "delete_error":
+            text = payload[0] if msg_type == "warning" else get_text("status_delete_error_file", filename=payload[0], error=payload[1])
+            self.warnings.append(text)
+            self._write(f"{get_text('warning')}: {text}")
+        elif msg_type == "error":
+            self.errors.append(payload[0])
+            self.result = message
+            self._write(f"{get_text('error')}: {payload[0]}")
+        elif msg_type == "cancelled":
+            self.result = message
+            self._write(payload[0])
+        elif msg_type.startswith("finished_"):
+            self.result = message
+
+    put_nowait = put
+
+    def _write(self, line: str):
+        print(line, file=self.stream, flush=True)
+
+
+def program_summary(info: ProgramInfo) -> Dict[str, Any]:
+    data = info.to_dict()
+    data.pop('files')
+    return data
+
+
+def move_details_to_json(details: Dict[str, Any]) -> Dict[str, Any]:
+    details = dict(details)
+    snapshot = dict(details.get('program_info_snapshot_dict') or {})
+    snapshot.pop('files', None)
+    details['program_info_snapshot_dict'] = snapshot
+    return details
+
+
+def scan(manager: ProgramManager, sink: ConsoleProgress) -> Optional[Dict[str, ProgramInfo]]:
+    programs = manager.get_installed_programs_threaded(sink)
+    if sink.result is None or sink.result[0] != "finished_load":
+        return None
+    return programs
+
+
+def run_cancellable(func: Callable[..., Any], *args: Any, keep_partial: bool = False) -> Any:
+    """Calls func(*args, token) on a worker thread; Ctrl+C cancels the token and waits for the rollback."""
+    token = CancelToken()
+    result = []
+    worker = threading.Thread(target=lambda: result.append(func(*args, token)), daemon=True)
+    worker.start()
+    try:
+        while worker.is_alive(): worker.join(0.2)
+    except KeyboardInterrupt:
+        print(get_text("status_cancelling"), file=sys.stderr)
+        token.cancel(keep_partial=keep_partial)
+        worker.join()
+    return result[0] if result else None
+
+
+def find_programs(programs: Dict[str, ProgramInfo], names: List[str]) -> List[ProgramInfo]:
+    by_folded_name = {name.casefold(): info for name, info in programs.items()}
+    found = []
+    for name in names:
+        info = programs.get(name) or by_folded_name.get(name.casefold())
+        if info is None:
+            raise SystemExit(f"{get_text('error')}: {get_text('program_location_not_found', location=name)}")
+        found.append(info)
+    return found
+
+
+def resolve_target(info: ProgramInfo, target: str, batch: bool) -> str:
+    # Same rules as the UI: a bare drive keeps the path relative to C:, an existing
+    # folder (or any folder in a batch) receives the program under its own name.
+    # Both resolve to the program's own folder, so a batch's conflict check sees real destinations.
+    if len(target) == 2 and target[1] == ':':
+        return drive_target_location(info.install_location, target)
+    if batch or os.path.isdir(target):
+        return os.path.abspath(os.path.join(target, os.path.basename(info.install_location.rstrip('\\/'))))
+    return os.path.abspath(target)
+
+
+def cmd_scan(args, manager: ProgramManager, sink: ConsoleProgress, out) -> int:
+    programs = scan(manager, sink)
+    if programs is None:
+        return 1
+    rows = sorted(programs.values(), key=lambda info: info.name.casefold())
+    if args.json:
+        json.dump([program_summary(info) for info in rows], out, indent=2, ensure_ascii=False)
+        out.write("\n")
+    else:
+        for info in rows:
+            print(f"{info.name[:48]:<48}  {info.size:>10}  {info.version[:16]:<16}  {info.install_location}", file=out)
+        print(get_text("status_programs_found", count=len(rows)), file=sys.stderr)
+    return 0
+
+
+def cmd_move(args, manager: ProgramManager, sink: ConsoleProgress, out) -> int:
+    programs = scan(manager, sink)
+    if programs is None:
+        return 1
+    infos = find_programs(programs, args.names)
+    batch = len(infos) > 1
+    moves = [(info, resolve_target(info, args.target, batch)) for info in infos]
+    conflict_error = manager.batch_conflict_error(moves)
+    if conflict_error:
+        raise SystemExit(f"{get_text('error')}: {conflict_error}")
+    if not is_admin():
+        sink.put(("warning", get_text("admin_rights_crucial_warning")))
+
+    completed = []
+    if batch:
+        jobs = run_cancellable(manager.move_programs_threaded, moves, args.delete_source, sink, keep_partial=args.keep_partial)
+        completed = [job.move_details for job in jobs if job.move_details]
+        for job in jobs:
+            print(f"{job.program_info.name}: {job.state}{' - ' + job.error if job.error else ''}", file=sys.stderr)
+        failed = len(jobs) - len(completed)
+    else:
+        run_cancellable(manager.move_program_threaded, moves[0][0], moves[0][1], args.delete_source, sink, keep_partial=args.keep_partial)
+        if sink.result and sink.result[0] == "finished_move":
+            completed = [sink.result[5]]
+        failed = 1 - len(completed)
+
+    if completed:
+        os.makedirs(os.path.dirname(os.path.abspath(args.move_file)), exist_ok=True)
+        with open(args.move_file, "w", encoding="utf-8") as f:
+            json.dump([move_details_to_json(details) for details in completed], f, indent=2, ensure_ascii=False)
+        for details in completed:
+            print(get_text("move_successful_msg", program_name=details['program_name']), file=sys.stderr)
+    json.dump([move_details_to_json(details) for details in completed], out, indent=2, ensure_ascii=False)
+    out.write("\n")
+    return 1 if failed else 0
+
+
+def cmd_revert(args, manager: ProgramManager, sink: ConsoleProgress, out) -> int:
+    try:
+        with open(args.move_file, "r", encoding="utf-8") as f:
+            moves = json.load(f)
+    except (OSError, ValueError):
+        print(f"{get_text('error')}: {get_text('no_revert_operation')}", file=sys.stderr)
+        return 1
+    if isinstance(moves, dict):
+        moves = [moves]
+
+    remaining = []
+    for details in reversed(moves):
+        if sink.result and sink.result[0] == "cancelled":
+            remaining.insert(0, details); continue
+        sink.result = None
+        run_cancellable(manager.revert_move_threaded, details, sink, keep_partial=args.keep_partial)
+        if sink.result and sink.result[0] == "finished_revert":
+            print(get_text("revert_successful_msg", program_name=details['program_name']), file=sys.stderr)
+        else:
+            remaining.insert(0, details)
+    if remaining:
+        with open(args.move_file, "w", encoding="utf-8") as f:
+            json.dump(remaining, f, indent=2, ensure_ascii=False)
+        return 1
+    os.remove(args.move_file)
+    return 0
+
+
+def cmd_watch(args, manager: ProgramManager, sink: ConsoleProgress, out) -> int:
+    programs = scan(manager, sink)
+    if programs is None:
+        return 1
+    names = [info.name for info in find_programs(programs, args.names)] if args.names else None
+    changes: queue.Queue = queue.Queue()
+    watcher = manager.start_size_watch(changes, names)
+    watcher.ready.wait()
+    print(f"Watching {len(watcher.roots)} install locations ({watcher.mode}); Ctrl+C to stop.", file=sys.stderr)
+    try:
+        while True:
+            try: message = changes.get(timeout=0.5)
+            except queue.Empty: continue
+            if message[0] != "sizes_changed": continue
+            for name in message[1]:
+                info = programs[name]
+                print(f"{time.strftime('%H:%M:%S')}  {info.name[:48]:<48}  {info.size:>10}  {len(info.files)} files", file=out, flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop_size_watch()
+    return 0
+
+
+def add_throttle_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--max-mbps", type=float, default=0, help="cap copy throughput in MB/s (0: unlimited)")
+    parser.add_argument("--max-ops", type=float, default=0, help="cap files copied or deleted per second (0: unlimited)")
+    parser.add_argument("--adaptive", action="store_true", help="slow down while other programs wait on the disk")
+    parser.add_argument("--low-priority", action="store_true", help="run the copy and delete threads at low I/O priority")
+    parser.add_argument("--verify", action="store_true", help="compare each copied file with its source by hash")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lang", default=DEFAULT_LANG, help="message language (en, tr)")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and do not update the scan cache")
+    parser.add_argument("--quiet", action="store_true", help="only print warnings, errors and results")
+    parser.add_argument("--registry-file", help="read (and write back) uninstall keys from a JSON registry file instead of the Windows registry")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = commands.add_parser("scan", help="list installed programs")
+    scan_parser.add_argument("--json", action="store_true", help="print the program list as JSON")
+
+    move_parser = commands.add_parser("move", help="move one or more programs")
+    move_parser.add_argument("names", nargs="+", help="program display names")
+    move_parser.add_argument("--target", required=True, help="target drive (e.g. D:) or folder")
+    move_parser.add_argument("--delete-source", action="store_true")
+    move_parser.add_argument("--keep-partial", action="store_true", help="on Ctrl+C, keep the files copied so far instead of removing them")
+    move_parser.add_argument("--move-file", default=default_move_file(), help="where to record the move for revert")
+    add_throttle_arguments(move_parser)
+
+    revert_parser = commands.add_parser("revert", help="revert the moves recorded by the last move command")
+    revert_parser.add_argument("--move-file", default=default_move_file())
+    revert_parser.add_argument("--keep-partial", action="store_true", help="on Ctrl+C, keep the files copied so far instead of removing them")
+    add_throttle_arguments(revert_parser)
+
+    watch_parser = commands.add_parser("watch", help="print program sizes as they change")
+    watch_parser.add_argument("names", nargs="*", help="program display names (default: all programs)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    set_language(args.lang)
+    out = sys.stdout
+    # The core modules print their diagnostics; keep them out of the results.
+    with contextlib.redirect_stdout(sys.stderr):
+        registry = MemoryRegistry.load(args.registry_file) if args.registry_file else None
+        manager = ProgramManager(scan_cache=None if args.no_cache else ScanCache(default_cache_path()), registry=registry)
+        sink = ConsoleProgress(quiet=args.quiet)
+        if args.command in ("move", "revert"):
+            manager.io_throttle.configure(args.max_mbps, args.max_ops, args.adaptive)
+            manager.low_io_priority = args.low_priority
+            manager.verify_copies = args.verify
+        handlers = {"scan": cmd_scan, "move": cmd_move, "revert": cmd_revert, "watch": cmd_watch}
+        exit_code = handlers[args.command](args, manager, sink, out)
+        if registry is not None and args.command in ("move", "revert"):
+            registry.save(args.registry_file)
+    return exit_code
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
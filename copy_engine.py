@@ -0,0 +1,348 @@
+import errno
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app_paths import app_data_dir
+from cancellation import CancelToken, OperationCancelled
+from io_throttle import IoThrottle, set_low_io_priority
+
+DEFAULT_COPY_WORKERS = 8
+LARGE_FILE_THRESHOLD = 8 * 1024 * 1024
+LARGE_COPY_BUFFER = 4 * 1024 * 1024
+_COPY_FILE_RANGE_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+# FAT/exFAT targets store mtimes with 2 s resolution; a partially written file
+# carries the time of the interrupted copy, far outside this window.
+MTIME_TOLERANCE_NS = 2 * 1_000_000_000
+HASH_CHUNK = 1024 * 1024
+JOURNAL_VERSION = 1
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    buf = bytearray(HASH_CHUNK)
+    view = memoryview(buf)
+    with open(path, 'rb') as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.hexdigest()
+
+
+def default_journal_path(src: str, dst: str) -> str:
+    key = hashlib.sha1(f"{os.path.normcase(os.path.abspath(src))}|{os.path.normcase(os.path.abspath(dst))}".encode("utf-8")).hexdigest()
+    return os.path.join(app_data_dir(), "journals", f"{key}.jsonl")
+
+
+class CopyJournal:
+    """Append-only record of files fully copied from src to dst.
+
+    One JSON line per file: [relative path, size, source mtime_ns, digest].
+    Lines are written only after the file's data and timestamps are in
+    place, so after a crash every journaled file whose source still has the
+    same size and mtime, and whose destination still matches it, can be
+    skipped without reading either file.
+    A torn last line is ignored on load. Appends are flushed in batches;
+    files whose line was lost are re-checked by size and mtime instead.
+    """
+
+    def __init__(self, path: str, src: str, dst: str, flush_every: int = 64):
+        self.path = path
+        self.src = src
+        self.dst = dst
+        self.flush_every = flush_every
+        self._entries: Dict[str, Tuple[int, int, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self._unflushed = 0
+
+    def load(self) -> int:
+        self._entries.clear()
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("version") != JOURNAL_VERSION or header.get("src") != self.src or header.get("dst") != self.dst:
+                    print(f"[CopyJournal] Ignoring journal for a different copy: {self.path}")
+                    return 0
+                for line in f:
+                    try: rel, size, mtime_ns, digest = json.loads(line)
+                    except ValueError: continue
+                    self._entries[rel] = (size, mtime_ns, digest)
+        except (OSError, ValueError) as e:
+            print(f"[CopyJournal] Could not read journal {self.path}: {e}")
+            self._entries.clear()
+        return len(self._entries)
+
+    def is_done(self, rel: str, size: int, mtime_ns: int) -> bool:
+        entry = self._entries.get(rel)
+        return entry is not None and entry[0] == size and entry[1] == mtime_ns
+
+    def record(self, rel: str, size: int, mtime_ns: int, digest: Optional[str] = None):
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                fresh = not self._entries
+                self._file = open(self.path, "w" if fresh else "a", encoding="utf-8")
+                if fresh:
+                    self._file.write(json.dumps({"version": JOURNAL_VERSION, "src": self.src, "dst": self.dst}) + "\n")
+            self._file.write(json.dumps([rel, size, mtime_ns, digest]) + "\n")
+            self._entries[rel] = (size, mtime_ns, digest)
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._file.flush()
+                self._unflushed = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._unflushed = 0
+
+    def discard(self):
+        self.close()
+        self._entries.clear()
+        try: os.remove(self.path)
+        except FileNotFoundError: pass
+        except OSError as e: print(f"[CopyJournal] Could not remove journal {self.path}: {e}")
+
+
+class CopyStats:
+    def __init__(self, expected_files: int = 0, expected_bytes: int = 0):
+        self.expected_files = expected_files
+        self.expected_bytes = expected_bytes
+        self.files_discovered = 0
+        self.bytes_discovered = 0
+        self.walk_complete = False
+        self.files_copied = 0
+        self.files_skipped = 0
+        self.files_resumed = 0
+        self.files_failed = 0
+        self.bytes_copied = 0
+        self.dirs_created = 0
+        self.elapsed = 0.0
+        self.errors: List[Tuple[str, str]] = []
+
+    @property
+    def files_done(self) -> int:
+        return self.files_copied + self.files_skipped + self.files_resumed + self.files_failed
+
+    @property
+    def estimated_total_files(self) -> int:
+        """Exact once the walk has finished; until then the larger of what was found and what was expected."""
+        if self.walk_complete:
+            return self.files_discovered
+        return max(self.files_discovered, self.expected_files)
+
+    @property
+    def files_per_second(self) -> float:
+        return (self.files_done - self.files_failed) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_copied / (1024 * 1024) / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self) -> str:
+        return (f"{self.files_copied} copied, {self.files_skipped} skipped, {self.files_resumed} resumed, {self.files_failed} failed, "
+                f"{self.bytes_copied} bytes in {self.elapsed:.2f}s ({self.files_per_second:.0f} files/s, "
+                f"{self.mb_per_second:.1f} MB/s)")
+
+
+class CopyEngine:
+    """Copies a directory tree with a thread pool.
+
+    Small files go to a wide pool where per-file latency (open, create,
+    metadata) overlaps; files above large_file_threshold go to a narrow lane
+    and are copied in large chunks, using copy_file_range where the OS has it.
+    Directory timestamps are applied after all of their contents are written,
+    deepest first, so creating files does not bump them again.
+
+    A destination file is left alone when it has the source's size and
+    mtime (the mtime is copied last, so an interrupted write never matches);
+    with verify_hash the contents are compared by digest as well, and every
+    copied file is read back and checked. Passing a CopyJournal makes the
+    copy resumable: journaled files are skipped after one stat of the
+    destination.
+
+    There is no separate pre-scan: the tree is walked once and files are
+    queued for copying as they are found, up to max_queued ahead of the
+    workers. Until the walk finishes the total is an estimate, seeded by
+    expected_files (e.g. from the size scan's manifest) when known.
+
+    token is checked for every directory, every file and every chunk of a
+    large file: pausing it holds the copy there, and cancelling it makes
+    copy_tree raise OperationCancelled once the queued files have noticed.
+    The journal keeps the files finished by then.
+
+    A throttle (see IoThrottle) is charged one operation per file, the size
+    of each small file before it is copied and each chunk of a large one as
+    it is written.
+    low_priority lowers the I/O priority of the worker threads.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_COPY_WORKERS, large_workers: int = 2,
+                 large_file_threshold: int = LARGE_FILE_THRESHOLD, buffer_size: int = LARGE_COPY_BUFFER,
+                 max_queued: int = 10000, verify_hash: bool = False, throttle: Optional[IoThrottle] = None,
+                 low_priority: bool = False):
+        self.max_workers = max(1, max_workers)
+        self.throttle = throttle or IoThrottle()
+        self.low_priority = low_priority
+        self.verify_hash = verify_hash
+        self.max_queued = max(1, max_queued)
+        self.large_workers = max(1, large_workers)
+        self.large_file_threshold = large_file_threshold
+        self.buffer_size = buffer_size
+
+    def copy_tree(self, src: str, dst: str,
+                  on_file_done: Optional[Callable[[str, Optional[Exception], CopyStats], None]] = None,
+                  expected_files: int = 0, expected_bytes: int = 0,
+                  journal: Optional[CopyJournal] = None, token: Optional[CancelToken] = None) -> CopyStats:
+        token = token or CancelToken()
+        stats = CopyStats(expected_files, expected_bytes)
+        lock = threading.Lock()
+        # Lets the walk run ahead of the copy (so totals firm up early) without
+        # queueing a future for every file of a huge tree at once.
+        in_flight = threading.BoundedSemaphore(self.max_queued)
+        copied_dirs: List[Tuple[str, str]] = []
+        start = time.perf_counter()
+
+        def finish(src_file: str, copied_bytes: int, skipped: bool, error: Optional[Exception], resumed: bool = False):
+            with lock:
+                if error is not None:
+                    stats.files_failed += 1
+                    stats.errors.append((src_file, str(error)))
+                elif resumed:
+                    stats.files_resumed += 1
+                elif skipped:
+                    stats.files_skipped += 1
+                else:
+                    stats.files_copied += 1
+                    stats.bytes_copied += copied_bytes
+                if on_file_done:
+                    try: on_file_done(src_file, error, stats)
+                    except Exception as e: print(f"[CopyEngine] on_file_done callback failed for {src_file}: {e}")
+
+        def copy_one(src_file: str, dst_file: str, rel: str, size: int, mtime_ns: int):
+            try:
+                token.check()
+                # The journal only says the copy once finished; the destination may have been removed or changed since.
+                if journal and journal.is_done(rel, size, mtime_ns) and self._is_up_to_date(dst_file, size, mtime_ns):
+                    finish(src_file, 0, True, None, resumed=True); return
+                self.throttle.acquire(0, 1, token)
+                digest = None
+                if self._is_up_to_date(dst_file, size, mtime_ns):
+                    if not self.verify_hash:
+                        if journal: journal.record(rel, size, mtime_ns)
+                        finish(src_file, 0, True, None); return
+                    digest = file_digest(src_file)
+                    if digest == file_digest(dst_file):
+                        if journal: journal.record(rel, size, mtime_ns, digest)
+                        finish(src_file, 0, True, None); return
+                if size >= self.large_file_threshold:
+                    self._copy_large(src_file, dst_file, token)
+                else:
+                    self.throttle.acquire(size, 0, token)
+                    shutil.copyfile(src_file, dst_file)
+                if self.verify_hash:
+                    digest = digest or file_digest(src_file)
+                    if file_digest(dst_file) != digest:
+                        raise OSError(errno.EIO, "Copied file does not match its source", dst_file)
+                shutil.copystat(src_file, dst_file)
+                if journal: journal.record(rel, size, mtime_ns, digest)
+                finish(src_file, size, False, None)
+            except OperationCancelled:
+                # Not a failure: copy_tree raises once the pools have drained.
+                pass
+            except Exception as e:
+                # Anything else would vanish into the unchecked future and the file would silently go missing.
+                finish(src_file, 0, False, e)
+            finally:
+                in_flight.release()
+
+        initializer = set_low_io_priority if self.low_priority else None
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="copy-small", initializer=initializer) as small_pool, \
+                 ThreadPoolExecutor(max_workers=self.large_workers, thread_name_prefix="copy-large", initializer=initializer) as large_pool:
+                stack = [(src, dst, "")]
+                while stack:
+                    token.check()
+                    src_dir, dst_dir, rel_dir = stack.pop()
+                    os.makedirs(dst_dir, exist_ok=True)
+                    stats.dirs_created += 1
+                    copied_dirs.append((src_dir, dst_dir))
+                    with os.scandir(src_dir) as it:
+                        entries = list(it)
+                    for entry in entries:
+                        dst_path = os.path.join(dst_dir, entry.name)
+                        rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                        try:
+                            if entry.is_dir():
+                                stack.append((entry.path, dst_path, rel))
+                                continue
+                            st = entry.stat()
+                            size = st.st_size
+                        except OSError as e:
+                            with lock: stats.files_discovered += 1
+                            finish(entry.path, 0, False, e); continue
+                        with lock:
+                            stats.files_discovered += 1
+                            stats.bytes_discovered += size
+                        token.check()
+                        in_flight.acquire()
+                        pool = large_pool if size >= self.large_file_threshold else small_pool
+                        pool.submit(copy_one, entry.path, dst_path, rel, size, st.st_mtime_ns)
+                with lock:
+                    stats.walk_complete = True
+            # Files whose workers noticed the cancel after the walk had finished are not counted anywhere.
+            if token.cancelled:
+                raise OperationCancelled()
+        finally:
+            if journal: journal.close()
+
+        for src_dir, dst_dir in reversed(copied_dirs):
+            try: shutil.copystat(src_dir, dst_dir)
+            except OSError as e: print(f"[CopyEngine] Could not copy directory metadata for {dst_dir}: {e}")
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    @staticmethod
+    def _is_up_to_date(dst_file: str, size: int, mtime_ns: int) -> bool:
+        try:
+            st = os.stat(dst_file)
+        except OSError:
+            return False
+        return st.st_size == size and abs(st.st_mtime_ns - mtime_ns) <= MTIME_TOLERANCE_NS
+
+    def _copy_large(self, src_file: str, dst_file: str, token: CancelToken):
+        with open(src_file, 'rb') as fsrc, open(dst_file, 'wb') as fdst:
+            if hasattr(os, "copy_file_range"):
+                try:
+                    while True:
+                        n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), self.buffer_size)
+                        if n <= 0:
+                            break
+                        self.throttle.acquire(n, 0, token)
+                        token.check()
+                    return
+                except OSError as e:
+                    if e.errno not in _COPY_FILE_RANGE_FALLBACK_ERRNOS:
+                        raise
+                    fsrc.seek(0); fdst.seek(0); fdst.truncate()
+            buf = bytearray(self.buffer_size)
+            view = memoryview(buf)
+            while True:
+                token.check()
+                n = fsrc.readinto(buf)
+                if not n:
+                    break
+                fdst.write(view[:n])
+                self.throttle.acquire(n, 0, token)
@@ -0,0 +1,221 @@
+import errno
+import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from cancellation import CancelToken, OperationCancelled
+from io_throttle import IoThrottle, set_low_io_priority
+
+DEFAULT_DELETE_WORKERS = 8
+
+
+class DeleteFailure:
+    PERMISSION = "permission"
+    NOT_EMPTY = "not_empty"
+    OTHER = "other"
+
+    def __init__(self, path: str, is_dir: bool, error: OSError):
+        self.path = path
+        self.is_dir = is_dir
+        self.message = str(error)
+        if isinstance(error, PermissionError):
+            self.kind = self.PERMISSION
+        elif error.errno in (errno.ENOTEMPTY, errno.EEXIST) or getattr(error, "winerror", None) == 145:
+            self.kind = self.NOT_EMPTY
+        else:
+            self.kind = self.OTHER
+
+    def __repr__(self) -> str:
+        return f"DeleteFailure({self.path!r}, {self.kind}, {self.message!r})"
+
+
+class DeleteReport:
+    def __init__(self, root: str):
+        self.root = root
+        self.items_discovered = 0
+        self.files_deleted = 0
+        self.dirs_deleted = 0
+        self.failures: List[DeleteFailure] = []
+        self.elapsed = 0.0
+
+    @property
+    def items_done(self) -> int:
+        return self.files_deleted + self.dirs_deleted + len(self.failures)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def failures_by_kind(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for failure in self.failures:
+            counts[failure.kind] = counts.get(failure.kind, 0) + 1
+        return counts
+
+    def __repr__(self) -> str:
+        return (f"{self.files_deleted} files, {self.dirs_deleted} dirs deleted, {len(self.failures)} failed "
+                f"in {self.elapsed:.2f}s")
+
+
+class DeleteEngine:
+    """Deletes a directory tree bottom-up while it is still being walked.
+
+    The walk uses scandir type information, so nothing is stat'ed twice.
+    Files (and links and junctions, which are removed without following them) are unlinked
+    on a thread pool in per-directory batches; each directory counts its outstanding children and is
+    removed by whichever thread finishes the last one. Read-only files get
+    their write bit set and are retried once. Failures are collected in the
+    returned DeleteReport instead of aborting the delete. token is checked
+    for every directory and file; cancelling it makes delete_tree raise
+    OperationCancelled and leaves the rest of the tree in place. A throttle
+    is charged one operation per file, and low_priority lowers the I/O
+    priority of the worker threads.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_DELETE_WORKERS, batch_size: int = 64,
+                 throttle: Optional[IoThrottle] = None, low_priority: bool = False):
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+        self.throttle = throttle or IoThrottle()
+        self.low_priority = low_priority
+
+    def delete_tree(self, path: str,
+                    on_item_done: Optional[Callable[[str, Optional[DeleteFailure], DeleteReport], None]] = None,
+                    token: Optional[CancelToken] = None) -> DeleteReport:
+        token = token or CancelToken()
+        report = DeleteReport(path)
+        if not os.path.isdir(path) or os.path.islink(path):
+            return report
+        start = time.perf_counter()
+        lock = threading.Lock()
+        pending: Dict[str, int] = {}
+        parents: Dict[str, Optional[str]] = {}
+        unlisted: Set[str] = set()
+
+        def record(item_path: str, is_dir: bool, error: Optional[OSError]):
+            failure = DeleteFailure(item_path, is_dir, error) if error is not None else None
+            with lock:
+                if failure is not None:
+                    report.failures.append(failure)
+                elif is_dir:
+                    report.dirs_deleted += 1
+                else:
+                    report.files_deleted += 1
+                if on_item_done:
+                    try: on_item_done(item_path, failure, report)
+                    except Exception as e: print(f"[DeleteEngine] on_item_done callback failed for {item_path}: {e}")
+
+        def child_done(dir_path: str):
+            while dir_path is not None:
+                with lock:
+                    pending[dir_path] -= 1
+                    if pending[dir_path]:
+                        return
+                    del pending[dir_path]
+                    parent = parents.pop(dir_path)
+                    # A directory that could not be listed is already recorded as failed and is left in place.
+                    listed = dir_path not in unlisted
+                if listed:
+                    record(dir_path, True, self._remove(os.rmdir, dir_path))
+                dir_path = parent
+
+        def unlink_batch(batch: List[Tuple[str, Callable[[str], None]]], parent: str):
+            for item_path, remove_func in batch:
+                token.check()
+                self.throttle.acquire(0, 1, token)
+                record(item_path, False, self._remove(remove_func, item_path))
+            child_done(parent)
+
+        with lock:
+            pending[path] = 1
+            parents[path] = None
+            report.items_discovered = 1
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="delete",
+                                initializer=set_low_io_priority if self.low_priority else None) as pool:
+            stack = [path]
+            while stack:
+                token.check()
+                dir_path = stack.pop()
+                leaves: List[Tuple[str, Callable[[str], None]]] = []
+                subdir_count = 0
+                try:
+                    with os.scandir(dir_path) as it:
+                        for entry in it:
+                            try:
+                                is_link = _is_link(entry)
+                                is_dir = entry.is_dir(follow_symlinks=False) and not is_link
+                            except OSError:
+                                is_link, is_dir = False, False
+                            if is_dir:
+                                with lock:
+                                    pending[dir_path] += 1
+                                    pending[entry.path] = 1
+                                    parents[entry.path] = dir_path
+                                stack.append(entry.path)
+                                subdir_count += 1
+                            else:
+                                # Directory links and junctions are removed with rmdir, never entered.
+                                leaves.append((entry.path, os.rmdir if is_link and _link_is_dir(entry) else os.remove))
+                except OSError as e:
+                    with lock:
+                        unlisted.add(dir_path)
+                    record(dir_path, True, e)
+                batches = [leaves[i:i + self.batch_size] for i in range(0, len(leaves), self.batch_size)]
+                with lock:
+                    report.items_discovered += len(leaves) + subdir_count
+                    pending[dir_path] += len(batches)
+                for batch in batches:
+                    pool.submit(unlink_batch, batch, dir_path)
+                # Releases the listing's own hold on the directory.
+                child_done(dir_path)
+        report.elapsed = time.perf_counter() - start
+        if token.cancelled:
+            raise OperationCancelled()
+        return report
+
+    @staticmethod
+    def _remove(remove_func: Callable[[str], None], item_path: str) -> Optional[OSError]:
+        try:
+            remove_func(item_path)
+            return None
+        except PermissionError as e:
+            try:
+                os.chmod(item_path, stat.S_IWRITE | stat.S_IREAD | (stat.S_IEXEC if remove_func is os.rmdir else 0))
+                remove_func(item_path)
+                return None
+            except OSError:
+                return e
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            return e
+
+
+def _is_link(entry: os.DirEntry) -> bool:
+    """Symlinks, and on Windows every reparse point (junctions, mount points), which must never be entered.
+
+    DirEntry.is_junction() only exists from Python 3.12, and before that a
+    junction passes is_dir(follow_symlinks=False), so the reparse attribute
+    is checked directly.
+    """
+    if entry.is_symlink():
+        return True
+    if os.name != "nt":
+        return False
+    try:
+        return bool(entry.stat(follow_symlinks=False).st_file_attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+    except OSError:
+        return False
+
+
+def _link_is_dir(entry: os.DirEntry) -> bool:
+    # Directory links carry the directory attribute themselves, even when their target is gone.
+    if os.name != "nt":
+        return False
+    try:
+        return bool(entry.stat(follow_symlinks=False).st_file_attributes & stat.FILE_ATTRIBUTE_DIRECTORY)
+    except OSError:
+        return False
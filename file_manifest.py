@@ -0,0 +1,95 @@
+import os
+import sys
+from array import array
+from typing import Iterator, List, Union
+
+from scanner import DirManifest
+
+
+class FileManifest:
+    """Read-only file list of one install location, stored as flat arrays.
+
+    Instead of one absolute path string per file it keeps each relative
+    directory once, a directory index, a size and an offset into a single
+    string holding all file names. Full paths are only built for the rows
+    that are asked for (see page()), so a details dialog showing 100 files
+    does not pay for the other million. Files are ordered by directory,
+    then by name.
+    """
+
+    def __init__(self, root: str = "", dirs: List[str] = None, dir_index: array = None,
+                 sizes: array = None, name_offsets: array = None, names: str = ""):
+        self.root = root
+        self._dirs = dirs or []
+        self._dir_index = dir_index if dir_index is not None else array('I')
+        self._sizes = sizes if sizes is not None else array('q')
+        self._name_offsets = name_offsets if name_offsets is not None else array('Q', [0])
+        self._names = names
+        self.total_size = sum(self._sizes)
+
+    @classmethod
+    def from_dirs(cls, root: str, dirs: DirManifest) -> 'FileManifest':
+        rel_dirs: List[str] = []
+        dir_index = array('I')
+        sizes = array('q')
+        name_offsets = array('Q', [0])
+        name_parts: List[str] = []
+        pos = 0
+        for rel in sorted(dirs):
+            own_files = dirs[rel][1]
+            if not own_files:
+                continue
+            idx = len(rel_dirs)
+            rel_dirs.append(rel)
+            for name in sorted(own_files):
+                dir_index.append(idx)
+                sizes.append(own_files[name])
+                name_parts.append(name)
+                pos += len(name)
+                name_offsets.append(pos)
+        return cls(root, rel_dirs, dir_index, sizes, name_offsets, "".join(name_parts))
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self.path_at(i)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self.path_at(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FileManifest index out of range")
+        return self.path_at(index)
+
+    def name_at(self, index: int) -> str:
+        return self._names[self._name_offsets[index]:self._name_offsets[index + 1]]
+
+    def relative_path_at(self, index: int) -> str:
+        rel_dir = self._dirs[self._dir_index[index]]
+        name = self.name_at(index)
+        return os.path.join(rel_dir, name) if rel_dir else name
+
+    def path_at(self, index: int) -> str:
+        return os.path.join(self.root, self.relative_path_at(index))
+
+    def size_at(self, index: int) -> int:
+        return self._sizes[index]
+
+    def page(self, start: int, count: int) -> List[str]:
+        return self[start:start + count]
+
+    @property
+    def dir_count(self) -> int:
+        return len(self._dirs)
+
+    def nbytes(self) -> int:
+        """Approximate heap footprint of the arrays and strings held."""
+        return (sys.getsizeof(self._names) + sum(sys.getsizeof(d) for d in self._dirs) + sys.getsizeof(self._dirs)
+                + sys.getsizeof(self._dir_index) + sys.getsizeof(self._sizes) + sys.getsizeof(self._name_offsets))
+
+    def __repr__(self) -> str:
+        return f"FileManifest({self.root!r}, {len(self)} files, {self.total_size} bytes)"
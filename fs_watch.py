@@ -0,0 +1,542 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from file_manifest import FileManifest
+from scanner import DirManifest, RACY_MTIME_WINDOW_NS, UNTRUSTED_MTIME, SizeScanner
+
+DEFAULT_SETTLE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 10.0
+DEFAULT_POLL_INTERVAL = 30.0
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_MASK = (IN_MODIFY | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+                | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+# ReadDirectoryChangesW
+FILE_LIST_DIRECTORY = 0x0001
+FILE_SHARE_ALL = 0x00000007
+OPEN_EXISTING = 3
+FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+FILE_NOTIFY_CHANGE_FILE_NAME = 0x001
+FILE_NOTIFY_CHANGE_DIR_NAME = 0x002
+FILE_NOTIFY_CHANGE_SIZE = 0x008
+FILE_NOTIFY_CHANGE_LAST_WRITE = 0x010
+_NOTIFY_INFORMATION = struct.Struct("III")
+_CHANGES_BUFFER_SIZE = 64 * 1024
+_INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+
+class WatchedTree:
+    """Directory manifest of one install location, kept current one directory at a time.
+
+    rescan() re-lists only the directories it is given: new subdirectories
+    are walked, vanished ones are dropped with everything below them, and
+    total_size / file_count are adjusted by the difference instead of being
+    summed again.
+    """
+
+    def __init__(self, root: str, dirs: DirManifest):
+        self.root = root
+        self.dirs = dirs
+        self.total_size = sum(sum(entry[1].values()) for entry in dirs.values())
+        self.file_count = sum(len(entry[1]) for entry in dirs.values())
+        self.changes = 0
+        self.dirs_listed = 0
+
+    def manifest(self) -> FileManifest:
+        return FileManifest.from_dirs(self.root, self.dirs)
+
+    def changed_dirs(self) -> List[str]:
+        """Directories whose mtime no longer matches the manifest; what poll mode rescans.
+
+        A file rewritten in place does not touch its directory's mtime, so
+        only creates, deletes and renames are seen this way.
+        """
+        if not self.dirs:
+            return [""]
+        changed = []
+        for rel, entry in list(self.dirs.items()):
+            try: mtime = os.stat(os.path.join(self.root, rel)).st_mtime_ns
+            except OSError: mtime = None
+            if entry[0] == UNTRUSTED_MTIME or entry[0] != mtime:
+                changed.append(rel)
+        return changed
+
+    def rescan(self, rels: Optional[Iterable[str]] = None,
+               on_new_dir: Optional[Callable[[str], None]] = None,
+               on_dropped_dir: Optional[Callable[[str], None]] = None) -> bool:
+        """Re-lists rels (every known directory when None); True if any file or folder changed.
+
+        A rel the manifest does not know yet is resolved to its nearest known
+        parent, whose listing then finds it. on_new_dir runs before a new
+        directory is listed, so a watch added there cannot miss its contents.
+        """
+        targets: Set[str] = set()
+        for rel in (list(self.dirs) if rels is None else rels):
+            while rel and rel not in self.dirs:
+                rel = os.path.dirname(rel)
+            targets.add(rel)
+        listed: Set[str] = set()
+        changed = False
+        for rel in sorted(targets, key=lambda r: (r.count(os.sep), r) if r else (-1, r)):
+            if rel in listed:
+                continue
+            if rel in self.dirs:
+                changed |= self._rescan_dir(rel, listed, on_new_dir, on_dropped_dir)
+            elif not rel:
+                # The root itself was gone; see whether it is back.
+                changed |= self._walk("", listed, on_new_dir)
+        if changed:
+            self.changes += 1
+        return changed
+
+    def _list_dir(self, rel: str) -> list:
+        path = os.path.join(self.root, rel)
+        mtime = os.stat(path).st_mtime_ns
+        own_files: Dict[str, int] = {}
+        sub_names: List[str] = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        sub_names.append(entry.name)
+                    elif not entry.is_dir():
+                        own_files[entry.name] = entry.stat().st_size
+                except OSError:
+                    pass
+        self.dirs_listed += 1
+        if mtime >= time.time_ns() - RACY_MTIME_WINDOW_NS:
+            mtime = UNTRUSTED_MTIME
+        return [mtime, own_files, sub_names]
+
+    def _set_dir(self, rel: str, entry: list):
+        old = self.dirs.get(rel)
+        if old is not None:
+            self.total_size -= sum(old[1].values())
+            self.file_count -= len(old[1])
+        self.dirs[rel] = entry
+        self.total_size += sum(entry[1].values())
+        self.file_count += len(entry[1])
+
+    def _rescan_dir(self, rel: str, listed: Set[str], on_new_dir, on_dropped_dir) -> bool:
+        old = self.dirs[rel]
+        try:
+            entry = self._list_dir(rel)
+        except (FileNotFoundError, NotADirectoryError):
+            self._drop(rel, on_dropped_dir)
+            return True
+        except OSError as e:
+            print(f"[WatchedTree] Could not list {os.path.join(self.root, rel)}: {e}")
+            return False
+        listed.add(rel)
+        self._set_dir(rel, entry)
+        old_subs, new_subs = set(old[2]), set(entry[2])
+        for name in old_subs - new_subs:
+            self._drop(os.path.join(rel, name) if rel else name, on_dropped_dir, detach=False)
+        for name in entry[2]:
+            child = os.path.join(rel, name) if rel else name
+            if child not in self.dirs:
+                self._walk(child, listed, on_new_dir)
+        return old[1] != entry[1] or old_subs != new_subs
+
+    def _walk(self, rel: str, listed: Set[str], on_new_dir) -> bool:
+        found = False
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            if on_new_dir:
+                on_new_dir(current)
+            try:
+                entry = self._list_dir(current)
+            except OSError:
+                continue
+            found = True
+            listed.add(current)
+            self._set_dir(current, entry)
+            stack.extend(os.path.join(current, name) if current else name for name in entry[2])
+        return found
+
+    def _drop(self, rel: str, on_dropped_dir, detach: bool = True):
+        if detach and rel:
+            # Entries may be shared with the scan cache's manifest, so they are replaced, never edited.
+            parent_rel, name = os.path.dirname(rel), os.path.basename(rel)
+            parent = self.dirs.get(parent_rel)
+            if parent is not None and name in parent[2]:
+                self.dirs[parent_rel] = [parent[0], parent[1], [sub for sub in parent[2] if sub != name]]
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            entry = self.dirs.pop(current, None)
+            if entry is None:
+                continue
+            self.total_size -= sum(entry[1].values())
+            self.file_count -= len(entry[1])
+            stack.extend(os.path.join(current, name) if current else name for name in entry[2])
+            if on_dropped_dir:
+                on_dropped_dir(current)
+
+    def __repr__(self) -> str:
+        return f"WatchedTree({self.root!r}, {len(self.dirs)} dirs, {self.file_count} files, {self.total_size} bytes)"
+
+
+class _InotifySource:
+    """One inotify watch per directory (inotify is not recursive); Linux only."""
+
+    def __init__(self, mark: Callable[[str, Optional[str]], None]):
+        self._mark = mark
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._lock = threading.Lock()
+        # Nested install locations share directories, hence a list of owners per watch.
+        self._owners: Dict[int, List[Tuple[str, str]]] = {}
+        self._watches: Dict[Tuple[str, str], int] = {}
+        self._roots: Dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.failed_watches = 0
+
+    def add_root(self, key: str, root: str):
+        self._roots[key] = root
+        self.watch_dir(key, "")
+
+    def watch_tree(self, key: str, tree: WatchedTree):
+        for rel in list(tree.dirs):
+            if rel:
+                self.watch_dir(key, rel)
+
+    def watch_dir(self, key: str, rel: str):
+        with self._lock:
+            if (key, rel) in self._watches:
+                return
+        path = os.path.join(self._roots[key], rel)
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), INOTIFY_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error not in (2, 20):  # ENOENT, ENOTDIR: gone again already
+                self.failed_watches += 1
+                if self.failed_watches == 1:
+                    print(f"[SizeWatcher] inotify_add_watch failed for {path}: {os.strerror(error)}")
+            return
+        with self._lock:
+            self._watches[(key, rel)] = wd
+            self._owners.setdefault(wd, []).append((key, rel))
+
+    def unwatch_dir(self, key: str, rel: str):
+        with self._lock:
+            wd = self._watches.pop((key, rel), None)
+            owners = self._owners.get(wd)
+            if owners is None:
+                return
+            owners.remove((key, rel))
+            if owners:
+                return
+            del self._owners[wd]
+        self._libc.inotify_rm_watch(self._fd, wd)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="size-watch-inotify", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                readable, _, _ = select.select([self._fd], [], [], 0.5)
+                if not readable:
+                    continue
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                break
+            self._dispatch(data)
+
+    def _dispatch(self, data: bytes):
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            wd, mask, _cookie, name_length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size + name_length
+            if mask & IN_Q_OVERFLOW:
+                for key in list(self._roots):
+                    self._mark(key, None)
+                continue
+            with self._lock:
+                owners = list(self._owners.get(wd, ()))
+                if mask & IN_IGNORED:
+                    for owner in self._owners.pop(wd, ()):
+                        self._watches.pop(owner, None)
+            for key, rel in owners:
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    self._mark(key, os.path.dirname(rel) if rel else "")
+                elif not mask & IN_IGNORED:
+                    self._mark(key, rel)
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(2.0)
+        try: os.close(self._fd)
+        except OSError: pass
+
+
+class _DirectoryChangesSource:
+    """A ReadDirectoryChangesW loop over the whole subtree of each root (Windows only)."""
+
+    def __init__(self, mark: Callable[[str, Optional[str]], None]):
+        self._mark = mark
+        self._kernel32 = ctypes.windll.kernel32
+        self._kernel32.CreateFileW.restype = ctypes.c_void_p
+        self._kernel32.CreateFileW.argtypes = [ctypes.c_wchar_p, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_void_p,
+                                               ctypes.c_uint32, ctypes.c_uint32, ctypes.c_void_p]
+        self._kernel32.ReadDirectoryChangesW.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint32, ctypes.c_int,
+                                                         ctypes.c_uint32, ctypes.POINTER(ctypes.c_uint32),
+                                                         ctypes.c_void_p, ctypes.c_void_p]
+        self._kernel32.CancelIoEx.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        self._kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+        self._handles: Dict[str, int] = {}
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+
+    def add_root(self, key: str, root: str):
+        handle = self._kernel32.CreateFileW(root, FILE_LIST_DIRECTORY, FILE_SHARE_ALL, None, OPEN_EXISTING,
+                                            FILE_FLAG_BACKUP_SEMANTICS, None)
+        if handle is None or handle == _INVALID_HANDLE_VALUE:
+            print(f"[SizeWatcher] Could not open {root} for change notifications: {ctypes.WinError()}")
+            return
+        self._handles[key] = handle
+
+    def watch_tree(self, key: str, tree: WatchedTree):
+        pass
+
+    def watch_dir(self, key: str, rel: str):
+        pass
+
+    def unwatch_dir(self, key: str, rel: str):
+        pass
+
+    def start(self):
+        for key, handle in self._handles.items():
+            thread = threading.Thread(target=self._run, args=(key, handle), name="size-watch-changes", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self, key: str, handle: int):
+        buffer = ctypes.create_string_buffer(_CHANGES_BUFFER_SIZE)
+        returned = ctypes.c_uint32(0)
+        notify_filter = (FILE_NOTIFY_CHANGE_FILE_NAME | FILE_NOTIFY_CHANGE_DIR_NAME
+                         | FILE_NOTIFY_CHANGE_SIZE | FILE_NOTIFY_CHANGE_LAST_WRITE)
+        while not self._stop.is_set():
+            if not self._kernel32.ReadDirectoryChangesW(handle, buffer, len(buffer), True, notify_filter,
+                                                        ctypes.byref(returned), None, None):
+                if not self._stop.is_set():
+                    # Usually the install location itself was deleted or moved.
+                    self._mark(key, "")
+                break
+            if returned.value == 0:
+                # More changes than the buffer holds; only a full rescan is safe.
+                self._mark(key, None)
+                continue
+            data = buffer.raw[:returned.value]
+            offset = 0
+            while True:
+                next_offset, _action, name_length = _NOTIFY_INFORMATION.unpack_from(data, offset)
+                start = offset + _NOTIFY_INFORMATION.size
+                name = data[start:start + name_length].decode("utf-16-le")
+                self._mark(key, os.path.dirname(name))
+                if not next_offset:
+                    break
+                offset += next_offset
+
+    def close(self):
+        self._stop.set()
+        for handle in self._handles.values():
+            self._kernel32.CancelIoEx(handle, None)
+        for thread in self._threads:
+            thread.join(2.0)
+        for handle in self._handles.values():
+            self._kernel32.CloseHandle(handle)
+        self._handles.clear()
+
+
+class SizeWatcher:
+    """Keeps the size and file manifest of many install locations current.
+
+    On Windows every root is watched recursively with ReadDirectoryChangesW;
+    on Linux every directory gets an inotify watch. Other platforms (and
+    either of those, if setting up the notifications fails) poll directory
+    mtimes every poll_interval seconds instead. Events only mark the
+    directory they happened in as dirty. Once no new event has arrived for
+    settle_delay seconds, or max_delay after the first one of a burst that
+    does not settle, the dirty directories are listed again (see
+    WatchedTree.rescan) and on_change receives the trees that changed,
+    on the watcher thread. The first call reports every tree, from the
+    scan made when the watcher starts; `previous` manifests make that scan
+    incremental.
+    """
+
+    def __init__(self, roots: Dict[str, str], on_change: Callable[[Dict[str, WatchedTree]], None],
+                 previous: Optional[Dict[str, DirManifest]] = None,
+                 settle_delay: float = DEFAULT_SETTLE_DELAY, max_delay: float = DEFAULT_MAX_DELAY,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.roots = roots
+        self.on_change = on_change
+        self.previous = previous or {}
+        self.settle_delay = settle_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.mode = "stopped"
+        self.trees: Dict[str, WatchedTree] = {}
+        self.events = 0
+        self.flushes = 0
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, Set[str]] = {}
+        self._pending_full: Set[str] = set()
+        self._first_event = 0.0
+        self._last_event = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._source = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.ready.clear()
+        self._thread = threading.Thread(target=self._run, name="size-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _mark(self, key: str, rel: Optional[str]):
+        """Records an event in rel under root key; None asks for a full rescan of that root."""
+        with self._lock:
+            if rel is None:
+                self._pending_full.add(key)
+            else:
+                self._pending.setdefault(key, set()).add(rel)
+            now = time.monotonic()
+            if not self._first_event:
+                self._first_event = now
+            self._last_event = now
+            self.events += 1
+        self._wake.set()
+
+    def _open_source(self):
+        try:
+            if os.name == "nt":
+                return _DirectoryChangesSource(self._mark)
+            if sys.platform.startswith("linux"):
+                return _InotifySource(self._mark)
+        except Exception as e:
+            print(f"[SizeWatcher] Change notifications unavailable, polling instead: {e}")
+        return None
+
+    def _run(self):
+        source = self._open_source()
+        try:
+            # Watches go up before the scan, so nothing that changes during it is missed.
+            if source:
+                for key, root in self.roots.items():
+                    source.add_root(key, root)
+            results = SizeScanner(collect_files=False, record_dirs=True).scan(self.roots, previous=self.previous)
+            self.trees = {key: WatchedTree(result.root, result.dirs) for key, result in results.items()}
+            self.previous = {}
+            if source:
+                for key, tree in self.trees.items():
+                    source.watch_tree(key, tree)
+                if isinstance(source, _InotifySource):
+                    # Subdirectories were watched only after they were listed; catch up on that gap.
+                    for key, tree in self.trees.items():
+                        for rel in tree.changed_dirs():
+                            self._mark(key, rel)
+                source.start()
+            self._source = source
+            self.mode = "notify" if source else "poll"
+            self.ready.set()
+            if self.trees and not self._stop.is_set():
+                self._report(dict(self.trees))
+
+            while not self._stop.is_set():
+                if not self._wake.wait(self.poll_interval) and self.mode == "poll":
+                    for key, tree in self.trees.items():
+                        for rel in tree.changed_dirs():
+                            self._mark(key, rel)
+                if self._stop.is_set():
+                    break
+                self._wake.clear()
+                while not self._stop.is_set():
+                    with self._lock:
+                        if not self._first_event:
+                            break
+                        now = time.monotonic()
+                        wait_for = min(self._last_event + self.settle_delay, self._first_event + self.max_delay) - now
+                    if wait_for <= 0:
+                        self.flush_now()
+                        break
+                    self._stop.wait(wait_for)
+        finally:
+            self._source = None
+            if source:
+                source.close()
+            self.mode = "stopped"
+            self.ready.set()
+
+    def flush_now(self) -> Dict[str, WatchedTree]:
+        """Rescans whatever is dirty right away and reports the trees that changed."""
+        with self._flush_lock:
+            with self._lock:
+                pending, full = self._pending, self._pending_full
+                self._pending, self._pending_full = {}, set()
+                self._first_event = self._last_event = 0.0
+            source = self._source
+            changed: Dict[str, WatchedTree] = {}
+            for key in set(pending) | full:
+                tree = self.trees.get(key)
+                if tree is None:
+                    continue
+                on_new_dir = (lambda rel, _key=key: source.watch_dir(_key, rel)) if source else None
+                on_dropped_dir = (lambda rel, _key=key: source.unwatch_dir(_key, rel)) if source else None
+                if tree.rescan(None if key in full else pending[key], on_new_dir, on_dropped_dir):
+                    changed[key] = tree
+            self.flushes += 1
+        if changed and not self._stop.is_set():
+            self._report(changed)
+        return changed
+
+    def _report(self, trees: Dict[str, WatchedTree]):
+        try: self.on_change(trees)
+        except Exception as e: print(f"[SizeWatcher] on_change failed: {e}")
+
+    def __repr__(self) -> str:
+        return f"SizeWatcher({len(self.roots)} roots, {self.mode}, {self.events} events, {self.flushes} flushes)"
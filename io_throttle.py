@@ -0,0 +1,249 @@
+import ctypes
+import os
+import platform
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from app_paths import app_data_dir
+from cancellation import CancelToken
+
+# Reservations may run this far ahead of the average rate, so short bursts are not chopped up.
+BURST_SECONDS = 0.1
+# Longest single sleep; the token is checked in between so pause and cancel stay responsive.
+MAX_SLEEP_SLICE = 0.1
+ADAPTIVE_PROBE_INTERVAL = 0.5
+# A probe counts as congested once it is this many times (and this much) slower than the quietest one seen.
+ADAPTIVE_LATENCY_FACTOR = 3.0
+ADAPTIVE_LATENCY_SLACK = 0.005
+# The quietest of the last this many probes is the baseline, so a disk that got slower for good is re-learned.
+ADAPTIVE_BASELINE_PROBES = 60
+ADAPTIVE_BACKOFF = 0.5
+ADAPTIVE_RECOVERY = 1.25
+ADAPTIVE_MIN_BYTES_PER_SECOND = 1024 * 1024
+PROBE_SIZE = 4096
+
+_IOPRIO_CLASS_IDLE = 3
+_IOPRIO_CLASS_SHIFT = 13
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_SET_SYSCALLS = {"x86_64": 251, "amd64": 251, "aarch64": 30, "arm64": 30, "i386": 289, "i686": 289, "armv7l": 314}
+_THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+
+
+def set_low_io_priority() -> bool:
+    """Lowers the I/O priority of the calling thread; returns False where the OS offers no way to.
+
+    Windows puts the thread in background processing mode
+    (THREAD_MODE_BACKGROUND_BEGIN), Linux gives it the idle I/O class, the
+    same as `ionice -c3`. Both only apply to the calling thread, so it is
+    meant as a thread pool initializer.
+    """
+    try:
+        if os.name == "nt":
+            kernel32 = ctypes.windll.kernel32
+            return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), _THREAD_MODE_BACKGROUND_BEGIN))
+        syscall_number = _IOPRIO_SET_SYSCALLS.get(platform.machine().lower())
+        if platform.system() != "Linux" or syscall_number is None:
+            return False
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.syscall(syscall_number, _IOPRIO_WHO_PROCESS, threading.get_native_id(),
+                            _IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT) == 0
+    except (OSError, AttributeError) as e:
+        print(f"[set_low_io_priority] Could not lower I/O priority: {e}")
+        return False
+
+
+def fsync_probe(directory: Optional[str] = None) -> Callable[[], float]:
+    """A latency probe that times a small synchronous write, as a foreground program saving a file would see it.
+
+    The default directory is the app data folder, which is on the system
+    drive the moved programs come from.
+    """
+    directory = directory or app_data_dir()
+    data = os.urandom(PROBE_SIZE)
+
+    def probe() -> float:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"io_probe_{threading.get_ident()}.tmp")
+        start = time.perf_counter()
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        elapsed = time.perf_counter() - start
+        try: os.remove(path)
+        except OSError: pass
+        return elapsed
+
+    return probe
+
+
+class _RateLimiter:
+    """Virtual-clock token bucket: each reservation returns how long its caller should wait."""
+
+    def __init__(self):
+        self.rate = 0.0
+        self._next_free = 0.0
+
+    def reserve(self, amount: float, now: float) -> float:
+        if self.rate <= 0 or amount <= 0:
+            return 0.0
+        self._next_free = max(self._next_free, now) + amount / self.rate
+        return max(0.0, self._next_free - BURST_SECONDS - now)
+
+    def reset(self):
+        self._next_free = 0.0
+
+
+class IoThrottle:
+    """Caps the bytes and operations per second of the copy and delete engines.
+
+    Engines call acquire() before each unit of I/O with its size in bytes and
+    operations; it sleeps as long as needed to keep every caller sharing the
+    throttle under mb_per_second and ops_per_second together (0 means no
+    cap). One throttle can be shared by several engines and parallel moves,
+    and configure() takes effect for the running ones: it drops the backlog
+    reserved at the old limits, and callers already asleep in acquire()
+    wait for their request again at the new ones.
+
+    With adaptive=True a latency probe (fsync_probe by default) runs every
+    ADAPTIVE_PROBE_INTERVAL from inside acquire(). When it is much slower
+    than the quietest of the last ADAPTIVE_BASELINE_PROBES probes, the byte
+    rate is halved, down to
+    ADAPTIVE_MIN_BYTES_PER_SECOND; while probes stay quick it grows again
+    until it reaches the configured cap or stops limiting anything.
+    """
+
+    def __init__(self, mb_per_second: float = 0, ops_per_second: float = 0, adaptive: bool = False,
+                 probe: Optional[Callable[[], float]] = None):
+        self._lock = threading.Lock()
+        # Notified by configure(); sleepers compare _generation to see that the limits changed.
+        self._changed = threading.Condition(self._lock)
+        self._generation = 0
+        self._probe_lock = threading.Lock()
+        self._bytes = _RateLimiter()
+        self._ops = _RateLimiter()
+        self.probe = probe
+        self.bytes_granted = 0
+        self.ops_granted = 0
+        self.waited_seconds = 0.0
+        self.backoffs = 0
+        self.baseline_latency: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self._recent_latencies: deque = deque(maxlen=ADAPTIVE_BASELINE_PROBES)
+        # Byte rate the adaptive mode currently allows; None while it is not limiting.
+        self.adaptive_rate: Optional[float] = None
+        self._next_probe = 0.0
+        self._window_start = 0.0
+        self._window_bytes = 0
+        self.configure(mb_per_second, ops_per_second, adaptive)
+
+    def configure(self, mb_per_second: float = 0, ops_per_second: float = 0, adaptive: bool = False):
+        with self._lock:
+            self.mb_per_second = max(0.0, mb_per_second or 0.0)
+            self.ops_per_second = max(0.0, ops_per_second or 0.0)
+            self.adaptive = adaptive
+            if not adaptive: self.adaptive_rate = None
+            self._apply_rates()
+            self._bytes.reset()
+            self._ops.reset()
+            self._generation += 1
+            self._changed.notify_all()
+
+    @property
+    def limited(self) -> bool:
+        return bool(self.mb_per_second or self.ops_per_second or self.adaptive)
+
+    @property
+    def bytes_per_second(self) -> float:
+        """The byte rate currently enforced, 0 when unlimited."""
+        return self._bytes.rate
+
+    def acquire(self, nbytes: int = 0, ops: int = 0, token: Optional[CancelToken] = None):
+        if not self.limited:
+            return
+        now = time.perf_counter()
+        if self.adaptive and now >= self._next_probe:
+            self._adapt(now)
+        with self._lock:
+            self.bytes_granted += nbytes
+            self.ops_granted += ops
+            self._window_bytes += nbytes
+            delay = max(self._bytes.reserve(nbytes, now), self._ops.reserve(ops, now))
+            generation = self._generation
+        if delay <= 0:
+            return
+        start, deadline = now, now + delay
+        try:
+            while delay > 0:
+                with self._changed:
+                    if generation == self._generation:
+                        self._changed.wait(min(delay, MAX_SLEEP_SLICE))
+                    if generation != self._generation:
+                        # configure() changed the limits: queue up again behind the new rates.
+                        now, generation = time.perf_counter(), self._generation
+                        deadline = now + max(self._bytes.reserve(nbytes, now), self._ops.reserve(ops, now))
+                if token: token.check()
+                delay = deadline - time.perf_counter()
+        finally:
+            with self._lock:
+                self.waited_seconds += time.perf_counter() - start
+
+    def _apply_rates(self):
+        cap = self.mb_per_second * 1024 * 1024
+        if self.adaptive_rate is not None and (not cap or self.adaptive_rate < cap):
+            self._bytes.rate = self.adaptive_rate
+        else:
+            self._bytes.rate = cap
+        self._ops.rate = self.ops_per_second
+
+    def _adapt(self, now: float):
+        # One thread probes at a time; the others carry on at the current rate.
+        if not self._probe_lock.acquire(blocking=False):
+            return
+        try:
+            if now < self._next_probe:
+                return
+            try:
+                latency = (self.probe or self._default_probe())()
+            except OSError as e:
+                print(f"[IoThrottle] Latency probe failed, adaptive throttling is off: {e}")
+                self.configure(self.mb_per_second, self.ops_per_second, adaptive=False)
+                return
+            end = time.perf_counter()
+            with self._lock:
+                elapsed = end - self._window_start if self._window_start else 0.0
+                observed = self._window_bytes / elapsed if elapsed > 0 else 0.0
+                self._window_start, self._window_bytes = end, 0
+                self._next_probe = end + ADAPTIVE_PROBE_INTERVAL
+                self.last_latency = latency
+                self._recent_latencies.append(latency)
+                self.baseline_latency = baseline = min(self._recent_latencies)
+                congested = latency > max(baseline * ADAPTIVE_LATENCY_FACTOR, baseline + ADAPTIVE_LATENCY_SLACK)
+                cap = self.mb_per_second * 1024 * 1024
+                if congested:
+                    current = self.adaptive_rate or observed or cap
+                    if current:
+                        self.adaptive_rate = max(ADAPTIVE_MIN_BYTES_PER_SECOND, current * ADAPTIVE_BACKOFF)
+                        self.backoffs += 1
+                        print(f"[IoThrottle] Probe took {latency * 1000:.1f} ms (quietest {baseline * 1000:.1f} ms), "
+                              f"backing off to {self.adaptive_rate / (1024 * 1024):.1f} MB/s")
+                elif self.adaptive_rate is not None:
+                    self.adaptive_rate *= ADAPTIVE_RECOVERY
+                    # Lifted once it reaches the cap, or once the copy no longer uses half of it.
+                    if (cap and self.adaptive_rate >= cap) or (not cap and observed and self.adaptive_rate > 2 * observed):
+                        self.adaptive_rate = None
+                self._apply_rates()
+        finally:
+            self._probe_lock.release()
+
+    def _default_probe(self) -> Callable[[], float]:
+        self.probe = fsync_probe()
+        return self.probe
+
+    def __repr__(self) -> str:
+        return (f"IoThrottle({self.mb_per_second:g} MB/s, {self.ops_per_second:g} ops/s, adaptive={self.adaptive}, "
+                f"waited {self.waited_seconds:.2f}s, {self.backoffs} back-offs)")
@@ -0,0 +1,119 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set
+
+# A stage posts the programs it has finished at most this often (seconds).
+DELTA_INTERVAL = 0.1
+
+
+class StageTimings:
+    """Milestones of one program load, in milliseconds since it started.
+
+    Every stage records when it started and ended, and when it produced its
+    first result (the first sized program, the first matched shortcut); marks
+    are single points such as "rows_published". Safe to use from several threads.
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.marks: Dict[str, float] = {}
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        with self._lock:
+            self.stages[name] = {"start": self.elapsed_ms()}
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages[name]["end"] = self.elapsed_ms()
+
+    def first_result(self, name: str):
+        with self._lock:
+            times = self.stages.setdefault(name, {})
+            if "first" not in times:
+                times["first"] = self.elapsed_ms()
+
+    def mark(self, name: str):
+        with self._lock:
+            self.marks[name] = self.elapsed_ms()
+
+    def duration_ms(self, name: str) -> Optional[float]:
+        times = self.stages.get(name, {})
+        if "start" not in times or "end" not in times:
+            return None
+        return times["end"] - times["start"]
+
+    def __str__(self) -> str:
+        with self._lock:
+            parts = []
+            for name, times in self.stages.items():
+                text = f"{name} {times.get('start', 0):.0f}-{times['end']:.0f} ms" if "end" in times else f"{name} running"
+                if "first" in times:
+                    text += f" (first at {times['first']:.0f} ms)"
+                parts.append(text)
+            parts.extend(f"{name} at {ms:.0f} ms" for name, ms in self.marks.items())
+            return ", ".join(parts)
+
+
+class DeltaBatcher:
+    """Posts the programs a load stage has finished as ("load_delta", stage, names).
+
+    Names are collected and posted at most every interval seconds, so a stage
+    that finishes thousands of programs sends a handful of messages. A name
+    added after a quiet spell is posted by a timer within interval, without
+    waiting for the next add(); flush() posts the rest when the stage ends.
+    add() may be called from any thread.
+    """
+
+    def __init__(self, progress_queue: queue.Queue, stage: str, timings: Optional[StageTimings] = None,
+                 interval: float = DELTA_INTERVAL):
+        self.progress_queue = progress_queue
+        self.stage = stage
+        self.timings = timings
+        self.interval = interval
+        self.posted = 0
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._last_post = time.monotonic()
+        self._timer: Optional[threading.Timer] = None
+
+    def add(self, name: str):
+        with self._lock:
+            if self.timings and not self.posted and not self._pending:
+                self.timings.first_result(self.stage)
+            self._pending.add(name)
+            wait = self.interval - (time.monotonic() - self._last_post)
+            if wait <= 0:
+                self._post()
+            elif self._timer is None:
+                self._timer = threading.Timer(wait, self._post_due)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._post()
+
+    def _post_due(self):
+        with self._lock:
+            self._timer = None
+            if self._pending:
+                self._post()
+
+    def _post(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        names, self._pending = sorted(self._pending), set()
+        self._last_post = time.monotonic()
+        self.posted += 1
+        self.progress_queue.put(("load_delta", self.stage, names))
@@ -8,12 +8,23 @@ TEXTS = {
         "select_custom_path_dialog_title": "Select Custom Target Path",
         # Menu
         "menu_language": "Language",
+        "menu_options": "Options",
+        "watch_program_sizes": "Keep Sizes Up to Date",
+        "menu_speed_limit": "Move Speed Limit",
+        "speed_unlimited": "Unlimited",
+        "speed_limit_mbps": "{mbps} MB/s",
+        "adaptive_io": "Slow Down When the Disk Is Busy",
+        "low_io_priority": "Low Disk Priority for Moves",
+        "verify_copies": "Verify Copied Files",
         # Buttons
         "refresh_programs": "Refresh Programs",
         "move_selected": "Move Selected Program",
         "delete_source_files": "Delete Source Files",
         "revert_last_move": "Revert Last Move",
         "program_details": "Program Details",
+        "pause": "Pause",
+        "resume": "Resume",
+        "cancel_operation": "Cancel",
         "exit": "Exit",
         "browse": "Browse...",
         "close": "Close",
@@ -25,11 +36,20 @@ TEXTS = {
         "custom_path": "Custom Path:",
         "status_ready": "Ready",
         "status_loading_programs": "Loading programs...",
+        "status_restarting_load": "Stopping the current scan and loading programs again...",
         "status_calculating_sizes": "Calculating sizes...",
         "status_finding_shortcuts": "Finding shortcuts...",
         "status_programs_found": "{count} programs found.",
         "status_moving_program": "Moving {program_name}...",
+        "status_moving_batch": "Moving {count} programs",
+        "status_programs_changed": "Installed programs changed: {updated} updated, {removed} removed ({count} programs).",
+        "status_sizes_changed": "Sizes updated for {count} programs.",
+        "status_batch_progress": "Moved {finished}/{total} programs ({running} running, last: {program_name}) - {mb:.1f} MB at {mb_s:.1f} MB/s",
         "status_reverting_move": "Reverting {program_name}...",
+        "status_paused": "Paused. Press Resume to continue.",
+        "status_cancelling": "Cancelling...",
+        "status_rolling_back_copy": "Removing the partial copy at {target}...",
+        "status_load_cancelled": "Loading programs was cancelled.",
         "status_copying_files": "Copying files...",
         "status_updating_shortcuts": "Updating shortcuts...",
         "status_updating_registry": "Updating registry...",
@@ -69,6 +89,11 @@ TEXTS = {
         "admin_rights_crucial_warning": "Administrator rights are crucial for modifying system locations (Registry, Program Files). Operation might fail without them.",
         "ongoing_operation_warning": "There is an ongoing operation. Please wait for it to complete.",
         "move_successful_msg": "{program_name} moved successfully.",
+        "confirm_batch_move_prompt": "Move {count} programs?\n\n{moves}",
+        "batch_move_conflict_error": "{first} and {second} cannot be moved together because their folders overlap:\n\n{first_source} -> {first_target}\n{second_source} -> {second_target}\n\nMove them one at a time or choose other targets.",
+        "confirm_batch_move_with_delete_warning": "Move {count} programs?\n\n{moves}\n\nWARNING: The source files of every program WILL BE DELETED! This action is irreversible.",
+        "batch_move_summary": "{succeeded} of {total} programs moved ({mb:.1f} MB in {seconds:.1f} s).",
+        "batch_move_failed_item": "\n- {program_name}: {error}",
         "shortcuts_updated_msg": "\n{count} shortcuts updated.",
         "source_deleted_msg": "\nSource files deleted.",
         "source_delete_warning_msg": "\nSource file deletion warning: {warning}",
@@ -88,6 +113,7 @@ TEXTS = {
         "theme_not_found_warning": "Selected theme not found, using default.",
         "size_error_calculating": "Error calculating",
         "status_copy_scan": "Scanning files to copy: {program_name}",
+        "status_resuming_copy": "Resuming an interrupted copy: {count} files already done.",
         "status_copying_file": "Copying ({current}/{total}): {filename}",
         "status_copy_error_file": "{filename} (Error: {error})",
         "status_deleting_file": "Deleting ({current}/{total}): {filename}",
@@ -102,15 +128,26 @@ TEXTS = {
         "status_reverting_registry": "Reverting registry entries...",
         "status_deleting_reverted_source": "Deleting reverted program from its previous location ({location})...",
         "registry_update_requires_admin": "Registry update requires administrator rights.",
-        "registry_permission_denied": "Registry update permission denied for: {key}",
-        "registry_update_error": "Error updating registry key {key}: {error}",
+        "registry_permission_denied": "Registry update permission denied for: {registry_key}",
+        "registry_update_error": "Error updating registry key {registry_key}: {error}",
         "registry_update_failed_all": "Failed to update any registry keys for the program location.",
         "shortcut_scan_init_error": "Could not initialize shortcut scanning (WScript.Shell). Shortcut features disabled.",
         "shortcut_update_permission_error": "Permission denied updating shortcut: {shortcut}",
         "shortcut_update_generic_error": "Error updating shortcut {shortcut}: {error}",
+        "registry_unavailable_error": "The Windows registry is not available on this system; installed programs cannot be listed.",
         "delete_permission_error": "Permission Denied",
         "delete_not_empty_error": "Directory not empty",
+        "delete_failures_summary": "{detail} ({count} items could not be deleted: {permission} permission denied, {not_empty} not empty)",
         "delete_root_failed_error": "Could not delete the main directory ({path}). Files might be locked or permission issues persist.",
+        "delete_cancelled_error": "Deleting {path} was cancelled; the files not deleted yet are still there.",
+        "confirm_cancel_keep_partial": "Cancel the running operation?\n\nYes: cancel and keep the files copied so far, so that running it again continues where it stopped.\nNo: cancel and remove the files copied so far.\nCancel: keep going.",
+        "move_cancelled_msg": "Moving {program_name} was cancelled; the program is still at {location}.",
+        "revert_cancelled_msg": "Reverting {program_name} was cancelled; the program is still at {location}.",
+        "move_not_started_cancelled": "Cancelled before it started.",
+        "partial_copy_removed_msg": "\nThe partial copy at {target} was removed.",
+        "partial_copy_kept_msg": "\nThe files copied so far were kept at {target}; copying there again continues where it stopped.",
+        "partial_copy_existing_msg": "\n{target} existed before, so it was left as it is.",
+        "partial_copy_remove_failed_msg": "\nThe partial copy at {target} could not be removed completely: {error}",
         # pylnk3 related errors
         "pylnk3_not_available_error": "pylnk3 library not found. Shortcut scanning functionality will be unavailable. Please install it using 'pip install pylnk3'.",
         "pylnk3_not_available_error_update": "pylnk3 library not found. Shortcut updating functionality will be unavailable. Please install it using 'pip install pylnk3'."
@@ -122,12 +159,23 @@ TEXTS = {
         "select_custom_path_dialog_title": "Özel Hedef Yol Seçin",
         # Menu
         "menu_language": "Dil",
+        "menu_options": "Seçenekler",
+        "watch_program_sizes": "Boyutları Güncel Tut",
+        "menu_speed_limit": "Taşıma Hız Sınırı",
+        "speed_unlimited": "Sınırsız",
+        "speed_limit_mbps": "{mbps} MB/sn",
+        "adaptive_io": "Disk Meşgulken Yavaşla",
+        "low_io_priority": "Taşımalarda Düşük Disk Önceliği",
+        "verify_copies": "Kopyalanan Dosyaları Doğrula",
         # Buttons
         "refresh_programs": "Programları Yenile",
         "move_selected": "Seçili Programı Taşı",
         "delete_source_files": "Kaynak Dosyaları Sil",
         "revert_last_move": "Son Taşımayı Geri Al",
         "program_details": "Program Detayları",
+        "pause": "Duraklat",
+        "resume": "Devam Et",
+        "cancel_operation": "İptal",
         "exit": "Çıkış",
         "browse": "Gözat...",
         "close": "Kapat",
@@ -139,11 +187,20 @@ TEXTS = {
         "custom_path": "Özel Yol:",
         "status_ready": "Hazır",
         "status_loading_programs": "Programlar yükleniyor...",
+        "status_restarting_load": "Mevcut tarama durduruluyor ve programlar yeniden yükleniyor...",
         "status_calculating_sizes": "Boyutlar hesaplanıyor...",
         "status_finding_shortcuts": "Kısayollar bulunuyor...",
         "status_programs_found": "{count} program bulundu.",
         "status_moving_program": "{program_name} taşınıyor...",
+        "status_moving_batch": "{count} program taşınıyor",
+        "status_programs_changed": "Yüklü programlar değişti: {updated} güncellendi, {removed} kaldırıldı ({count} program).",
+        "status_sizes_changed": "{count} programın boyutu güncellendi.",
+        "status_batch_progress": "{finished}/{total} program taşındı ({running} devam ediyor, son: {program_name}) - {mb:.1f} MB, {mb_s:.1f} MB/sn",
         "status_reverting_move": "{program_name} geri alınıyor...",
+        "status_paused": "Duraklatıldı. Devam etmek için Devam Et'e basın.",
+        "status_cancelling": "İptal ediliyor...",
+        "status_rolling_back_copy": "{target} konumundaki yarım kopya siliniyor...",
+        "status_load_cancelled": "Programların yüklenmesi iptal edildi.",
         "status_copying_files": "Dosyalar kopyalanıyor...",
         "status_updating_shortcuts": "Kısayollar güncelleniyor...",
         "status_updating_registry": "Kayıt Defteri güncelleniyor...",
@@ -183,6 +240,11 @@ TEXTS = {
         "admin_rights_crucial_warning": "Sistem konumlarını (Kayıt Defteri, Program Files) değiştirmek için yönetici hakları kritik öneme sahiptir. Haklar olmadan işlem başarısız olabilir.",
         "ongoing_operation_warning": "Devam eden bir işlem var. Lütfen tamamlanmasını bekleyin.",
         "move_successful_msg": "{program_name} başarıyla taşındı.",
+        "confirm_batch_move_prompt": "{count} program taşınsın mı?\n\n{moves}",
+        "batch_move_conflict_error": "{first} ve {second} klasörleri çakıştığı için birlikte taşınamaz:\n\n{first_source} -> {first_target}\n{second_source} -> {second_target}\n\nBunları tek tek taşıyın veya başka hedefler seçin.",
+        "confirm_batch_move_with_delete_warning": "{count} program taşınsın mı?\n\n{moves}\n\nUYARI: Tüm programların kaynak dosyaları SİLİNECEKTİR! Bu işlem geri alınamaz.",
+        "batch_move_summary": "{total} programdan {succeeded} tanesi taşındı ({seconds:.1f} sn içinde {mb:.1f} MB).",
+        "batch_move_failed_item": "\n- {program_name}: {error}",
         "shortcuts_updated_msg": "\n{count} kısayol güncellendi.",
         "source_deleted_msg": "\nKaynak dosyalar silindi.",
         "source_delete_warning_msg": "\nKaynak dosya silme uyarısı: {warning}",
@@ -202,6 +264,7 @@ TEXTS = {
         "theme_not_found_warning": "Seçilen tema bulunamadı, varsayılan tema kullanılıyor.",
         "size_error_calculating": "Boyut hesaplama hatası",
         "status_copy_scan": "Kopyalanacak dosyalar taranıyor: {program_name}",
+        "status_resuming_copy": "Yarıda kalan kopyalama sürdürülüyor: {count} dosya zaten tamamlanmış.",
         "status_copying_file": "Kopyalanıyor ({current}/{total}): {filename}",
         "status_copy_error_file": "{filename} (Hata: {error})",
         "status_deleting_file": "Siliniyor ({current}/{total}): {filename}",
@@ -216,15 +279,26 @@ TEXTS = {
         "status_reverting_registry": "Kayıt defteri girdileri geri alınıyor...",
         "status_deleting_reverted_source": "Geri alınan programın eski konumu ({location}) siliniyor...",
         "registry_update_requires_admin": "Kayıt Defteri güncellemesi yönetici hakları gerektirir.",
-        "registry_permission_denied": "Kayıt Defteri güncelleme izni reddedildi: {key}",
-        "registry_update_error": "Kayıt Defteri anahtarı güncellenirken hata: {key}: {error}",
+        "registry_permission_denied": "Kayıt Defteri güncelleme izni reddedildi: {registry_key}",
+        "registry_update_error": "Kayıt Defteri anahtarı güncellenirken hata: {registry_key}: {error}",
         "registry_update_failed_all": "Program konumu için herhangi bir Kayıt Defteri anahtarı güncellenemedi.",
         "shortcut_scan_init_error": "Kısayol taraması başlatılamadı (WScript.Shell). Kısayol özellikleri devre dışı.",
         "shortcut_update_permission_error": "Kısayol güncellenirken izin reddedildi: {shortcut}",
         "shortcut_update_generic_error": "Kısayol güncellenirken hata: {shortcut}: {error}",
+        "registry_unavailable_error": "Bu sistemde Windows Kayıt Defteri kullanılamıyor; yüklü programlar listelenemez.",
         "delete_permission_error": "İzin Reddedildi",
         "delete_not_empty_error": "Dizin boş değil",
+        "delete_failures_summary": "{detail} ({count} öğe silinemedi: {permission} izin reddedildi, {not_empty} boş olmayan dizin)",
         "delete_root_failed_error": "Ana dizin ({path}) silinemedi. Dosyalar kilitli olabilir veya izin sorunları devam ediyor olabilir.",
+        "delete_cancelled_error": "{path} silinmesi iptal edildi; henüz silinmeyen dosyalar yerinde duruyor.",
+        "confirm_cancel_keep_partial": "Çalışan işlem iptal edilsin mi?\n\nEvet: iptal et ve şimdiye kadar kopyalanan dosyaları sakla; işlem yeniden çalıştırıldığında kaldığı yerden devam eder.\nHayır: iptal et ve şimdiye kadar kopyalanan dosyaları sil.\nİptal: devam et.",
+        "move_cancelled_msg": "{program_name} taşıması iptal edildi; program hâlâ {location} konumunda.",
+        "revert_cancelled_msg": "{program_name} geri alması iptal edildi; program hâlâ {location} konumunda.",
+        "move_not_started_cancelled": "Başlamadan iptal edildi.",
+        "partial_copy_removed_msg": "\n{target} konumundaki yarım kopya silindi.",
+        "partial_copy_kept_msg": "\nŞimdiye kadar kopyalanan dosyalar {target} konumunda bırakıldı; oraya yeniden kopyalamak kaldığı yerden devam eder.",
+        "partial_copy_existing_msg": "\n{target} önceden vardı, bu yüzden olduğu gibi bırakıldı.",
+        "partial_copy_remove_failed_msg": "\n{target} konumundaki yarım kopya tamamen silinemedi: {error}",
 
         "pylnk3_not_available_error": "pylnk3 kütüphanesi bulunamadı. Kısayol tarama işlevi kullanılamayacak. Lütfen 'pip install pylnk3' ile kurun.",
         "pylnk3_not_available_error_update": "pylnk3 kütüphanesi bulunamadı. Kısayol güncelleme işlevi kullanılamayacak. Lütfen 'pip install pylnk3' ile kurun."
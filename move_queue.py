@@ -0,0 +1,246 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from cancellation import CancelToken
+from locale_strings import get_text
+
+DEFAULT_MAX_PARALLEL_MOVES = 3
+DEFAULT_MOVES_PER_DISK = 2
+
+
+def disk_key(path: str) -> str:
+    """Identifies the physical volume a path lives on: its drive letter, or st_dev where there are none."""
+    drive = os.path.splitdrive(os.path.abspath(path))[0]
+    if drive:
+        return drive.upper()
+    probe = os.path.abspath(path)
+    while not os.path.exists(probe) and os.path.dirname(probe) != probe:
+        probe = os.path.dirname(probe)
+    try:
+        return f"dev:{os.stat(probe).st_dev}"
+    except OSError:
+        return probe
+
+
+def paths_overlap(first: str, second: str) -> bool:
+    """True if the two folders are the same or one lies inside the other."""
+    first = os.path.normcase(os.path.abspath(first)).rstrip("\\/")
+    second = os.path.normcase(os.path.abspath(second)).rstrip("\\/")
+    if first == second:
+        return True
+    shorter, longer = sorted((first, second), key=len)
+    return longer.startswith(shorter + os.sep)
+
+
+def find_conflicts(moves: Sequence[Tuple[str, str]]) -> List[Tuple[int, int]]:
+    """Index pairs of (source, target) moves that must not run in the same batch.
+
+    Two moves conflict when any of their folders overlap: the same or nested
+    targets would merge copies, nested sources would delete each other's
+    files, and a target inside another source would be deleted with it.
+    """
+    conflicts = []
+    for i in range(len(moves)):
+        for j in range(i + 1, len(moves)):
+            if any(paths_overlap(a, b) for a in moves[i] for b in moves[j]):
+                conflicts.append((i, j))
+    return conflicts
+
+
+class MoveJob:
+    PENDING, RUNNING, DONE, FAILED, CANCELLED = "pending", "running", "done", "failed", "cancelled"
+
+    def __init__(self, index: int, program_info: Any, target_path: str, delete_source: bool):
+        self.index = index
+        self.program_info = program_info
+        self.target_path = target_path
+        self.delete_source = delete_source
+        self.source_disk = disk_key(program_info.install_location)
+        self.target_disk = disk_key(target_path)
+        self.state = self.PENDING
+        self.error = ""
+        self.cancelled = False
+        self.warnings: List[str] = []
+        self.shortcuts_updated = 0
+        self.registry_updated = False
+        self.delete_warning: Optional[str] = None
+        self.move_details: Optional[Dict[str, Any]] = None
+        self.files_copied = 0
+        self.bytes_copied = 0
+        self.started_at = 0.0
+        self.finished_at = 0.0
+
+    @property
+    def disks(self) -> set:
+        return {self.source_disk, self.target_disk}
+
+    def overlaps(self, other: 'MoveJob') -> bool:
+        folders = (self.program_info.install_location, self.target_path)
+        return any(paths_overlap(a, b) for a in folders for b in (other.program_info.install_location, other.target_path))
+
+    @property
+    def elapsed(self) -> float:
+        if not self.started_at:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def __repr__(self) -> str:
+        return f"MoveJob({self.program_info.name!r}, {self.source_disk}->{self.target_disk}, {self.state})"
+
+
+class _JobSink:
+    """Stands in for progress_queue for a single job and folds its messages into the MoveJob."""
+
+    def __init__(self, batch: 'MoveQueue', job: MoveJob):
+        self.batch = batch
+        self.job = job
+
+    def put(self, message: tuple, block: bool = True, timeout: Any = None):
+        msg_type, payload = message[0], message[1:]
+        job = self.job
+        if msg_type == "progress_copy":
+            job.files_copied = payload[0]
+            if len(payload) > 3:
+                job.bytes_copied = payload[3]
+            self.batch._report_progress(job)
+        elif msg_type == "finished_move":
+            _, job.shortcuts_updated, job.registry_updated, job.delete_warning, job.move_details = payload
+        elif msg_type == "error":
+            job.error = payload[0]
+        elif msg_type == "cancelled":
+            job.error = payload[0]
+            job.cancelled = True
+        elif msg_type == "warning":
+            job.warnings.append(payload[0])
+            self.batch._forward(message)
+        elif msg_type == "delete_error":
+            self.batch._forward(message)
+
+    put_nowait = put
+
+
+class MoveQueue:
+    """Runs a batch of moves, overlapping jobs that sit on different disks.
+
+    Each job is one ordinary move_func call (copy, shortcuts, registry,
+    optional delete), so the per-program steps are unchanged. The scheduler
+    keeps at most max_parallel jobs running and at most per_disk jobs
+    touching any one disk, and prefers the pending job whose disks are the
+    least busy. Jobs whose folders overlap (see find_conflicts) are never
+    run at the same time; callers should reject such batches up front, this
+    only keeps a missed one from copying into a running job. Progress is
+    reported to progress_queue as one aggregated ("progress_batch", ...)
+    message and the batch ends with
+    ("finished_batch", jobs). Once token is cancelled no further job starts;
+    those left are marked cancelled (move_func is expected to watch the same
+    token for the running ones).
+    """
+
+    def __init__(self, move_func: Callable[[Any, str, bool, Any], None],
+                 max_parallel: int = DEFAULT_MAX_PARALLEL_MOVES, per_disk: int = DEFAULT_MOVES_PER_DISK,
+                 token: Optional[CancelToken] = None):
+        self.move_func = move_func
+        self.token = token or CancelToken()
+        self.max_parallel = max(1, max_parallel)
+        self.per_disk = max(1, per_disk)
+        self.jobs: List[MoveJob] = []
+        self._cond = threading.Condition()
+        self._progress_queue = None
+        self._disk_load: Dict[str, int] = {}
+        self._running = 0
+        self._running_jobs: List[MoveJob] = []
+        self._started_at = 0.0
+        self.elapsed = 0.0
+
+    def add(self, program_info: Any, target_path: str, delete_source: bool = False) -> MoveJob:
+        job = MoveJob(len(self.jobs), program_info, target_path, delete_source)
+        self.jobs.append(job)
+        return job
+
+    @property
+    def bytes_copied(self) -> int:
+        return sum(job.bytes_copied for job in self.jobs)
+
+    @property
+    def mb_per_second(self) -> float:
+        elapsed = self.elapsed or (time.perf_counter() - self._started_at if self._started_at else 0.0)
+        return self.bytes_copied / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+
+    def count(self, state: str) -> int:
+        return sum(1 for job in self.jobs if job.state == state)
+
+    def run(self, progress_queue: Any) -> List[MoveJob]:
+        """Blocks until every job has finished; meant to be the target of a worker thread."""
+        self._progress_queue = progress_queue
+        self._started_at = time.perf_counter()
+        pending = list(self.jobs)
+        threads = []
+        with self._cond:
+            while pending or self._running:
+                if self.token.cancelled:
+                    for job in pending:
+                        job.state = MoveJob.CANCELLED
+                        job.cancelled = True
+                        job.error = get_text("move_not_started_cancelled")
+                    pending = []
+                    if not self._running: break
+                job = self._next_job(pending) if self._running < self.max_parallel else None
+                if job is None:
+                    self._cond.wait()
+                    continue
+                pending.remove(job)
+                self._running += 1
+                self._running_jobs.append(job)
+                for disk in job.disks:
+                    self._disk_load[disk] = self._disk_load.get(disk, 0) + 1
+                job.state = MoveJob.RUNNING
+                job.started_at = time.perf_counter()
+                thread = threading.Thread(target=self._run_job, args=(job,), daemon=True)
+                threads.append(thread)
+                thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - self._started_at
+        print(f"[MoveQueue] {self.count(MoveJob.DONE)}/{len(self.jobs)} moved, {self.count(MoveJob.CANCELLED)} cancelled, "
+              f"{self.bytes_copied / (1024 * 1024):.1f} MB in {self.elapsed:.2f}s ({self.mb_per_second:.1f} MB/s)")
+        progress_queue.put(("finished_batch", list(self.jobs)))
+        return self.jobs
+
+    def _next_job(self, pending: List[MoveJob]) -> Optional[MoveJob]:
+        best, best_load = None, None
+        for job in pending:
+            loads = [self._disk_load.get(disk, 0) for disk in job.disks]
+            if max(loads) >= self.per_disk or any(job.overlaps(running) for running in self._running_jobs):
+                continue
+            load = sum(loads)
+            if best is None or load < best_load:
+                best, best_load = job, load
+        return best
+
+    def _run_job(self, job: MoveJob):
+        try:
+            self.move_func(job.program_info, job.target_path, job.delete_source, _JobSink(self, job))
+        except Exception as e:
+            print(f"[MoveQueue] Error moving {job.program_info.name}: {e}")
+            job.error = job.error or str(e)
+        job.finished_at = time.perf_counter()
+        with self._cond:
+            if job.move_details is not None and not job.error: job.state = MoveJob.DONE
+            else: job.state = MoveJob.CANCELLED if job.cancelled else MoveJob.FAILED
+            self._running -= 1
+            self._running_jobs.remove(job)
+            for disk in job.disks:
+                self._disk_load[disk] -= 1
+            self._cond.notify_all()
+        self._report_progress(job)
+
+    def _report_progress(self, job: MoveJob):
+        finished = self.count(MoveJob.DONE) + self.count(MoveJob.FAILED) + self.count(MoveJob.CANCELLED)
+        self._forward(("progress_batch", finished, len(self.jobs), self.count(MoveJob.RUNNING),
+                       job.program_info.name, self.bytes_copied, self.mb_per_second))
+
+    def _forward(self, message: tuple):
+        if self._progress_queue is not None:
+            self._progress_queue.put(message)
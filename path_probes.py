@@ -0,0 +1,66 @@
+import os
+import threading
+from typing import Callable, Dict
+
+
+class PathProbeCache:
+    """Memoizes os.path.exists for one refresh.
+
+    Uninstall keys point at the same few vendor folders and executables
+    over and over, and on redirected profiles every probe is a network round
+    trip. Each path is stat'ed at most once, and once a directory is known
+    to be missing nothing below it is probed at all. Lookups are
+    case-insensitive, like the file systems the paths come from.
+    """
+
+    def __init__(self, exists: Callable[[str], bool] = os.path.exists):
+        self._exists = exists
+        self._lock = threading.Lock()
+        self._known: Dict[str, bool] = {}
+        self.probes = 0
+        self.cache_hits = 0
+        self.missing_parent_hits = 0
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normpath(path).casefold()
+
+    def exists(self, path: str) -> bool:
+        if not path:
+            return False
+        key = self._key(path)
+        with self._lock:
+            known = self._known.get(key)
+            if known is not None:
+                self.cache_hits += 1
+                return known
+            parent = os.path.dirname(key)
+            while parent and parent != key:
+                if self._known.get(parent) is False:
+                    self.missing_parent_hits += 1
+                    self._known[key] = False
+                    return False
+                key_above = os.path.dirname(parent)
+                if key_above == parent:
+                    break
+                parent = key_above
+            self.probes += 1
+        result = self._exists(path)
+        with self._lock:
+            self._known[key] = result
+            if result:
+                # Every parent of an existing path exists too.
+                parent = os.path.dirname(key)
+                while parent and parent not in self._known:
+                    self._known[parent] = True
+                    if os.path.dirname(parent) == parent:
+                        break
+                    parent = os.path.dirname(parent)
+        return result
+
+    @property
+    def saved(self) -> int:
+        return self.cache_hits + self.missing_parent_hits
+
+    def __repr__(self) -> str:
+        return f"{self.probes} probes, {self.saved} saved ({self.cache_hits} cached, {self.missing_parent_hits} under missing folders)"
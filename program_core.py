@@ -0,0 +1,891 @@
+import ntpath
+import os
+import re
+import ctypes
+import datetime
+import queue
+import threading
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Collection, Dict, List, Tuple, Optional, Any
+try:
+    import pylnk3 
+    PYLNK_AVAILABLE = True
+except ImportError:
+    PYLNK_AVAILABLE = False
+    print("[ProgramManager] Warning: pylnk3 library not found. Shortcut functionality will be limited.")
+from locale_strings import get_text
+from scanner import DirManifest, ScanQueue, SizeScanner, ScanResult
+from scan_cache import ScanCache
+from file_manifest import FileManifest
+from shortcuts import InstallLocationIndex, ShortcutParsePool, find_shortcut_files
+from copy_engine import CopyEngine, CopyJournal, CopyStats, default_journal_path
+from delete_engine import DeleteEngine, DeleteFailure, DeleteReport
+from move_queue import MoveJob, MoveQueue, find_conflicts
+from registry import HKCU, HKLM, UNINSTALL_ROOTS, RegistryBackend, default_registry
+from path_probes import PathProbeCache
+from registry_watch import RegistryDelta
+from fs_watch import SizeWatcher, WatchedTree
+from load_pipeline import DeltaBatcher, StageTimings
+from cancellation import CancelToken, OperationCancelled
+from io_throttle import IoThrottle
+
+UNINSTALL_EXE_PATTERN = re.compile(r'"?(.*?\w+\.exe)"?', re.IGNORECASE)
+VERSION_PART_PATTERN = re.compile(r'\d+|[^\W\d_]+')
+
+def is_admin() -> bool:
+    try:
+        return ctypes.windll.shell32.IsUserAnAdmin()
+    except:
+        return False
+
+def first_missing_dir(path: str) -> Optional[str]:
+    """The outermost directory that creating path would create, or None if path already exists."""
+    if os.path.exists(path): return None
+    missing = os.path.abspath(path)
+    parent = os.path.dirname(missing)
+    while parent != missing and not os.path.exists(parent):
+        missing, parent = parent, os.path.dirname(parent)
+    return missing
+
+def drive_target_location(install_location: str, drive: str) -> str:
+    """Where a move to a bare drive such as "D:" puts the program, as the UI resolves it.
+
+    A program on C: keeps its path relative to the drive root; from any other
+    drive it goes to <drive>\\<its folder name>.
+    """
+    source_drive, rest = ntpath.splitdrive(install_location.rstrip('\\/'))
+    root = drive.upper() + "\\"
+    if source_drive.upper() == "C:":
+        return ntpath.join(root, rest.lstrip('\\/'))
+    return ntpath.join(root, ntpath.basename(rest))
+
+def uninstall_key_order(key_path: str) -> Tuple[int, str]:
+    """Sort key placing a registry key path by its UNINSTALL_ROOTS root, then by name."""
+    folded = key_path.casefold()
+    for index, (root_name, subkey_path) in enumerate(UNINSTALL_ROOTS):
+        if folded.startswith(f"{root_name}\\{subkey_path}\\".casefold()):
+            return index, folded
+    return len(UNINSTALL_ROOTS), folded
+
+def format_size(size_bytes) -> str:
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size_bytes < 1024.0: return f"{size_bytes:.2f} {unit}"
+        size_bytes /= 1024.0
+    return f"{size_bytes:.2f} PB"
+
+def parse_version(version: str) -> Tuple[Tuple[int, Any], ...]:
+    """Comparable form of a version string: "10.2" sorts after "9.11", numbers before words in the same place."""
+    return tuple((0, int(part)) if part.isdigit() else (1, part.casefold()) for part in VERSION_PART_PATTERN.findall(version or ""))
+
+def parse_install_date(install_date: str) -> Optional[datetime.date]:
+    try:
+        return datetime.date.fromisoformat(install_date) if install_date else None
+    except ValueError:
+        return None
+
+class ProgramInfo:
+    def __init__(self, name: str, version: str = "", install_location: str = "",
+                 install_date: str = "", size: str = "Unknown", publisher: str = ""):
+        self.name = name
+        self.version = version
+        self.install_location = install_location
+        self.install_date = install_date
+        self.size = size
+        self.publisher = publisher
+        # Typed forms of size, install_date and version for sorting; size stays None until measured.
+        self.size_bytes: Optional[int] = None
+        self.install_date_value = parse_install_date(install_date)
+        self.version_tuple = parse_version(version)
+        self.files: FileManifest = FileManifest(install_location)
+        self.registry_keys: List[str] = []
+        self.shortcuts: List[str] = []
+        # Executable an inferred install_location depends on; checked lazily by ProgramManager.
+        self.location_probe = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'version': self.version,
+            'install_location': self.install_location,
+            'install_date': self.install_date,
+            'size': self.size,
+            'size_bytes': self.size_bytes,
+            'publisher': self.publisher,
+            'files': self.files,
+            'file_count': len(self.files),
+            'registry_keys': list(self.registry_keys),
+            'shortcuts': list(self.shortcuts)
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> 'ProgramInfo':
+        info = ProgramInfo(
+            name=data.get('name', ''),
+            version=data.get('version', ''),
+            install_location=data.get('install_location', ''),
+            install_date=data.get('install_date', ''),
+            size=data.get('size', 'Unknown'),
+            publisher=data.get('publisher', '')
+        )
+        info.size_bytes = data.get('size_bytes')
+        return info
+
+class ProgramManager:
+    def __init__(self, scan_cache: Optional[ScanCache] = None, registry: Optional[RegistryBackend] = None):
+        self.programs: Dict[str, ProgramInfo] = {}
+        # None where there is no registry at all (non-Windows without a stand-in backend).
+        self.registry = registry if registry is not None else default_registry()
+        self.last_error = ""
+        self.scan_cache = scan_cache
+        self.verify_copies = False
+        # Shared by every copy and delete, so parallel moves stay under the caps together.
+        self.io_throttle = IoThrottle()
+        self.low_io_priority = False
+        self.last_delete_report: Optional[DeleteReport] = None
+        self.path_probes = PathProbeCache()
+        # Parsed shortcut targets by path: ((mtime_ns, size), target); lets registry deltas skip re-parsing.
+        self.shortcut_targets: Dict[str, Tuple[Tuple[int, int], Optional[str]]] = {}
+        # Directory manifests by normcase'd install location, kept only for watch mode.
+        self.keep_dir_manifests = False
+        self.dir_manifests: Dict[str, DirManifest] = {}
+        self.size_watcher: Optional[SizeWatcher] = None
+        self.load_timings: Optional[StageTimings] = None
+        # Order of the size scan of the running load; None when no load is running.
+        self.size_queue: Optional[ScanQueue] = None
+
+    def get_installed_programs_threaded(self, progress_queue: queue.Queue, token: Optional[CancelToken] = None) -> Dict[str, ProgramInfo]:
+        """Loads all programs in stages, publishing them before sizes and shortcuts are known.
+
+        Posts ("programs_loaded", programs) once the registry has been read, then
+        ("load_delta", "sizes" | "shortcuts", names) as those stages finish
+        programs, and ("finished_load", programs) at the end. The dict is not
+        changed after programs_loaded; later stages only update its ProgramInfo
+        objects. Stage latencies are kept in load_timings.
+
+        Sizes follow prioritize_sizes(). Pausing token holds the size and
+        shortcut stages; cancelling it (or cancel_load()) stops the load early
+        with ("load_cancelled",) instead of finished_load.
+        """
+        timings = self.load_timings = StageTimings()
+        progress_queue.put(("status", "Program bilgileri aliniyor..."))
+        if self.registry is None:
+            self.last_error = get_text("registry_unavailable_error")
+            progress_queue.put(("error", self.last_error))
+            return {}
+        token = token or CancelToken()
+        scan_queue = self.size_queue = ScanQueue(token)
+        # A new dict rather than clear(): the UI may still be showing the previous one.
+        self.programs = {}
+        self.dir_manifests.clear()
+        self.path_probes = PathProbeCache()
+        if self.scan_cache: self.scan_cache.begin_refresh()
+        with timings.stage("registry"):
+            self._enumerate_uninstall_keys(progress_queue)
+        progress_queue.put(("programs_loaded", self.programs))
+        timings.mark("rows_published")
+
+        sizes = DeltaBatcher(progress_queue, "sizes", timings)
+        shortcuts = DeltaBatcher(progress_queue, "shortcuts", timings)
+        try:
+            progress_queue.put(("status", "Program boyutlari hesaplaniyor..."))
+            with timings.stage("sizes"):
+                self._get_program_sizes(progress_queue, on_program_done=sizes.add, scan_queue=scan_queue)
+            sizes.flush()
+            token.check()
+
+            progress_queue.put(("status", "Kisayollar bulunuyor..."))
+            with timings.stage("shortcuts"):
+                self._find_program_shortcuts(progress_queue, on_program_done=shortcuts.add, token=token)
+            shortcuts.flush()
+        except OperationCancelled:
+            sizes.flush()
+            shortcuts.flush()
+            # A partial refresh must not prune the cache; keep what was scanned and stop.
+            if self.scan_cache:
+                self.scan_cache.save()
+                self.scan_cache.release()
+            self.size_queue = None
+            print(f"[get_installed_programs_threaded] Load cancelled after {scan_queue.started} sizes, stages: {timings}")
+            progress_queue.put(("load_cancelled",))
+            return self.programs
+
+        if self.scan_cache:
+            with timings.stage("cache_save"):
+                self.scan_cache.end_refresh()
+                self.scan_cache.save()
+                self.scan_cache.release()
+
+        print(f"[get_installed_programs_threaded] Path probes: {self.path_probes}")
+        self.size_queue = None
+        print(f"[get_installed_programs_threaded] {len(self.programs)} programs, stages: {timings}")
+        progress_queue.put(("finished_load", self.programs))
+        return self.programs
+
+    def prioritize_sizes(self, selected: Collection[str], visible: Collection[str], matched: Collection[str]):
+        """Sizes the selected programs first, then the visible rows, then the search matches, then the rest.
+
+        Only reorders the programs of the running load that are not sized yet.
+        """
+        scan_queue = self.size_queue
+        if scan_queue is not None:
+            scan_queue.prioritize(selected, visible, matched)
+
+    def cancel_load(self):
+        """Stops the size scan of the running load; get_installed_programs_threaded then returns early."""
+        scan_queue = self.size_queue
+        if scan_queue is not None:
+            scan_queue.cancel()
+
+    def apply_registry_delta(self, delta: RegistryDelta, progress_queue: queue.Queue) -> Tuple[List[str], List[str]]:
+        """Updates self.programs for the changed uninstall keys only, then sizes and matches shortcuts for those programs.
+
+        A program built from several keys is rebuilt from all of its remaining
+        keys, so a changed InstallLocation or DisplayName in any of them applies.
+        """
+        self.path_probes = PathProbeCache()
+        stale_keys = set(delta.removed + delta.changed)
+        fresh = []
+        for key_path in delta.added + delta.changed:
+            root_name, subkey_full_path = key_path.split('\\', 1)
+            program_info = self._read_program_key(root_name, subkey_full_path)
+            if program_info is not None: fresh.append(program_info)
+
+        # Programs owning a stale key, or sharing a display name with a fresh one, are rebuilt.
+        affected = {name for name, info in self.programs.items() if stale_keys.intersection(info.registry_keys)}
+        affected.update(info.name for info in fresh if info.name in self.programs)
+        rebuilt = list(fresh)
+        for name in affected:
+            for key_path in self.programs.pop(name).registry_keys:
+                if key_path in stale_keys: continue
+                root_name, subkey_full_path = key_path.split('\\', 1)
+                program_info = self._read_program_key(root_name, subkey_full_path)
+                if program_info is not None: rebuilt.append(program_info)
+        # Merged in the order a full load reads the keys, so ties resolve the same way.
+        for program_info in sorted(rebuilt, key=lambda info: uninstall_key_order(info.registry_keys[0])):
+            self._merge_program(program_info)
+
+        updated = {info.name for info in rebuilt}
+        removed = affected - updated
+        updated_names = sorted(name for name in updated if name in self.programs)
+        if updated_names:
+            self._get_program_sizes(progress_queue, updated_names)
+            self._find_program_shortcuts(progress_queue, updated_names)
+        print(f"[apply_registry_delta] {delta}: {len(updated_names)} programs updated, {len(removed)} removed")
+        progress_queue.put(("programs_changed", updated_names, sorted(removed)))
+        return updated_names, sorted(removed)
+
+    def _enumerate_uninstall_keys(self, progress_queue: queue.Queue):
+        # The uninstall roots are independent and winreg releases the GIL, so they are read
+        # concurrently; results are merged in UNINSTALL_ROOTS order, as the sequential loop did.
+        lock = threading.Lock()
+        processed = [0]
+
+        def report_progress():
+            with lock:
+                processed[0] += 1
+                if processed[0] % 20 == 0: progress_queue.put(("progress_programs", processed[0]))
+
+        def read_root(root_name: str, subkey_path: str) -> List[ProgramInfo]:
+            try:
+                key = self.registry.open_key(root_name, subkey_path)
+            except OSError:
+                return []
+            try:
+                return self._process_registry_key(key, root_name, subkey_path, report_progress)
+            finally:
+                self.registry.close_key(key)
+
+        with ThreadPoolExecutor(max_workers=len(UNINSTALL_ROOTS), thread_name_prefix="registry") as pool:
+            futures = [pool.submit(read_root, root_name, subkey_path) for root_name, subkey_path in UNINSTALL_ROOTS]
+            for future in futures:
+                for program_info in future.result():
+                    self._merge_program(program_info)
+        progress_queue.put(("progress_programs", processed[0]))
+
+    def _merge_program(self, program_info: ProgramInfo):
+        # Several uninstall keys can share a display name; the entry with an install location wins.
+        name = program_info.name
+        if name in self.programs:
+            if not self._resolve_install_location(self.programs[name]) and self._resolve_install_location(program_info):
+                program_info.registry_keys = list(set(self.programs[name].registry_keys + program_info.registry_keys))
+                self.programs[name] = program_info
+            else:
+                self.programs[name].registry_keys = list(set(self.programs[name].registry_keys + program_info.registry_keys))
+        else:
+            self.programs[name] = program_info
+
+    def _process_registry_key(self, key: Any, root_name: str, subkey_path: str, report_progress: Callable[[], None]) -> List[ProgramInfo]:
+        found = []
+        try:
+            subkey_names = self.registry.subkey_names(key)
+        except OSError as e:
+            print(f"[_process_registry_key] Could not enumerate {root_name}\\{subkey_path}: {e}")
+            return found
+        for subkey_name in subkey_names:
+            program_info = self._read_program_key(root_name, f"{subkey_path}\\{subkey_name}")
+            if program_info is not None:
+                found.append(program_info)
+                report_progress()
+        return found
+
+    def _read_program_key(self, root_name: str, subkey_full_path: str) -> Optional[ProgramInfo]:
+        registry_key_path = f"{root_name}\\{subkey_full_path}"
+        try:
+            subkey = self.registry.open_key(root_name, subkey_full_path)
+        except OSError: return None
+        except Exception as e:
+            print(f"[_read_program_key] Unexpected error opening {subkey_full_path}: {e}")
+            return None
+
+        try:
+            values = None
+            last_write = None
+            if self.scan_cache:
+                last_write = self.registry.last_write_time(subkey)
+                values = self.scan_cache.get_registry_values(registry_key_path, last_write)
+            if values is None:
+                values = self._read_uninstall_values(subkey) or {}
+                if self.scan_cache: self.scan_cache.put_registry_values(registry_key_path, last_write, values)
+            if not values: return None
+
+            program_info = ProgramInfo(values['name'], version=values.get('version', ''), install_date=values.get('install_date', ''),
+                                       publisher=values.get('publisher', ''))
+            if values.get('install_location'):
+                 program_info.install_location = values['install_location']
+                 program_info.location_probe = values.get('location_probe', '')
+            program_info.registry_keys.append(registry_key_path)
+            return program_info
+        except Exception as e:
+            print(f"[_read_program_key] Error reading values for key {subkey_full_path}: {e}")
+            return None
+        finally:
+             self.registry.close_key(subkey)
+
+    def _read_uninstall_values(self, subkey: Any) -> Optional[Dict[str, str]]:
+        # One EnumValue pass instead of a QueryValueEx per field; value names are case-insensitive.
+        raw = {name.lower(): data for name, data in self.registry.values(subkey).items()}
+        return self._parse_uninstall_values(raw)
+
+    @staticmethod
+    def _parse_uninstall_values(raw: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        name = raw.get("displayname")
+        if not name or not isinstance(name, str) or name.strip() == "": return None
+        if raw.get("systemcomponent") == 1: return None
+        if str(raw.get("releasetype") or "").lower() in ["security update", "update rollup", "hotfix"]: return None
+
+        values = {'name': name}
+        if "displayversion" in raw: values['version'] = raw["displayversion"]
+        if "publisher" in raw: values['publisher'] = raw["publisher"]
+
+        # The first of these values that exists decides, even when it is empty.
+        install_location = ""
+        if "installlocation" in raw:
+            install_location = raw["installlocation"]
+        elif "installpath" in raw:
+            install_location = raw["installpath"]
+        elif "displayicon" in raw:
+            cleaned_path = str(raw["displayicon"]).split(',')[0].strip('"')
+            if cleaned_path.lower().endswith(".exe"):
+                install_location = os.path.dirname(cleaned_path)
+                values['location_probe'] = cleaned_path
+        elif isinstance(raw.get("uninstallstring"), str):
+            match = UNINSTALL_EXE_PATTERN.search(raw["uninstallstring"])
+            if match:
+                exe_path = match.group(1).strip('"')
+                install_location = os.path.dirname(exe_path)
+                values['location_probe'] = exe_path
+
+        if install_location and isinstance(install_location, str):
+             values['install_location'] = os.path.normpath(install_location.strip('"'))
+        else:
+             values.pop('location_probe', None)
+
+        date_str = raw.get("installdate")
+        if isinstance(date_str, str) and len(date_str) == 8:
+            values['install_date'] = f"{date_str[0:4]}-{date_str[4:6]}-{date_str[6:8]}"
+        return values
+
+    def _resolve_install_location(self, info: ProgramInfo) -> str:
+        """Runs the deferred probe of an inferred location, dropping it if the executable is gone."""
+        if info.location_probe:
+            if not self.path_probes.exists(info.location_probe):
+                info.install_location = ""
+            info.location_probe = ""
+        return info.install_location
+
+    def _get_program_sizes(self, progress_queue: queue.Queue, names: Optional[Collection[str]] = None,
+                           on_program_done: Optional[Callable[[str], None]] = None, scan_queue: Optional[ScanQueue] = None):
+        # on_program_done(name) is called, possibly from scanner threads, for each program whose row changed.
+        programs = self.programs if names is None else {name: self.programs[name] for name in names if name in self.programs}
+        total_programs = len(programs)
+        roots = {}
+        for name, info in programs.items():
+            had_location = bool(info.install_location)
+            if self._resolve_install_location(info) and self.path_probes.exists(info.install_location):
+                roots[name] = info.install_location
+            elif had_location and not info.install_location and on_program_done:
+                on_program_done(name)
+        skipped_count = total_programs - len(roots)
+        if skipped_count:
+            progress_queue.put(("progress_sizes", skipped_count, total_programs))
+
+        previous = {}
+        if self.scan_cache:
+            for name, location in roots.items():
+                manifest = self.scan_cache.get_manifest(location)
+                if manifest is not None: previous[name] = manifest
+
+        def on_root_done(name: str, result: ScanResult, completed: int, _total_roots: int):
+            info = self.programs[name]
+            info.size_bytes = result.total_size
+            info.size = self._format_size(result.total_size)
+            info.files = FileManifest.from_dirs(result.root, result.dirs)
+            if self.scan_cache:
+                self.scan_cache.put_manifest(result.root, result.dirs)
+            if self.keep_dir_manifests:
+                self.dir_manifests[os.path.normcase(result.root)] = result.dirs
+            if on_program_done: on_program_done(name)
+            processed_count = skipped_count + completed
+            if processed_count % 5 == 0 or processed_count == total_programs:
+                progress_queue.put(("progress_sizes", processed_count, total_programs))
+
+        try:
+            SizeScanner(collect_files=False, record_dirs=True).scan(roots, on_root_done, previous, scan_queue)
+        except Exception as e:
+            print(f"[_get_program_sizes] Size scan failed: {e}")
+            for name in roots:
+                if self.programs[name].size == "Unknown":
+                    self.programs[name].size = "Error calculating"
+                    if on_program_done: on_program_done(name)
+
+    def start_size_watch(self, progress_queue: queue.Queue, names: Optional[Collection[str]] = None) -> SizeWatcher:
+        """Watches the install locations of the programs (all, or names) and keeps their sizes current.
+
+        Changed programs are posted as ("sizes_changed", names). The manifests
+        kept by _get_program_sizes (keep_dir_manifests) or by a previous
+        watcher make the watcher's first scan incremental.
+        """
+        self.stop_size_watch()
+        programs = self.programs if names is None else {name: self.programs[name] for name in names if name in self.programs}
+        roots = {name: info.install_location for name, info in programs.items()
+                 if info.install_location and not info.location_probe and os.path.isdir(info.install_location)}
+        previous = {name: self.dir_manifests[os.path.normcase(location)] for name, location in roots.items()
+                    if os.path.normcase(location) in self.dir_manifests}
+
+        def on_change(trees: Dict[str, WatchedTree]):
+            changed = []
+            for name, tree in trees.items():
+                info = self.programs.get(name)
+                if info is None or info.install_location != tree.root: continue
+                if not tree.changes and tree.total_size == info.files.total_size and tree.file_count == len(info.files): continue
+                info.size_bytes = tree.total_size
+                info.size = self._format_size(tree.total_size)
+                info.files = tree.manifest()
+                changed.append(name)
+            if changed:
+                print(f"[start_size_watch] Sizes changed for {len(changed)} programs ({self.size_watcher})")
+                progress_queue.put(("sizes_changed", sorted(changed)))
+
+        self.size_watcher = SizeWatcher(roots, on_change, previous)
+        self.size_watcher.start()
+        return self.size_watcher
+
+    def stop_size_watch(self):
+        watcher, self.size_watcher = self.size_watcher, None
+        if watcher is None: return
+        watcher.stop()
+        if self.keep_dir_manifests:
+            for tree in watcher.trees.values():
+                self.dir_manifests[os.path.normcase(tree.root)] = tree.dirs
+
+    def _format_size(self, size_bytes):
+        return format_size(size_bytes)
+
+    def _find_program_shortcuts(self, progress_queue: queue.Queue, names: Optional[Collection[str]] = None,
+                                on_program_done: Optional[Callable[[str], None]] = None, token: Optional[CancelToken] = None):
+        def env_path(var: str, *parts: str) -> str:
+            base = os.environ.get(var, "")
+            return os.path.join(base, *parts) if base else ""
+
+        # The APPDATA and USERPROFILE Start Menu entries usually name the same tree;
+        # find_shortcut_files collapses duplicate and nested roots before walking.
+        shortcut_locations = [
+            (env_path("USERPROFILE", "Desktop"), -1),
+            (env_path("ALLUSERSPROFILE", "Desktop"), -1),
+            (env_path("APPDATA", "Microsoft", "Windows", "Start Menu"), -1),
+            (env_path("PROGRAMDATA", "Microsoft", "Windows", "Start Menu"), -1),
+            (env_path("USERPROFILE", "AppData", "Roaming", "Microsoft", "Windows", "Start Menu", "Programs"), -1),
+            (os.environ.get("ProgramFiles", "C:\\Program Files"), 3),
+            (os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)"), 3)
+        ]
+        all_lnk_files, walk_stats = find_shortcut_files(shortcut_locations)
+        print(f"[_find_program_shortcuts] Shortcut walk: {walk_stats}")
+
+        total_shortcuts_to_check = len(all_lnk_files)
+        processed_shortcuts = 0
+        # With names, only those programs are (re)matched; the others keep their shortcuts.
+        programs = self.programs if names is None else {name: self.programs[name] for name in names if name in self.programs}
+        for program_info in programs.values(): program_info.shortcuts.clear()
+
+        if not PYLNK_AVAILABLE:
+            progress_queue.put(("warning", get_text("pylnk3_not_available_error")))
+            progress_queue.put(("progress_shortcuts", total_shortcuts_to_check, total_shortcuts_to_check))
+            return
+
+        # Every program goes into the index, so a shortcut of a nested program outside names is not handed to its parent.
+        location_index = InstallLocationIndex.from_programs(self.programs)
+
+        def match_shortcut(shortcut_path: str, target_path: Optional[str]):
+            nonlocal processed_shortcuts
+            if token: token.check()
+            if target_path:
+                program_name = location_index.longest_match(target_path)
+                if program_name in programs:
+                    programs[program_name].shortcuts.append(shortcut_path)
+                    if on_program_done: on_program_done(program_name)
+            processed_shortcuts += 1
+            if processed_shortcuts % 20 == 0 or processed_shortcuts == total_shortcuts_to_check:
+                progress_queue.put(("progress_shortcuts", processed_shortcuts, total_shortcuts_to_check))
+
+        if names is None:
+            self.shortcut_targets = {path: self.shortcut_targets[path] for path in all_lnk_files if path in self.shortcut_targets}
+        to_parse = []
+        cache_stamps = {}
+        for shortcut_path in all_lnk_files:
+            try: st = os.stat(shortcut_path)
+            except OSError:
+                match_shortcut(shortcut_path, None); continue
+            stamp = (st.st_mtime_ns, st.st_size)
+            known = self.shortcut_targets.get(shortcut_path)
+            if known is not None and known[0] == stamp:
+                match_shortcut(shortcut_path, known[1]); continue
+            if self.scan_cache:
+                cached = self.scan_cache.get_shortcut_target(shortcut_path, *stamp)
+                if cached is not None:
+                    self.shortcut_targets[shortcut_path] = (stamp, cached['target'])
+                    match_shortcut(shortcut_path, cached['target']); continue
+            cache_stamps[shortcut_path] = stamp
+            to_parse.append(shortcut_path)
+
+        try:
+            # closing() shuts the parse pool down at once when a cancel stops the loop.
+            with closing(ShortcutParsePool().parse(to_parse)) as parsed:
+                for shortcut_path, target_path in parsed:
+                    stamp = cache_stamps[shortcut_path]
+                    self.shortcut_targets[shortcut_path] = (stamp, target_path)
+                    if self.scan_cache: self.scan_cache.put_shortcut_target(shortcut_path, *stamp, target_path)
+                    match_shortcut(shortcut_path, target_path)
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            print(f"[_find_program_shortcuts] Error parsing shortcuts: {e}")
+            progress_queue.put(("progress_shortcuts", total_shortcuts_to_check, total_shortcuts_to_check))
+
+        for program_info in programs.values(): program_info.shortcuts.sort()
+
+    def _copy_directory(self, src: str, dst: str, progress_queue: queue.Queue, expected_files: int = 0,
+                        token: Optional[CancelToken] = None) -> CopyStats:
+        def on_file_done(src_file: str, error: Optional[Exception], stats: CopyStats):
+            current, total = stats.files_done, max(stats.estimated_total_files, 1)
+            if error is None:
+                progress_queue.put(("progress_copy", current, total, os.path.basename(src_file), stats.bytes_copied))
+            else:
+                print(f"[_copy_directory] Skipping file {src_file}: {error}")
+                progress_queue.put(("progress_copy", current, total, f"{os.path.basename(src_file)} (Hata: {error})", stats.bytes_copied))
+
+        journal = CopyJournal(default_journal_path(src, dst), src, dst)
+        resumed_count = journal.load()
+        if resumed_count:
+            progress_queue.put(("status", "status_resuming_copy", {'count': resumed_count}))
+
+        try:
+            engine = CopyEngine(verify_hash=self.verify_copies, throttle=self.io_throttle, low_priority=self.low_io_priority)
+            stats = engine.copy_tree(src, dst, on_file_done, expected_files=expected_files, journal=journal, token=token)
+        except OperationCancelled:
+            # A kept partial copy keeps its journal, so copying to the same place again resumes it.
+            if not token.keep_partial: journal.discard()
+            raise
+        print(f"[_copy_directory] {src} -> {dst}: {stats}")
+        if stats.files_failed == 0:
+            journal.discard()
+        return stats
+
+    def _update_shortcuts(self, program_info_shortcuts: List[str], old_location: str, new_location: str, progress_queue: queue.Queue) -> Tuple[int, List[str]]:
+        updated_count = 0
+        updated_shortcut_paths = []
+        total_shortcuts_to_update = len(program_info_shortcuts)
+        processed_count = 0
+
+        if not PYLNK_AVAILABLE:
+            progress_queue.put(("warning", get_text("pylnk3_not_available_error_update")))
+            progress_queue.put(("progress_update_shortcuts", total_shortcuts_to_update, total_shortcuts_to_update))
+            return 0, []
+
+        for shortcut_path in program_info_shortcuts:
+            try:
+                lnk = pylnk3.Lnk(shortcut_path)
+                old_target = lnk.path
+
+                if old_target and old_target.lower().startswith(old_location.lower()):
+                    new_target_corrected = new_location + old_target[len(old_location):]
+
+                    if os.path.exists(new_target_corrected):
+                        lnk.path = new_target_corrected
+                        lnk.work_dir = os.path.dirname(new_target_corrected)
+                        lnk.save()
+
+                        updated_count += 1
+                        updated_shortcut_paths.append(shortcut_path)
+                    else:
+                        print(f"[_update_shortcuts] Target {new_target_corrected} doesn't exist for {shortcut_path}")
+            except PermissionError as pe:
+                print(f"[_update_shortcuts] Permission error saving shortcut {shortcut_path}: {pe}")
+                progress_queue.put(("warning", get_text("shortcut_update_permission_error", shortcut=shortcut_path)))
+            except Exception as e:
+                print(f"[_update_shortcuts] Error: {e} for {shortcut_path}")
+                progress_queue.put(("warning", get_text("shortcut_update_generic_error", shortcut=shortcut_path, error=str(e))))
+            processed_count +=1
+            progress_queue.put(("progress_update_shortcuts", processed_count, total_shortcuts_to_update))
+        return updated_count, updated_shortcut_paths
+
+    def _delete_directory(self, path: str, progress_queue: queue.Queue, token: Optional[CancelToken] = None) -> bool:
+        def on_item_done(item_path: str, failure: Optional[DeleteFailure], report: DeleteReport):
+            if failure is None:
+                progress_queue.put(("progress_delete", report.items_done, max(report.items_discovered, 1), os.path.basename(item_path)))
+
+        try:
+            report = DeleteEngine(throttle=self.io_throttle, low_priority=self.low_io_priority).delete_tree(path, on_item_done, token)
+        except OperationCancelled:
+            print(f"[_delete_directory] Cancelled: {path}")
+            self.last_error = get_text("delete_cancelled_error", path=path)
+            return False
+        print(f"[_delete_directory] {path}: {report}")
+        if report.failures:
+            detail_keys = {DeleteFailure.PERMISSION: "delete_permission_error", DeleteFailure.NOT_EMPTY: "delete_not_empty_error"}
+            for failure in report.failures[:20]:
+                print(f"[_delete_directory]   {failure.kind}: {failure.path}: {failure.message}")
+            first = report.failures[0]
+            first_detail = get_text(detail_keys[first.kind]) if first.kind in detail_keys else first.message
+            by_kind = report.failures_by_kind()
+            progress_queue.put(("delete_error", os.path.basename(first.path), get_text(
+                "delete_failures_summary", count=len(report.failures), detail=first_detail,
+                permission=by_kind.get(DeleteFailure.PERMISSION, 0), not_empty=by_kind.get(DeleteFailure.NOT_EMPTY, 0))))
+        self.last_delete_report = report
+
+        if os.path.exists(path):
+             self.last_error = get_text("delete_root_failed_error", path=path)
+             return False
+        return True
+
+    def _update_registry_location(self, registry_keys: List[str], new_location: str, progress_queue: queue.Queue) -> bool:
+        updated_at_least_one = False
+        if self.registry is None:
+            progress_queue.put(("warning", get_text("registry_unavailable_error")))
+            return False
+        if self.registry.requires_admin and not is_admin():
+            progress_queue.put(("warning", get_text("registry_update_requires_admin")))
+            return False
+
+        for key_path_str in registry_keys:
+            try:
+                root_str, sub_path = key_path_str.split('\\', 1)
+                if root_str not in (HKLM, HKCU):
+                    print(f"[_update_registry_location] Unknown root key in path: {key_path_str}"); continue
+
+                key = self.registry.open_key(root_str, sub_path, write=True)
+                try: self.registry.set_value(key, "InstallLocation", new_location)
+                finally: self.registry.close_key(key)
+                updated_at_least_one = True
+            except FileNotFoundError:
+                print(f"[_update_registry_location] Registry key not found (continuing): {key_path_str}")
+            except PermissionError:
+                print(f"[_update_registry_location] Permission denied for key: {key_path_str}")
+                progress_queue.put(("warning", get_text("registry_permission_denied", registry_key=key_path_str)))
+            except Exception as e:
+                print(f"[_update_registry_location] Error updating registry key {key_path_str}: {e}")
+                progress_queue.put(("warning", get_text("registry_update_error", registry_key=key_path_str, error=str(e))))
+
+        if not updated_at_least_one:
+             progress_queue.put(("warning", get_text("registry_update_failed_all")))
+        return updated_at_least_one
+
+    def _roll_back_copy(self, target: str, created_dir: Optional[str], token: CancelToken, progress_queue: queue.Queue) -> str:
+        """Removes what a cancelled copy created and returns a sentence telling what is left at target.
+
+        created_dir is the outermost folder that did not exist when the copy
+        started. Only target itself is deleted; the folders above it up to
+        created_dir are removed only while empty, since other moves of the
+        same batch may have copied into them since.
+        """
+        if token.keep_partial:
+            return get_text("partial_copy_kept_msg", target=target)
+        if created_dir is None:
+            return get_text("partial_copy_existing_msg", target=target)
+        progress_queue.put(("status", get_text("status_rolling_back_copy", target=target)))
+        if not self._delete_directory(target, progress_queue):
+            return get_text("partial_copy_remove_failed_msg", target=target, error=self.last_error)
+        created_dir = os.path.normcase(os.path.abspath(created_dir))
+        parent = os.path.abspath(target)
+        while os.path.normcase(parent) != created_dir:
+            next_parent = os.path.dirname(parent)
+            if next_parent == parent: break
+            parent = next_parent
+            try: os.rmdir(parent)
+            except OSError: break
+        return get_text("partial_copy_removed_msg", target=target)
+
+    def move_program_threaded(self, program_info: ProgramInfo, target_path_input: str, delete_source: bool, progress_queue: queue.Queue,
+                              token: Optional[CancelToken] = None):
+        """Copies the program, switches its shortcuts and registry keys over, then deletes the source if asked.
+
+        Cancelling token during the copy rolls it back (unless token.keep_partial)
+        and posts ("cancelled", message). Once the copy is complete the move is
+        finished; a cancel then only stops the source delete.
+        """
+        token = token or CancelToken()
+        self.last_error = ""
+        shortcuts_updated_count = 0
+        updated_shortcut_paths_for_revert = []
+
+        original_location = program_info.install_location
+        if not original_location or not os.path.exists(original_location):
+            self.last_error = "Program konumu bulunamadi veya geçerli değil"; progress_queue.put(("error", self.last_error)); return
+        if not original_location.startswith(("C:", "c:")):
+            self.last_error = "Program C sürücüsünde değil"; progress_queue.put(("error", self.last_error)); return
+        if original_location.strip().upper() in ("C:", "C:\\"):
+            self.last_error = "Geçersiz program konumu"; progress_queue.put(("error", self.last_error)); return
+
+        new_location = ""
+        if len(target_path_input) == 2 and target_path_input[1] == ':':
+            new_location = drive_target_location(original_location, target_path_input)
+        else:
+            new_location = target_path_input
+
+        if not new_location: self.last_error = "Hedef yol belirlenemedi."; progress_queue.put(("error", self.last_error)); return
+        if new_location.lower() == original_location.lower(): self.last_error = "Kaynak ve hedef yollar ayni."; progress_queue.put(("error", self.last_error)); return
+
+        try:
+            created_dir = first_missing_dir(new_location)
+            progress_queue.put(("status", f"{program_info.name} kopyalaniyor: {original_location} -> {new_location}"))
+            try:
+                self._copy_directory(original_location, new_location, progress_queue, expected_files=len(program_info.files), token=token)
+            except OperationCancelled:
+                self.last_error = get_text("move_cancelled_msg", program_name=program_info.name, location=original_location)
+                detail = self._roll_back_copy(new_location, created_dir, token, progress_queue)
+                print(f"[move_program_threaded] Cancelled: {self.last_error}{detail}")
+                progress_queue.put(("cancelled", self.last_error + detail))
+                return
+
+            if not os.path.exists(new_location) or not os.path.isdir(new_location):
+                self.last_error = "Kopyalama sonrasi doğrulama başarisiz."; progress_queue.put(("error", self.last_error)); return
+
+            progress_queue.put(("status", "Kisayollar güncelleniyor..."))
+            shortcuts_updated_count, updated_shortcut_paths_for_revert = self._update_shortcuts(list(program_info.shortcuts), original_location, new_location, progress_queue)
+
+            progress_queue.put(("status", get_text("status_updating_registry")))
+            registry_updated = self._update_registry_location(program_info.registry_keys, new_location, progress_queue)
+
+            source_deletion_warning = None
+            if delete_source:
+                progress_queue.put(("status", get_text("status_deleting_source")))
+                if not self._delete_directory(original_location, progress_queue, token):
+                    source_deletion_warning = self.last_error
+
+            last_move_details = {
+                'program_name': program_info.name,
+                'original_location': original_location,
+                'new_location': new_location,
+                'registry_keys': list(program_info.registry_keys),
+                'program_info_snapshot_dict': program_info.to_dict(),
+                'source_deleted_during_move': delete_source,
+                'source_actually_deleted': delete_source and not os.path.exists(original_location),
+                'updated_shortcut_paths_during_move': updated_shortcut_paths_for_revert,
+                'registry_updated_during_move': registry_updated
+            }
+            progress_queue.put(("finished_move", True, shortcuts_updated_count, registry_updated, source_deletion_warning, last_move_details))
+
+        except Exception as e:
+            error_msg = str(e)
+            print(f"[move_program_threaded] Error: {error_msg}")
+            self.last_error = f"Taşima sirasinda hata: {error_msg}"
+            progress_queue.put(("error", self.last_error))
+
+    def batch_conflict_error(self, moves: List[Tuple[ProgramInfo, str]]) -> str:
+        """Names the first two moves whose folders overlap, or returns "" when the batch can run."""
+        conflicts = find_conflicts([(info.install_location, target) for info, target in moves])
+        if not conflicts:
+            return ""
+        (first, first_target), (second, second_target) = moves[conflicts[0][0]], moves[conflicts[0][1]]
+        return get_text("batch_move_conflict_error", first=first.name, second=second.name,
+                        first_source=first.install_location, first_target=first_target,
+                        second_source=second.install_location, second_target=second_target)
+
+    def move_programs_threaded(self, moves: List[Tuple[ProgramInfo, str]], delete_source: bool, progress_queue: queue.Queue,
+                               token: Optional[CancelToken] = None) -> List[MoveJob]:
+        token = token or CancelToken()
+        batch = MoveQueue(lambda info, target, delete, sink: self.move_program_threaded(info, target, delete, sink, token), token=token)
+        for program_info, target_path in moves:
+            batch.add(program_info, target_path, delete_source)
+        progress_queue.put(("status", "status_moving_batch", {'count': len(moves)}))
+        return batch.run(progress_queue)
+
+    def revert_move_threaded(self, last_move_info: Dict[str, Any], progress_queue: queue.Queue, token: Optional[CancelToken] = None):
+        token = token or CancelToken()
+        self.last_error = ""
+        program_name = last_move_info['program_name']
+        original_loc = last_move_info['original_location']
+        current_loc = last_move_info['new_location']
+        shortcuts_to_revert = last_move_info['updated_shortcut_paths_during_move']
+        source_actually_deleted_during_move = last_move_info['source_actually_deleted']
+        registry_updated_during_move = last_move_info.get('registry_updated_during_move', False)
+        registry_keys_to_revert = last_move_info.get('registry_keys', [])
+
+        progress_queue.put(("status", get_text("status_reverting_move_prep", program_name=program_name)))
+
+        try:
+            progress_queue.put(("status", f"Dosyalar geri kopyalaniyor: {current_loc} -> {original_loc}"))
+            snapshot = last_move_info.get('program_info_snapshot_dict', {})
+            snapshot_files = snapshot.get('files')
+            expected_files = len(snapshot_files) if snapshot_files else snapshot.get('file_count', 0)
+            created_dir = first_missing_dir(original_loc)
+            try:
+                self._copy_directory(current_loc, original_loc, progress_queue, expected_files=expected_files, token=token)
+            except OperationCancelled:
+                self.last_error = get_text("revert_cancelled_msg", program_name=program_name, location=current_loc)
+                detail = self._roll_back_copy(original_loc, created_dir, token, progress_queue)
+                print(f"[revert_move_threaded] Cancelled: {self.last_error}{detail}")
+                progress_queue.put(("cancelled", self.last_error + detail))
+                return
+
+            if not os.path.exists(original_loc) or not os.path.isdir(original_loc):
+                self.last_error = "Geri kopyalama sonrasi doğrulama başarisiz."
+                progress_queue.put(("error", self.last_error)); return
+
+            progress_queue.put(("status", get_text("status_reverting_shortcuts")))
+            reverted_shortcuts_count, _ = self._update_shortcuts(list(shortcuts_to_revert), current_loc, original_loc, progress_queue)
+
+            registry_reverted = False
+            if registry_updated_during_move:
+                progress_queue.put(("status", get_text("status_reverting_registry")))
+                registry_reverted = self._update_registry_location(registry_keys_to_revert, original_loc, progress_queue)
+            else:
+                registry_reverted = True
+
+            delete_current_loc_warning = None
+            if source_actually_deleted_during_move:
+                progress_queue.put(("status", get_text("status_deleting_reverted_source", location=current_loc)))
+                if not self._delete_directory(current_loc, progress_queue, token):
+                    delete_current_loc_warning = self.last_error
+
+            progress_queue.put(("finished_revert", True, reverted_shortcuts_count, registry_reverted, delete_current_loc_warning))
+
+        except Exception as e:
+            error_msg = str(e)
+            print(f"[revert_move_threaded] Error: {error_msg}")
+            self.last_error = f"Geri alma sirasinda hata: {error_msg}"
+            progress_queue.put(("error", self.last_error))
+
+    def get_last_error(self) -> str:
+        return self.last_error
@@ -0,0 +1,406 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from program_core import ProgramInfo
+from search_index import SearchIndex
+
+COLUMNS = ("name", "publisher", "version", "size", "install_date", "location")
+# One frame at 60 Hz: a keystroke that takes longer than this is felt as lag.
+KEYSTROKE_BUDGET_MS = 16.0
+# Keystrokes closer together than this are filtered once, for the last one.
+SEARCH_DEBOUNCE_MS = 120
+RESULT_POLL_MS = 10
+TEXT_COLUMNS = {"name": "name", "publisher": "publisher", "location": "install_location"}
+
+SHIFT_MASK = 0x0001
+CONTROL_MASK = 0x0004
+DEFAULT_ROW_HEIGHT = 20
+DEFAULT_HEADER_HEIGHT = 25
+
+
+def row_values(info: ProgramInfo) -> Tuple[str, ...]:
+    return (info.name, info.publisher, info.version, info.size, info.install_date, info.install_location)
+
+
+def sort_key(info: ProgramInfo, column: str) -> tuple:
+    """Typed key for column; missing values (unknown size, no version) sort below every other value."""
+    if column == "size":
+        value = info.size_bytes
+    elif column == "version":
+        value = info.version_tuple or None
+    elif column == "install_date":
+        value = info.install_date_value
+    else:
+        value = getattr(info, TEXT_COLUMNS[column]).casefold() or None
+    return (0,) if value is None else (1, value)
+
+
+class ProgramListModel:
+    """Sorted and filtered list of program names behind the program tree; no tkinter.
+
+    order holds every program in the current sort order and rows the ones
+    that match the search text, in the same order. The selection is kept
+    here as well, since most selected rows may not exist in the widget.
+    Filtering goes through `index` once one has been built for programs.
+    Sort keys come from the typed fields of ProgramInfo (see sort_key) and
+    are kept per column until the program changes.
+    """
+
+    def __init__(self):
+        self.programs: Dict[str, ProgramInfo] = {}
+        self.order: List[str] = []
+        self.rows: List[str] = []
+        self.search_text = ""
+        self.sort_column: Optional[str] = None
+        self.sort_reverse = False
+        self.selected: Set[str] = set()
+        self.index: Optional[SearchIndex] = None
+        self.updates = 0
+        self._sort_keys: Dict[str, Dict[str, tuple]] = {}
+
+    @staticmethod
+    def matches(info: ProgramInfo, search_text: str) -> bool:
+        return (search_text in info.name.lower() or
+                search_text in (info.publisher.lower() if info.publisher else "") or
+                search_text in (info.version.lower() if info.version else ""))
+
+    def set_programs(self, programs: Dict[str, ProgramInfo]):
+        self.programs = programs
+        self.index = None
+        self._sort_keys.clear()
+        self.order = list(programs)
+        self.selected &= programs.keys()
+        if self.sort_column:
+            self._sort()
+        self._filter()
+
+    def set_filter(self, search_text: str) -> bool:
+        search_text = search_text.lower()
+        if search_text == self.search_text:
+            return False
+        self.search_text = search_text
+        self._filter()
+        return True
+
+    def apply_matches(self, search_text: str, matched: Set[str]):
+        """Filters by a match set computed elsewhere (SearchIndex.search) for search_text."""
+        self.search_text = search_text.lower()
+        self.rows = [name for name in self.order if name in matched] if self.search_text else list(self.order)
+
+    def sort_by(self, column: str, reverse: bool):
+        self.sort_column, self.sort_reverse = column, reverse
+        self._sort()
+        self._filter()
+
+    def update(self, updated_names: List[str], removed_names: List[str]):
+        removed = set(removed_names)
+        self.selected -= removed
+        self.updates += 1
+        for keys in self._sort_keys.values():
+            for name in removed.union(updated_names):
+                keys.pop(name, None)
+        if self.index is not None:
+            self.index.update(self.programs, updated_names, removed)
+        self.order = [name for name in self.order if name not in removed and name in self.programs]
+        known = set(self.order)
+        self.order.extend(name for name in updated_names if name in self.programs and name not in known)
+        if self.sort_column:
+            self._sort()
+        self._filter()
+
+    def values(self, name: str) -> Tuple[str, ...]:
+        info = self.programs.get(name)
+        return row_values(info) if info is not None else (name, "", "", "", "", "")
+
+    def selection(self) -> List[str]:
+        if not self.selected:
+            return []
+        return [name for name in self.rows if name in self.selected]
+
+    def _filter(self):
+        search_text = self.search_text
+        if not search_text:
+            self.rows = list(self.order)
+            return
+        if self.index is not None:
+            self.apply_matches(search_text, self.index.search(search_text))
+            return
+        programs = self.programs
+        self.rows = [name for name in self.order if name in programs and self.matches(programs[name], search_text)]
+
+    def _sort(self):
+        column = self.sort_column
+        keys = self._sort_keys.setdefault(column, {})
+        programs = self.programs
+        for name in self.order:
+            if name not in keys:
+                info = programs.get(name)
+                keys[name] = sort_key(info, column) if info is not None else (0,)
+        self.order.sort(key=keys.__getitem__, reverse=self.sort_reverse)
+
+
+class VirtualTreeview:
+    """Shows only the visible window of a ProgramListModel in a ttk.Treeview.
+
+    The widget holds about one screenful of rows, named by program name.
+    The scrollbar, mouse wheel and arrow keys move `offset` over
+    model.rows, and render() diffs the wanted window against the rows on
+    screen: only rows that left or entered the window are deleted or
+    inserted, and only rows whose values changed are updated. Each call
+    that re-renders is timed against budget_ms; the totals are kept in
+    `stats` and calls over budget are printed.
+
+    show() builds a SearchIndex on a worker thread. filter_later() waits
+    for typing to pause for debounce_ms, runs the query on that thread and
+    applies the matches on the Tk thread once they are in.
+    """
+
+    def __init__(self, tree, scrollbar, model: Optional[ProgramListModel] = None,
+                 budget_ms: float = KEYSTROKE_BUDGET_MS, debounce_ms: int = SEARCH_DEBOUNCE_MS):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.model = model or ProgramListModel()
+        self.budget_ms = budget_ms
+        self.debounce_ms = debounce_ms
+        self.offset = 0
+        self.capacity = 30
+        self.row_height = DEFAULT_ROW_HEIGHT
+        self.header_height = DEFAULT_HEADER_HEIGHT
+        self.stats = {"calls": 0, "over_budget": 0, "last_ms": 0.0, "max_ms": 0.0,
+                      "inserts": 0, "deletes": 0, "moves": 0, "updates": 0}
+        self._shown: List[str] = []
+        self._shown_values: Dict[str, Tuple[str, ...]] = {}
+        self._measured = False
+        self._syncing_selection = False
+        self._replace_selection = False
+        self._search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+        self._index_future: Optional[Future] = None
+        self._debounce_id = None
+        self._search_text = ""
+
+        self.scrollbar.configure(command=self.yview)
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<ButtonRelease-1>", self._end_user_selection)
+        self.tree.bind("<KeyPress>", self._on_key)
+        self.tree.bind("<KeyRelease>", self._end_user_selection)
+        self.tree.bind("<MouseWheel>", lambda event: self._on_wheel(-1 if event.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda event: self._on_wheel(-1))
+        self.tree.bind("<Button-5>", lambda event: self._on_wheel(1))
+
+    def show(self, programs: Dict[str, ProgramInfo], search_text: str = ""):
+        def apply():
+            self.model.search_text = search_text.lower()
+            self.model.set_programs(programs)
+            self.offset = 0
+        self._timed("show", apply)
+        self._search_text = search_text
+        self._index_future = None
+        if programs:
+            # A copy: registry deltas may change the dict while the index is built.
+            future = self._index_future = self._search_executor.submit(SearchIndex, dict(programs))
+            updates = self.model.updates
+            self._when_done(future, lambda index: self._set_index(future, index, updates))
+
+    def _set_index(self, future: Future, index: SearchIndex, updates: int):
+        if future is not self._index_future:
+            return
+        if self.model.updates != updates:
+            # Programs changed while it was built; bring it up to date before it is used.
+            index.sync(self.model.programs)
+        self.model.index = index
+
+    def filter_later(self, search_text: str):
+        """Debounced, off-thread set_filter for keystrokes."""
+        self._search_text = search_text
+        if self._debounce_id is not None:
+            self.tree.after_cancel(self._debounce_id)
+        self._debounce_id = self.tree.after(self.debounce_ms, self._start_search, search_text)
+
+    def _start_search(self, search_text: str):
+        self._debounce_id = None
+        index = self.model.index
+        if index is None or not search_text:
+            self.set_filter(search_text)
+            return
+        future = self._search_executor.submit(index.search, search_text)
+        self._when_done(future, lambda matched: self._apply_search(search_text, matched))
+
+    def _apply_search(self, search_text: str, matched: Set[str]):
+        if search_text != self._search_text or search_text.lower() == self.model.search_text:
+            return
+        def apply():
+            self.model.apply_matches(search_text, matched)
+            self.offset = 0
+        self._timed("filter", apply)
+
+    def _when_done(self, future: Future, callback: Callable[[Any], None]):
+        # Worker threads must not touch Tk; the Tk thread polls the future instead.
+        if not future.done():
+            self.tree.after(RESULT_POLL_MS, self._when_done, future, callback)
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"[VirtualTreeview] Search failed: {e}")
+            return
+        callback(result)
+
+    def set_filter(self, search_text: str) -> float:
+        """Filters and re-renders; returns the time taken in milliseconds."""
+        def apply():
+            if self.model.set_filter(search_text):
+                self.offset = 0
+        return self._timed("filter", apply)
+
+    def sort_by(self, column: str, reverse: bool):
+        self._timed("sort", lambda: self.model.sort_by(column, reverse))
+
+    def update_rows(self, updated_names: List[str], removed_names: List[str]):
+        self._timed("update", lambda: self.model.update(updated_names, removed_names))
+
+    def selection(self) -> List[str]:
+        return self.model.selection()
+
+    def visible_names(self) -> List[str]:
+        return self.model.rows[self.offset:self.offset + self.capacity]
+
+    def scroll_to(self, offset: int):
+        offset = max(0, min(offset, len(self.model.rows) - self.capacity))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", count, "units" | "pages")."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.model.rows)))
+        elif args[0] == "scroll":
+            step = self.capacity if args[2] == "pages" else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def _timed(self, label: str, apply: Callable[[], None]) -> float:
+        started = time.perf_counter()
+        apply()
+        self.render()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = self.stats
+        stats["calls"] += 1
+        stats["last_ms"] = elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        if elapsed_ms > self.budget_ms:
+            stats["over_budget"] += 1
+            print(f"[VirtualTreeview] {label} took {elapsed_ms:.1f} ms (budget {self.budget_ms:.0f} ms, "
+                  f"{len(self.model.rows)}/{len(self.model.order)} rows)")
+        return elapsed_ms
+
+    def render(self):
+        rows = self.model.rows
+        self.offset = max(0, min(self.offset, len(rows) - self.capacity))
+        wanted = rows[self.offset:self.offset + self.capacity]
+        wanted_set = set(wanted)
+        tree = self.tree
+        stats = self.stats
+
+        shown: List[str] = []
+        for iid in self._shown:
+            if iid in wanted_set:
+                shown.append(iid)
+            else:
+                tree.delete(iid)
+                del self._shown_values[iid]
+                stats["deletes"] += 1
+        for index, iid in enumerate(wanted):
+            values = self.model.values(iid)
+            if index < len(shown) and shown[index] == iid:
+                pass
+            elif iid in self._shown_values:
+                tree.move(iid, "", index)
+                shown.remove(iid)
+                shown.insert(index, iid)
+                stats["moves"] += 1
+            else:
+                tree.insert("", index, iid=iid, values=values)
+                shown.insert(index, iid)
+                self._shown_values[iid] = values
+                stats["inserts"] += 1
+                continue
+            if self._shown_values[iid] != values:
+                tree.item(iid, values=values)
+                self._shown_values[iid] = values
+                stats["updates"] += 1
+        self._shown = shown
+
+        want_selected = [iid for iid in shown if iid in self.model.selected]
+        if set(want_selected) != set(tree.selection()):
+            self._syncing_selection = True
+            try: tree.selection_set(want_selected)
+            finally: self._syncing_selection = False
+
+        total = len(rows)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + len(shown)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        if not self._measured and shown:
+            self._measure()
+
+    def _measure(self):
+        bbox = self.tree.bbox(self._shown[0])
+        if bbox and bbox[3] > 0:
+            self.header_height, self.row_height = bbox[1], bbox[3]
+            self._measured = True
+
+    def _on_configure(self, event):
+        if self._shown:
+            self._measure()
+        # Only whole rows, so the Treeview never scrolls its own content.
+        capacity = max(1, (event.height - self.header_height) // self.row_height)
+        if capacity != self.capacity:
+            self.capacity = capacity
+            self.render()
+
+    def _on_click(self, event):
+        # Class bindings run after this one and fire <<TreeviewSelect>> before it returns.
+        self._replace_selection = not event.state & (SHIFT_MASK | CONTROL_MASK)
+
+    def _end_user_selection(self, event=None):
+        self._replace_selection = False
+
+    def _on_select(self, event=None):
+        if self._syncing_selection:
+            return
+        in_window = set(self.tree.selection())
+        if self._replace_selection:
+            self.model.selected = in_window
+        else:
+            # Rows outside the window keep their state; the widget cannot see them.
+            self.model.selected = (self.model.selected - set(self._shown)) | in_window
+        self._replace_selection = False
+
+    def _on_key(self, event):
+        self._replace_selection = not event.state & (SHIFT_MASK | CONTROL_MASK)
+        keysym, shown = event.keysym, self._shown
+        if not shown:
+            return None
+        focus = self.tree.focus()
+        # At the edge of the window, slide it first so the Treeview has a row to move to.
+        if keysym == "Up" and focus == shown[0]:
+            self.scroll_to(self.offset - 1)
+        elif keysym == "Down" and focus == shown[-1]:
+            self.scroll_to(self.offset + 1)
+        elif keysym in ("Prior", "Next"):
+            self.scroll_to(self.offset + (self.capacity if keysym == "Next" else -self.capacity))
+            return "break"
+        elif keysym in ("Home", "End"):
+            self.scroll_to(0 if keysym == "Home" else len(self.model.rows))
+            return "break"
+        return None
+
+    def _on_wheel(self, direction: int):
+        self.scroll_to(self.offset + 3 * direction)
+        return "break"
@@ -1,526 +1,23 @@
 import os
 import sys
-import winreg
-import shutil
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, Menu
 from typing import Dict, List, Tuple, Optional, Any
 from locale_strings import get_text, set_language, DEFAULT_LANG
 import ctypes
-import re
 from pathlib import Path
-try:
-    import pylnk3 
-    PYLNK_AVAILABLE = True
-except ImportError:
-    PYLNK_AVAILABLE = False
-    print("[ProgramManager] Warning: pylnk3 library not found. Shortcut functionality will be limited.")
 import threading
-import queue
-
-from locale_strings import get_text, set_language, DEFAULT_LANG
-
-def is_admin() -> bool:
-    try:
-        return ctypes.windll.shell32.IsUserAnAdmin()
-    except:
-        return False
-
-class ProgramInfo:
-    def __init__(self, name: str, version: str = "", install_location: str = "",
-                 install_date: str = "", size: str = "Unknown", publisher: str = ""):
-        self.name = name
-        self.version = version
-        self.install_location = install_location
-        self.install_date = install_date
-        self.size = size
-        self.publisher = publisher
-        self.files: List[str] = []
-        self.registry_keys: List[str] = []
-        self.shortcuts: List[str] = []
-
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'name': self.name,
-            'version': self.version,
-            'install_location': self.install_location,
-            'install_date': self.install_date,
-            'size': self.size,
-            'publisher': self.publisher,
-            'files': list(self.files),
-            'registry_keys': list(self.registry_keys),
-            'shortcuts': list(self.shortcuts)
-        }
-
-    @staticmethod
-    def from_dict(data: Dict[str, Any]) -> 'ProgramInfo':
-        return ProgramInfo(
-            name=data.get('name', ''),
-            version=data.get('version', ''),
-            install_location=data.get('install_location', ''),
-            install_date=data.get('install_date', ''),
-            size=data.get('size', 'Unknown'),
-            publisher=data.get('publisher', '')
-        )
-
-class ProgramManager:
-    def __init__(self):
-        self.programs: Dict[str, ProgramInfo] = {}
-        self.last_error = ""
-
-    def get_installed_programs_threaded(self, progress_queue: queue.Queue) -> Dict[str, ProgramInfo]:
-        progress_queue.put(("status", "Program bilgileri aliniyor..."))
-        registry_paths = [
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
-            (winreg.HKEY_CURRENT_USER, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall")
-        ]
-        self.programs.clear()
-        processed_count = 0
-
-        for root_key, subkey_path in registry_paths:
-            try:
-                key = winreg.OpenKey(root_key, subkey_path)
-                self._process_registry_key(key, root_key, subkey_path, progress_queue, processed_count)
-            except WindowsError:
-                continue
-
-        progress_queue.put(("status", "Program boyutlari hesaplaniyor..."))
-        self._get_program_sizes(progress_queue)
-
-        progress_queue.put(("status", "Kisayollar bulunuyor..."))
-        self._find_program_shortcuts(progress_queue)
-
-        progress_queue.put(("finished_load", self.programs))
-        return self.programs
-
-    def _process_registry_key(self, key: Any, root_key: Any, subkey_path: str, progress_queue: queue.Queue, processed_count: int):
-        index = 0
-        while True:
-            try:
-                subkey_name = winreg.EnumKey(key, index)
-                subkey_full_path = f"{subkey_path}\{subkey_name}"
-                subkey = winreg.OpenKey(root_key, subkey_full_path)
-
-                try:
-                    name = ""
-                    try: name = winreg.QueryValueEx(subkey, "DisplayName")[0]
-                    except (WindowsError, IndexError):
-                        index += 1; winreg.CloseKey(subkey); continue
-
-                    if not name or name.strip() == "":
-                        index += 1; winreg.CloseKey(subkey); continue
-
-                    is_system_component = False
-                    try: is_system_component = winreg.QueryValueEx(subkey, "SystemComponent")[0] == 1
-                    except (WindowsError, IndexError): pass
-                    if is_system_component:
-                        index += 1; winreg.CloseKey(subkey); continue
-
-                    release_type = ""
-                    try: release_type = winreg.QueryValueEx(subkey, "ReleaseType")[0].lower()
-                    except (WindowsError, IndexError): pass
-                    if release_type in ["security update", "update rollup", "hotfix"]:
-                         index += 1; winreg.CloseKey(subkey); continue
-
-                    program_info = ProgramInfo(name)
-                    try: program_info.version = winreg.QueryValueEx(subkey, "DisplayVersion")[0]
-                    except (WindowsError, IndexError): pass
-                    try: program_info.publisher = winreg.QueryValueEx(subkey, "Publisher")[0]
-                    except (WindowsError, IndexError): pass
-
-                    install_location = ""
-                    try: install_location = winreg.QueryValueEx(subkey, "InstallLocation")[0]
-                    except (WindowsError, IndexError):
-                        try: install_location = winreg.QueryValueEx(subkey, "InstallPath")[0]
-                        except (WindowsError, IndexError):
-                            try:
-                                display_icon_path = winreg.QueryValueEx(subkey, "DisplayIcon")[0]
-                                cleaned_path = display_icon_path.split(',')[0].strip('"')
-                                if cleaned_path.lower().endswith(".exe") and os.path.exists(cleaned_path):
-                                    install_location = os.path.dirname(cleaned_path)
-                            except (WindowsError, IndexError):
-                                try:
-                                     uninstall_string = winreg.QueryValueEx(subkey, "UninstallString")[0]
-                                     match = re.search(r'"?(.*?\w+\.exe)"?', uninstall_string, re.IGNORECASE)
-                                     if match:
-                                         exe_path = match.group(1).strip('"')
-                                         if os.path.exists(exe_path):
-                                              install_location = os.path.dirname(exe_path)
-                                except (WindowsError, IndexError, TypeError): pass
-
-                    if install_location:
-                         program_info.install_location = os.path.normpath(install_location.strip('"'))
-
-                    try:
-                        date_str = winreg.QueryValueEx(subkey, "InstallDate")[0]
-                        if date_str and len(date_str) == 8:
-                            program_info.install_date = f"{date_str[0:4]}-{date_str[4:6]}-{date_str[6:8]}"
-                    except (WindowsError, IndexError): pass
-
-                    root_name = "HKEY_LOCAL_MACHINE" if root_key == winreg.HKEY_LOCAL_MACHINE else "HKEY_CURRENT_USER"
-                    program_info.registry_keys.append(f"{root_name}\{subkey_full_path}")
-
-                    if name in self.programs:
-                        if not self.programs[name].install_location and program_info.install_location:
-                            self.programs[name] = program_info
-                        self.programs[name].registry_keys = list(set(self.programs[name].registry_keys + program_info.registry_keys))
-                    else:
-                        self.programs[name] = program_info
-
-                    processed_count += 1
-                    if processed_count % 20 == 0: progress_queue.put(("progress_programs", processed_count))
-                except Exception as e:
-                    print(f"[_process_registry_key] Error reading values for key {subkey_full_path}: {e}")
-                finally:
-                     try: winreg.CloseKey(subkey)
-                     except OSError: pass
-                index += 1
-            except WindowsError: break
-            except Exception as e:
-                print(f"[_process_registry_key] Unexpected error processing registry index {index} in {subkey_path}: {e}")
-                index += 1
-        progress_queue.put(("progress_programs", processed_count))
-
-    def _get_program_sizes(self, progress_queue: queue.Queue):
-        total_programs = len(self.programs)
-        processed_count = 0
-        for name, info in self.programs.items():
-            if info.install_location and os.path.exists(info.install_location):
-                try:
-                    total_size_bytes = 0
-                    file_list_for_program = []
-                    for dirpath, _, filenames in os.walk(info.install_location):
-                        for f in filenames:
-                            fp = os.path.join(dirpath, f)
-                            if os.path.exists(fp):
-                                try:
-                                    total_size_bytes += os.path.getsize(fp)
-                                    file_list_for_program.append(fp)
-                                except OSError: pass
-                    info.size = self._format_size(total_size_bytes)
-                    info.files = file_list_for_program
-                except Exception: info.size = "Error calculating"
-            processed_count += 1
-            if processed_count % 5 == 0 or processed_count == total_programs:
-                 progress_queue.put(("progress_sizes", processed_count, total_programs))
-
-    def _format_size(self, size_bytes):
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0: return f"{size_bytes:.2f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.2f} PB"
-
-    def _find_program_shortcuts(self, progress_queue: queue.Queue):
-        shortcut_locations = [
-            os.path.join(os.environ.get("USERPROFILE", ""), "Desktop"),
-            os.path.join(os.environ.get("ALLUSERSPROFILE", ""), "Desktop"),
-            os.path.join(os.environ.get("APPDATA", ""), "Microsoft", "Windows", "Start Menu"),
-            os.path.join(os.environ.get("PROGRAMDATA", ""), "Microsoft", "Windows", "Start Menu"),
-            os.path.join(os.environ.get("USERPROFILE", ""), "AppData", "Roaming", "Microsoft", "Windows", "Start Menu", "Programs"),
-            os.path.join(os.environ.get("ProgramFiles", "C:\\Program Files"), ""),
-            os.path.join(os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)"), "")
-        ]
-        all_lnk_files = []
-        for location in shortcut_locations:
-            loc_path = Path(location)
-            if loc_path.exists() and loc_path.is_dir():
-                max_depth = 3 if "Program Files" in location else -1
-                try:
-                    for root, dirs, files in os.walk(location, topdown=True):
-                        if max_depth != -1:
-                            current_depth = root[len(str(loc_path)):].count(os.sep)
-                            if current_depth >= max_depth:
-                                dirs[:] = []
-                        for file in files:
-                            if file.lower().endswith(".lnk"):
-                                full_path = os.path.join(root, file)
-                                if full_path not in all_lnk_files:
-                                    all_lnk_files.append(full_path)
-                except OSError as e:
-                     print(f"[_find_program_shortcuts] Error walking {location}: {e}")
-
-        total_shortcuts_to_check = len(all_lnk_files)
-        processed_shortcuts = 0
-        for program_info in self.programs.values(): program_info.shortcuts.clear()
-
-        if not PYLNK_AVAILABLE:
-            progress_queue.put(("warning", get_text("pylnk3_not_available_error")))
-            progress_queue.put(("progress_shortcuts", total_shortcuts_to_check, total_shortcuts_to_check))
-            return
-
-        for shortcut_path in all_lnk_files:
-            target_path = None
-            try:
-                lnk = pylnk3.Lnk(shortcut_path)
-                target_path = lnk.path
-
-                if not target_path:
-                    processed_shortcuts += 1; continue
-
-                target_path_lower = target_path.lower()
-                for program_name, info in self.programs.items():
-                    if info.install_location and target_path_lower.startswith(info.install_location.lower()):
-                        if shortcut_path not in info.shortcuts:
-                            info.shortcuts.append(shortcut_path)
-                        break
-            except Exception as e:
-                 pass
-            finally:
-                 processed_shortcuts +=1
-                 if processed_shortcuts % 20 == 0 or processed_shortcuts == total_shortcuts_to_check:
-                     progress_queue.put(("progress_shortcuts", processed_shortcuts, total_shortcuts_to_check))
-
-    def _pre_scan_for_copy(self, src_path: str) -> int:
-        file_count = 0
-        try:
-            for item in os.listdir(src_path):
-                item_path = os.path.join(src_path, item)
-                if os.path.isfile(item_path):
-                    file_count += 1
-                elif os.path.isdir(item_path):
-                    file_count += self._pre_scan_for_copy(item_path)
-        except OSError as e:
-            print(f"[_pre_scan_for_copy] Error scanning {src_path}: {e}")
-        return file_count
-
-    def _copy_directory(self, src: str, dst: str, progress_queue: queue.Queue, overall_progress_tracker: List[int]):
-        os.makedirs(dst, exist_ok=True)
-        for item in os.listdir(src):
-            s = os.path.join(src, item)
-            d = os.path.join(dst, item)
-            if os.path.isdir(s):
-                self._copy_directory(s, d, progress_queue, overall_progress_tracker)
-            else:
-                try:
-                    if not os.path.exists(d) or os.path.getsize(s) != os.path.getsize(d):
-                        shutil.copy2(s, d)
-                    overall_progress_tracker[0] += 1
-                    progress_queue.put(("progress_copy", overall_progress_tracker[0], overall_progress_tracker[1], os.path.basename(s)))
-                except (PermissionError, OSError, shutil.Error) as e:
-                    print(f"[_copy_directory] Skipping file {s}: {e}")
-                    overall_progress_tracker[0] += 1
-                    progress_queue.put(("progress_copy", overall_progress_tracker[0], overall_progress_tracker[1], f"{os.path.basename(s)} (Hata: {e})"))
-
-    def _update_shortcuts(self, program_info_shortcuts: List[str], old_location: str, new_location: str, progress_queue: queue.Queue) -> Tuple[int, List[str]]:
-        updated_count = 0
-        updated_shortcut_paths = []
-        total_shortcuts_to_update = len(program_info_shortcuts)
-        processed_count = 0
-
-        if not PYLNK_AVAILABLE:
-            progress_queue.put(("warning", get_text("pylnk3_not_available_error_update")))
-            progress_queue.put(("progress_update_shortcuts", total_shortcuts_to_update, total_shortcuts_to_update))
-            return 0, []
-
-        for shortcut_path in program_info_shortcuts:
-            try:
-                lnk = pylnk3.Lnk(shortcut_path)
-                old_target = lnk.path
-
-                if old_target and old_target.lower().startswith(old_location.lower()):
-                    new_target_corrected = new_location + old_target[len(old_location):]
-
-                    if os.path.exists(new_target_corrected):
-                        lnk.path = new_target_corrected
-                        lnk.work_dir = os.path.dirname(new_target_corrected)
-                        lnk.save()
-
-                        updated_count += 1
-                        updated_shortcut_paths.append(shortcut_path)
-                    else:
-                        print(f"[_update_shortcuts] Target {new_target_corrected} doesn't exist for {shortcut_path}")
-            except PermissionError as pe:
-                print(f"[_update_shortcuts] Permission error saving shortcut {shortcut_path}: {pe}")
-                progress_queue.put(("warning", get_text("shortcut_update_permission_error", shortcut=shortcut_path)))
-            except Exception as e:
-                print(f"[_update_shortcuts] Error: {e} for {shortcut_path}")
-                progress_queue.put(("warning", get_text("shortcut_update_generic_error", shortcut=shortcut_path, error=str(e))))
-            processed_count +=1
-            progress_queue.put(("progress_update_shortcuts", processed_count, total_shortcuts_to_update))
-        return updated_count, updated_shortcut_paths
-
-    def _delete_directory(self, path: str, progress_queue: queue.Queue) -> bool:
-        all_items_to_delete = []
-        for root, dirs, files in os.walk(path, topdown=False):
-            for f_name in files: all_items_to_delete.append(os.path.join(root, f_name))
-            for d_name in dirs: all_items_to_delete.append(os.path.join(root, d_name))
-        if os.path.exists(path) and os.path.isdir(path): all_items_to_delete.append(path)
-
-        deleted_count = 0
-        total_to_delete = len(all_items_to_delete)
-        if total_to_delete == 0: return True
-
-        for item_path in all_items_to_delete:
-            base_name = os.path.basename(item_path)
-            try:
-                if os.path.isfile(item_path) or os.path.islink(item_path):
-                    os.remove(item_path)
-                elif os.path.isdir(item_path):
-                    os.rmdir(item_path)
-                deleted_count += 1
-                progress_queue.put(("progress_delete", deleted_count, total_to_delete, base_name))
-            except PermissionError as pe:
-                print(f"[_delete_directory] Permission Failed: {item_path}: {pe}")
-                progress_queue.put(("delete_error", base_name, get_text("delete_permission_error")))
-            except OSError as oe:
-                print(f"[_delete_directory] OS Error: {item_path}: {oe}")
-                error_detail = str(oe)
-                if "not empty" in error_detail.lower(): error_detail = get_text("delete_not_empty_error")
-                progress_queue.put(("delete_error", base_name, error_detail))
-            except Exception as e:
-                print(f"[_delete_directory] Generic Error: {item_path}: {e}")
-                progress_queue.put(("delete_error", base_name, str(e)))
-
-        if os.path.exists(path):
-             self.last_error = get_text("delete_root_failed_error", path=path)
-             return False
-        return True
-
-    def _update_registry_location(self, registry_keys: List[str], new_location: str, progress_queue: queue.Queue) -> bool:
-        updated_at_least_one = False
-        if not is_admin():
-            progress_queue.put(("warning", get_text("registry_update_requires_admin")))
-            return False
-
-        for key_path_str in registry_keys:
-            try:
-                root_str, sub_path = key_path_str.split('\\', 1)
-                root_hkey = None
-                if root_str == "HKEY_LOCAL_MACHINE": root_hkey = winreg.HKEY_LOCAL_MACHINE
-                elif root_str == "HKEY_CURRENT_USER": root_hkey = winreg.HKEY_CURRENT_USER
-                else:
-                    print(f"[_update_registry_location] Unknown root key in path: {key_path_str}"); continue
-
-                key = winreg.OpenKey(root_hkey, sub_path, 0, winreg.KEY_SET_VALUE)
-                winreg.SetValueEx(key, "InstallLocation", 0, winreg.REG_SZ, new_location)
-                winreg.CloseKey(key)
-            except FileNotFoundError:
-                print(f"[_update_registry_location] Registry key not found (continuing): {key_path_str}")
-            except PermissionError:
-                print(f"[_update_registry_location] Permission denied for key: {key_path_str}")
-                progress_queue.put(("warning", get_text("registry_permission_denied", key=key_path_str)))
-            except Exception as e:
-                print(f"[_update_registry_location] Error updating registry key {key_path_str}: {e}")
-                progress_queue.put(("warning", get_text("registry_update_error", key=key_path_str, error=str(e))))
-
-        if not updated_at_least_one:
-             progress_queue.put(("warning", get_text("registry_update_failed_all")))
-        return updated_at_least_one
-
-    def move_program_threaded(self, program_info: ProgramInfo, target_path_input: str, delete_source: bool, progress_queue: queue.Queue):
-        self.last_error = ""
-        shortcuts_updated_count = 0
-        updated_shortcut_paths_for_revert = []
-
-        original_location = program_info.install_location
-        if not original_location or not os.path.exists(original_location):
-            self.last_error = "Program konumu bulunamadi veya geçerli değil"; progress_queue.put(("error", self.last_error)); return
-        if not original_location.startswith(("C:", "c:")):
-            self.last_error = "Program C sürücüsünde değil"; progress_queue.put(("error", self.last_error)); return
-        if original_location.strip().upper() in ("C:", "C:\\"):
-            self.last_error = "Geçersiz program konumu"; progress_queue.put(("error", self.last_error)); return
-
-        new_location = ""
-        if len(target_path_input) == 2 and target_path_input[1] == ':':
-            relative_path = original_location[len(Path(original_location).drive) + 1:]
-            new_location = os.path.join(target_path_input.upper(), relative_path.lstrip('\\/'))
-        else:
-            new_location = target_path_input
-
-        if not new_location: self.last_error = "Hedef yol belirlenemedi."; progress_queue.put(("error", self.last_error)); return
-        if new_location.lower() == original_location.lower(): self.last_error = "Kaynak ve hedef yollar ayni."; progress_queue.put(("error", self.last_error)); return
-
-        try:
-            progress_queue.put(("status", f"Kopyalama için ön tarama: {program_info.name}"))
-            total_files_to_copy = self._pre_scan_for_copy(original_location)
-            overall_copy_progress_tracker = [0, total_files_to_copy if total_files_to_copy > 0 else 1]
-
-            progress_queue.put(("status", f"{program_info.name} kopyalaniyor: {original_location} -> {new_location}"))
-            self._copy_directory(original_location, new_location, progress_queue, overall_copy_progress_tracker)
-
-            if not os.path.exists(new_location) or not os.path.isdir(new_location):
-                self.last_error = "Kopyalama sonrasi doğrulama başarisiz."; progress_queue.put(("error", self.last_error)); return
-
-            progress_queue.put(("status", "Kisayollar güncelleniyor..."))
-            shortcuts_updated_count, updated_shortcut_paths_for_revert = self._update_shortcuts(list(program_info.shortcuts), original_location, new_location, progress_queue)
-
-            progress_queue.put(("status", get_text("status_updating_registry")))
-            registry_updated = self._update_registry_location(program_info.registry_keys, new_location, progress_queue)
-
-            source_deletion_warning = None
-            if delete_source:
-                progress_queue.put(("status", get_text("status_deleting_source")))
-                if not self._delete_directory(original_location, progress_queue):
-                    source_deletion_warning = self.last_error
-
-            last_move_details = {
-                'program_name': program_info.name,
-                'original_location': original_location,
-                'new_location': new_location,
-                'registry_keys': list(program_info.registry_keys),
-                'program_info_snapshot_dict': program_info.to_dict(),
-                'source_deleted_during_move': delete_source,
-                'source_actually_deleted': delete_source and not os.path.exists(original_location),
-                'updated_shortcut_paths_during_move': updated_shortcut_paths_for_revert,
-                'registry_updated_during_move': registry_updated
-            }
-            progress_queue.put(("finished_move", True, shortcuts_updated_count, registry_updated, source_deletion_warning, last_move_details))
-
-        except Exception as e:
-            error_msg = str(e)
-            print(f"[move_program_threaded] Error: {error_msg}")
-            self.last_error = f"Taşima sirasinda hata: {error_msg}"
-            progress_queue.put(("error", self.last_error))
-
-    def revert_move_threaded(self, last_move_info: Dict[str, Any], progress_queue: queue.Queue):
-        self.last_error = ""
-        program_name = last_move_info['program_name']
-        original_loc = last_move_info['original_location']
-        current_loc = last_move_info['new_location']
-        shortcuts_to_revert = last_move_info['updated_shortcut_paths_during_move']
-        source_actually_deleted_during_move = last_move_info['source_actually_deleted']
-        registry_updated_during_move = last_move_info.get('registry_updated_during_move', False)
-        registry_keys_to_revert = last_move_info.get('registry_keys', [])
-
-        self.progress_queue.put(("status", get_text("status_reverting_move_prep", program_name=program_name)))
-
-        try:
-            progress_queue.put(("status", f"Dosyalar geri kopyalaniyor: {current_loc} -> {original_loc}"))
-            total_files_to_copy_back = self._pre_scan_for_copy(current_loc)
-            overall_copy_back_tracker = [0, total_files_to_copy_back if total_files_to_copy_back > 0 else 1]
-            self._copy_directory(current_loc, original_loc, progress_queue, overall_copy_back_tracker)
-
-            if not os.path.exists(original_loc) or not os.path.isdir(original_loc):
-                self.last_error = "Geri kopyalama sonrasi doğrulama başarisiz."
-                progress_queue.put(("error", self.last_error)); return
-
-            progress_queue.put(("status", get_text("status_reverting_shortcuts")))
-            reverted_shortcuts_count, _ = self._update_shortcuts(list(shortcuts_to_revert), current_loc, original_loc, progress_queue)
-
-            registry_reverted = False
-            if registry_updated_during_move:
-                progress_queue.put(("status", get_text("status_reverting_registry")))
-                registry_reverted = self._update_registry_location(registry_keys_to_revert, original_loc, progress_queue)
-            else:
-                registry_reverted = True
-
-            delete_current_loc_warning = None
-            if source_actually_deleted_during_move:
-                progress_queue.put(("status", get_text("status_deleting_reverted_source", location=current_loc)))
-                if not self._delete_directory(current_loc, progress_queue):
-                    delete_current_loc_warning = self.last_error
-
-            progress_queue.put(("finished_revert", True, reverted_shortcuts_count, registry_reverted, delete_current_loc_warning))
-
-        except Exception as e:
-            error_msg = str(e)
-            print(f"[revert_move_threaded] Error: {error_msg}")
-            self.last_error = f"Geri alma sirasinda hata: {error_msg}"
-            progress_queue.put(("error", self.last_error))
-
-    def get_last_error(self) -> str:
-        return self.last_error
+import multiprocessing
+from program_core import ProgramInfo, ProgramManager, is_admin
+from scan_cache import ScanCache, default_cache_path
+from progress_channel import ProgressChannel
+from move_queue import MoveJob
+from cancellation import CancelToken
+from registry_watch import RegistryDelta, RegistryWatcher
+from program_list import VirtualTreeview
+
+# Options > Move Speed Limit, in MB/s; 0 is unlimited.
+SPEED_LIMIT_CHOICES = [0, 200, 100, 50, 20, 10]
 
 class ProgramManagerUI:
     def __init__(self, root):
@@ -531,11 +28,20 @@ class ProgramManagerUI:
         self.root.title(get_text("app_title"))
         self.root.geometry("1150x750")
 
-        self.program_manager = ProgramManager()
-        self.progress_queue = queue.Queue()
+        self.program_manager = ProgramManager(scan_cache=ScanCache(default_cache_path()))
+        self.progress_queue = ProgressChannel()
         self.active_thread = None
         self.programs_data: Dict[str, ProgramInfo] = {}
         self.last_move_info: Optional[Dict[str, Any]] = None
+        self.registry_watcher: Optional[RegistryWatcher] = None
+        self.pending_registry_delta: Optional[RegistryDelta] = None
+        self.size_watch_pending = False
+        # While a load sizes programs in the background it can be restarted; see load_programs_threaded.
+        self.loading = False
+        self.reload_pending = False
+        self.size_priority_state: Optional[tuple] = None
+        # Cancels, pauses and resumes the running load, move or revert.
+        self.operation_token: Optional[CancelToken] = None
 
         self.create_menu()
         self.setup_ui()
@@ -552,6 +58,24 @@ class ProgramManagerUI:
         language_menu.add_radiobutton(label="English", variable=self.language_var, value="en", command=self.change_language)
         language_menu.add_radiobutton(label="Türkçe", variable=self.language_var, value="tr", command=self.change_language)
 
+        self.options_menu = Menu(menubar, tearoff=0)
+        menubar.add_cascade(label=get_text("menu_options"), menu=self.options_menu)
+        self.watch_sizes_var = tk.BooleanVar(value=False)
+        self.options_menu.add_checkbutton(label=get_text("watch_program_sizes"), variable=self.watch_sizes_var, command=self.toggle_size_watch)
+        self.options_menu.add_separator()
+        self.speed_limit_menu = Menu(self.options_menu, tearoff=0)
+        self.options_menu.add_cascade(label=get_text("menu_speed_limit"), menu=self.speed_limit_menu)
+        self.speed_limit_var = tk.DoubleVar(value=0)
+        for mbps in SPEED_LIMIT_CHOICES:
+            self.speed_limit_menu.add_radiobutton(variable=self.speed_limit_var, value=mbps, command=self.apply_io_settings)
+        self.adaptive_io_var = tk.BooleanVar(value=False)
+        self.options_menu.add_checkbutton(label=get_text("adaptive_io"), variable=self.adaptive_io_var, command=self.apply_io_settings)
+        self.low_io_priority_var = tk.BooleanVar(value=False)
+        self.options_menu.add_checkbutton(label=get_text("low_io_priority"), variable=self.low_io_priority_var, command=self.apply_io_settings)
+        self.verify_copies_var = tk.BooleanVar(value=False)
+        self.options_menu.add_checkbutton(label=get_text("verify_copies"), variable=self.verify_copies_var, command=self.toggle_verify_copies)
+        self.update_speed_limit_labels()
+
         self.menubar = menubar
 
     def change_language(self):
@@ -564,12 +88,21 @@ class ProgramManagerUI:
     def update_ui_language(self):
         self.root.title(get_text("app_title"))
         self.menubar.entryconfig(1, label=get_text("menu_language"))
+        self.menubar.entryconfig(2, label=get_text("menu_options"))
+        self.options_menu.entryconfig(0, label=get_text("watch_program_sizes"))
+        self.options_menu.entryconfig(2, label=get_text("menu_speed_limit"))
+        self.options_menu.entryconfig(3, label=get_text("adaptive_io"))
+        self.options_menu.entryconfig(4, label=get_text("low_io_priority"))
+        self.options_menu.entryconfig(5, label=get_text("verify_copies"))
+        self.update_speed_limit_labels()
 
         self.refresh_btn.config(text=get_text("refresh_programs"))
         self.move_btn.config(text=get_text("move_selected"))
         self.delete_source_check.config(text=get_text("delete_source_files"))
         self.revert_btn.config(text=get_text("revert_last_move"))
         self.details_btn.config(text=get_text("program_details"))
+        self.pause_btn.config(text=get_text("resume" if self.operation_token and self.operation_token.paused else "pause"))
+        self.cancel_btn.config(text=get_text("cancel_operation"))
         self.browse_custom_path_btn.config(text=get_text("browse"))
         self.exit_btn.config(text=get_text("exit"))
 
@@ -627,17 +160,18 @@ class ProgramManagerUI:
         tree_frame = ttk.Frame(main_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         self.columns = ("name", "publisher", "version", "size", "install_date", "location")
-        self.tree = ttk.Treeview(tree_frame, columns=self.columns, show="headings", selectmode="browse")
+        self.tree = ttk.Treeview(tree_frame, columns=self.columns, show="headings", selectmode="extended")
         for col_key in self.columns:
             self.tree.heading(col_key, text=get_text(f"col_{col_key}"), command=lambda _col=col_key: self.sort_treeview_column(_col, False))
         col_widths = {"name": 280, "publisher": 180, "version": 80, "size": 90, "install_date": 100, "location": 380}
         for col, width in col_widths.items(): self.tree.column(col, width=width, anchor=tk.W if col != 'size' else tk.E)
         self.tree.column("install_date", anchor=tk.CENTER)
 
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Only the visible rows live in the Treeview; the list model owns order, filter and selection.
+        self.program_list = VirtualTreeview(self.tree, scrollbar)
 
         buttons_frame = ttk.Frame(main_frame)
         buttons_frame.pack(fill=tk.X, pady=10)
@@ -651,6 +185,10 @@ class ProgramManagerUI:
         self.revert_btn.pack(side=tk.LEFT, padx=5)
         self.details_btn = ttk.Button(buttons_frame, text=get_text("program_details"), command=self.show_program_details)
         self.details_btn.pack(side=tk.LEFT, padx=5)
+        self.pause_btn = ttk.Button(buttons_frame, text=get_text("pause"), command=self.toggle_pause, state=tk.DISABLED)
+        self.pause_btn.pack(side=tk.LEFT, padx=5)
+        self.cancel_btn = ttk.Button(buttons_frame, text=get_text("cancel_operation"), command=self.cancel_operation, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
 
         self.exit_btn = ttk.Button(buttons_frame, text=get_text("exit"), command=self.root.quit)
         self.exit_btn.pack(side=tk.RIGHT, padx=5)
@@ -666,22 +204,7 @@ class ProgramManagerUI:
         self.load_programs_threaded()
 
     def sort_treeview_column(self, col, reverse):
-        l = [(self.tree.set(k, col), k) for k in self.tree.get_children('')]
-        def get_size_key(item_tuple):
-            size_val_str = item_tuple[0]
-            parts = size_val_str.split(' ')
-            try:
-                num = float(parts[0])
-                unit = parts[1] if len(parts) > 1 else 'B'
-                multipliers = {'B': 1, 'KB': 1024, 'MB': 1024**2, 'GB': 1024**3, 'TB': 1024**4, 'PB': 1024**5}
-                return num * multipliers.get(unit.upper(), 0)
-            except (ValueError, IndexError): return -1
-
-        if col == 'size': l.sort(key=get_size_key, reverse=reverse)
-        else:
-            try: l.sort(key=lambda item: float(item[0]) if item[0] and item[0] != '-' else -float('inf'), reverse=reverse)
-            except ValueError: l.sort(key=lambda item: (item[0] or '').lower(), reverse=reverse)
-        for index, (val, k) in enumerate(l): self.tree.move(k, '', index)
+        self.program_list.sort_by(col, reverse)
         self.tree.heading(col, command=lambda _col=col: self.sort_treeview_column(_col, not reverse))
 
     def toggle_custom_path_entry(self):
@@ -699,10 +222,15 @@ class ProgramManagerUI:
 
     def update_ui_for_long_task(self, is_running: bool, task_name_key: str = "", format_args: dict = None):
         state = tk.DISABLED if is_running else tk.NORMAL
+        # The watcher holds handles on install folders that moves delete, and would race them on ProgramInfo.
+        if is_running: self.program_manager.stop_size_watch()
+        self.size_watch_pending = not is_running
         self.refresh_btn.config(state=state)
         self.move_btn.config(state=state)
         self.revert_btn.config(state=state if self.last_move_info else tk.DISABLED)
-        self.tree.config(selectmode="none" if is_running else "browse")
+        self.tree.config(selectmode="none" if is_running else "extended")
+        self.pause_btn.config(state=tk.NORMAL if is_running else tk.DISABLED, text=get_text("pause"))
+        self.cancel_btn.config(state=tk.NORMAL if is_running else tk.DISABLED)
 
         if is_running:
             task_text = get_text(task_name_key, **(format_args or {})) if task_name_key else "..."
@@ -717,51 +245,128 @@ class ProgramManagerUI:
 
     def load_programs_threaded(self):
         if self.active_thread and self.active_thread.is_alive():
+            if self.loading:
+                # Sizing the old list is wasted work now; cancel it and start over once it has stopped.
+                self.operation_token.cancel()
+                self.reload_pending = True
+                self.refresh_btn.config(state=tk.DISABLED)
+                self.status_var.set(get_text("status_restarting_load"))
+                return
             messagebox.showwarning(get_text("warning"), get_text("ongoing_operation_warning")); return
+        self.reload_pending = False
+        self.loading = True
+        self.size_priority_state = None
+        self.operation_token = CancelToken()
         self.update_ui_for_long_task(True, "status_loading_programs")
-        for item in self.tree.get_children(): self.tree.delete(item)
         self.programs_data.clear()
+        self.program_list.show(self.programs_data)
+        self.pending_registry_delta = None
 
-        self.active_thread = threading.Thread(target=self.program_manager.get_installed_programs_threaded, args=(self.progress_queue,))
+        self.active_thread = threading.Thread(target=self.program_manager.get_installed_programs_threaded, args=(self.progress_queue, self.operation_token))
         self.active_thread.daemon = True; self.active_thread.start()
 
-    def filter_programs(self, event=None):
-        search_text = self.search_var.get().lower()
-        for item in self.tree.get_children(): self.tree.delete(item)
-        for name, info in self.programs_data.items():
-            if (search_text in info.name.lower() or
-                search_text in (info.publisher.lower() if info.publisher else "") or
-                search_text in (info.version.lower() if info.version else "")):
-                self.tree.insert("", tk.END, values=(info.name, info.publisher, info.version, info.size, info.install_date, info.install_location), iid=name)
-
-    def move_selected_program_threaded(self):
-        if self.active_thread and self.active_thread.is_alive(): messagebox.showwarning(get_text("warning"), get_text("ongoing_operation_warning")); return
-        selected_item_id = self.tree.selection()
-        if not selected_item_id: messagebox.showinfo(get_text("info"), get_text("select_program_prompt")); return
+    def toggle_pause(self):
+        token = self.operation_token
+        if not token or not (self.active_thread and self.active_thread.is_alive()): return
+        if token.paused:
+            token.resume()
+            self.pause_btn.config(text=get_text("pause"))
+            self.progress_bar.config(mode='determinate')
+        else:
+            token.pause()
+            self.pause_btn.config(text=get_text("resume"))
+            self.status_var.set(get_text("status_paused"))
+
+    def cancel_operation(self):
+        token = self.operation_token
+        if not token or token.cancelled or not (self.active_thread and self.active_thread.is_alive()): return
+        keep_partial = False
+        if not self.loading:
+            # Moves and reverts leave a partial copy behind; ask whether to keep it for a later resume.
+            answer = messagebox.askyesnocancel(get_text("confirmation"), get_text("confirm_cancel_keep_partial"), icon=messagebox.WARNING)
+            if answer is None: return
+            keep_partial = answer
+        token.cancel(keep_partial=keep_partial)
+        self.pause_btn.config(state=tk.DISABLED, text=get_text("pause"))
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.status_var.set(get_text("status_cancelling"))
+
+    def update_size_priorities(self):
+        # Selected programs are sized first, then the rows on screen, then the search matches.
+        view = self.program_list
+        selected = view.selection()
+        visible = view.visible_names()
+        state = (tuple(selected), tuple(visible), view.model.search_text, len(view.model.rows))
+        if state == self.size_priority_state: return
+        self.size_priority_state = state
+        self.program_manager.prioritize_sizes(selected, visible, view.model.rows if view.model.search_text else [])
 
-        program_name = selected_item_id[0]
-        program_info = self.programs_data.get(program_name)
+    def filter_programs(self, event=None):
+        self.program_list.filter_later(self.search_var.get())
+
+    def start_registry_watcher(self):
+        if self.registry_watcher or self.program_manager.registry is None: return
+        self.registry_watcher = RegistryWatcher(self.program_manager.registry, lambda delta: self.progress_queue.put(("registry_changed", delta)))
+        self.registry_watcher.start()
+
+    def update_speed_limit_labels(self):
+        for index, mbps in enumerate(SPEED_LIMIT_CHOICES):
+            label = get_text("speed_limit_mbps", mbps=mbps) if mbps else get_text("speed_unlimited")
+            self.speed_limit_menu.entryconfig(index, label=label)
+
+    def apply_io_settings(self):
+        # The throttle is shared with running moves, so a new limit applies to them at once.
+        self.program_manager.io_throttle.configure(self.speed_limit_var.get(), 0, self.adaptive_io_var.get())
+        self.program_manager.low_io_priority = self.low_io_priority_var.get()
+
+    def toggle_verify_copies(self):
+        # Read when a copy starts, so it applies from the next move or revert.
+        self.program_manager.verify_copies = self.verify_copies_var.get()
+
+    def toggle_size_watch(self):
+        self.program_manager.keep_dir_manifests = self.watch_sizes_var.get()
+        if self.watch_sizes_var.get(): self.restart_size_watch()
+        else:
+            self.program_manager.stop_size_watch()
+            self.program_manager.dir_manifests.clear()
+
+    def restart_size_watch(self):
+        # Like registry deltas, waits until no operation is running.
+        self.size_watch_pending = False
+        if not self.watch_sizes_var.get() or not self.programs_data: return
+        if self.active_thread and self.active_thread.is_alive(): self.size_watch_pending = True; return
+        self.program_manager.start_size_watch(self.progress_queue)
+
+    def apply_pending_registry_delta(self):
+        # Deltas wait for any running operation; they touch the same ProgramInfo objects.
+        if not self.pending_registry_delta or (self.active_thread and self.active_thread.is_alive()): return
+        delta, self.pending_registry_delta = self.pending_registry_delta, None
+        self.program_manager.stop_size_watch()
+        self.active_thread = threading.Thread(target=self.program_manager.apply_registry_delta, args=(delta, self.progress_queue))
+        self.active_thread.daemon = True; self.active_thread.start()
 
-        if not program_info or not program_info.install_location or not os.path.exists(program_info.install_location):
-            messagebox.showerror(get_text("error"), get_text("program_location_not_found", location=program_info.install_location if program_info else 'N/A')); return
+    def update_changed_programs(self, updated_names: List[str], removed_names: List[str]):
+        self.program_list.update_rows(updated_names, removed_names)
 
+    def resolve_target_path(self, program_info: ProgramInfo, batch: bool = False) -> Optional[str]:
         target_path_input = ""
         if self.use_custom_path_var.get():
             target_path_input = os.path.normpath(self.custom_target_path_var.get().strip())
-            if not target_path_input : messagebox.showerror(get_text("error"), get_text("empty_custom_path")); return
+            if not target_path_input : messagebox.showerror(get_text("error"), get_text("empty_custom_path")); return None
             if os.path.abspath(target_path_input).startswith(os.path.abspath(program_info.install_location)):
-                 messagebox.showerror(get_text("error"), get_text("target_path_in_source_error")); return
+                 messagebox.showerror(get_text("error"), get_text("target_path_in_source_error")); return None
             try:
                 parent_dir = os.path.dirname(target_path_input)
-                if os.path.isdir(target_path_input):
+                # A batch cannot share one new folder, so each program gets its own under it.
+                if batch or os.path.isdir(target_path_input):
                     target_path_input = os.path.join(target_path_input, os.path.basename(program_info.install_location))
                 elif not os.path.exists(parent_dir):
-                     messagebox.showerror(get_text("error"), get_text("invalid_custom_path_parent", parent_dir=parent_dir)); return
+                     messagebox.showerror(get_text("error"), get_text("invalid_custom_path_parent", parent_dir=parent_dir)); return None
             except Exception as e:
-                messagebox.showerror(get_text("error"), f"{get_text('custom_path_validation_error')}: {e}"); return
+                messagebox.showerror(get_text("error"), f"{get_text('custom_path_validation_error')}: {e}"); return None
         else:
             target_drive = self.target_drive_var.get()
-            if not target_drive: messagebox.showinfo(get_text("info"), get_text("select_target_drive_prompt")); return
+            if not target_drive: messagebox.showinfo(get_text("info"), get_text("select_target_drive_prompt")); return None
             original_loc_path = Path(program_info.install_location)
             if original_loc_path.drive.upper() == "C:":
                  relative_to_c_root = str(original_loc_path.relative_to(original_loc_path.anchor))
@@ -770,23 +375,71 @@ class ProgramManagerUI:
                  target_path_input = os.path.join(target_drive + "\\", original_loc_path.name)
 
         if os.path.abspath(target_path_input).lower() == os.path.abspath(program_info.install_location).lower():
-            messagebox.showerror(get_text("error"), get_text("source_target_same_error")); return
+            messagebox.showerror(get_text("error"), get_text("source_target_same_error")); return None
+        return os.path.abspath(target_path_input)
+
+    def move_selected_program_threaded(self):
+        if self.active_thread and self.active_thread.is_alive(): messagebox.showwarning(get_text("warning"), get_text("ongoing_operation_warning")); return
+        selected_item_id = self.program_list.selection()
+        if not selected_item_id: messagebox.showinfo(get_text("info"), get_text("select_program_prompt")); return
+        if len(selected_item_id) > 1:
+            self.move_selected_programs_batch(selected_item_id); return
+
+        program_name = selected_item_id[0]
+        program_info = self.programs_data.get(program_name)
+
+        if not program_info or not program_info.install_location or not os.path.exists(program_info.install_location):
+            messagebox.showerror(get_text("error"), get_text("program_location_not_found", location=program_info.install_location if program_info else 'N/A')); return
+
+        target_path = self.resolve_target_path(program_info)
+        if not target_path: return
 
         delete_source = self.delete_source_var.get()
         confirmation_key = "confirm_move_with_delete_warning" if delete_source else "confirm_move_prompt"
         confirmation_message = get_text(confirmation_key,
                                         program_name=program_name,
                                         source=program_info.install_location,
-                                        target=os.path.abspath(target_path_input))
+                                        target=target_path)
         if not messagebox.askyesno(get_text("confirmation"), confirmation_message, icon=messagebox.WARNING if delete_source else messagebox.QUESTION):
             return
 
         if not is_admin():
             messagebox.showwarning(get_text("warning"), get_text("admin_rights_crucial_warning"))
 
+        self.operation_token = CancelToken()
         self.update_ui_for_long_task(True, "status_moving_program", format_args={'program_name': program_name})
         self.active_thread = threading.Thread(target=self.program_manager.move_program_threaded,
-                                          args=(program_info, os.path.abspath(target_path_input), delete_source, self.progress_queue))
+                                          args=(program_info, target_path, delete_source, self.progress_queue, self.operation_token))
+        self.active_thread.daemon = True; self.active_thread.start()
+
+    def move_selected_programs_batch(self, selected_item_ids):
+        moves = []
+        for program_name in selected_item_ids:
+            program_info = self.programs_data.get(program_name)
+            if not program_info or not program_info.install_location or not os.path.exists(program_info.install_location):
+                messagebox.showerror(get_text("error"), get_text("program_location_not_found", location=program_info.install_location if program_info else program_name)); return
+            target_path = self.resolve_target_path(program_info, batch=True)
+            if not target_path: return
+            moves.append((program_info, target_path))
+        conflict_error = self.program_manager.batch_conflict_error(moves)
+        if conflict_error:
+            messagebox.showerror(get_text("error"), conflict_error); return
+
+        delete_source = self.delete_source_var.get()
+        move_lines = "\n".join(f"{info.name}: {info.install_location} -> {target}" for info, target in moves[:15])
+        if len(moves) > 15: move_lines += "\n..."
+        confirmation_key = "confirm_batch_move_with_delete_warning" if delete_source else "confirm_batch_move_prompt"
+        if not messagebox.askyesno(get_text("confirmation"), get_text(confirmation_key, count=len(moves), moves=move_lines),
+                                   icon=messagebox.WARNING if delete_source else messagebox.QUESTION):
+            return
+
+        if not is_admin():
+            messagebox.showwarning(get_text("warning"), get_text("admin_rights_crucial_warning"))
+
+        self.operation_token = CancelToken()
+        self.update_ui_for_long_task(True, "status_moving_batch", format_args={'count': len(moves)})
+        self.active_thread = threading.Thread(target=self.program_manager.move_programs_threaded,
+                                          args=(moves, delete_source, self.progress_queue, self.operation_token))
         self.active_thread.daemon = True; self.active_thread.start()
 
     def revert_last_move_threaded(self):
@@ -805,15 +458,15 @@ class ProgramManagerUI:
 
         self.progress_queue.put(("status", get_text("status_reverting_move_prep", program_name=program_name)))
 
+        self.operation_token = CancelToken()
         self.update_ui_for_long_task(True, "status_reverting_move", format_args={'program_name': program_name})
         self.active_thread = threading.Thread(target=self.program_manager.revert_move_threaded,
-                                          args=(self.last_move_info, self.progress_queue))
+                                          args=(self.last_move_info, self.progress_queue, self.operation_token))
         self.active_thread.daemon = True; self.active_thread.start()
 
     def check_queue_periodically(self):
         try:
-            while True:
-                message = self.progress_queue.get_nowait()
+            for message in self.progress_queue.drain():
                 msg_type, *payload = message
 
                 if msg_type == "status":
@@ -830,7 +483,7 @@ class ProgramManagerUI:
                     self.status_var.set(get_text(key_map.get(msg_type, "unknown_progress"), current=current, total=total))
                     self.progress_bar.config(mode='determinate'); self.progress_bar['value'] = (current / total) * 100 if total > 0 else 0
                 elif msg_type in ["progress_copy", "progress_delete"]:
-                    current, total, filename = payload
+                    current, total, filename = payload[:3]
                     status_key = "status_copying_file" if msg_type == "progress_copy" else "status_deleting_file"
                     error_info = ""
                     if "(Hata: " in filename:
@@ -840,13 +493,51 @@ class ProgramManagerUI:
                          status_key = "status_copy_error_file" if msg_type == "progress_copy" else "status_delete_error_file"
                     self.status_var.set(get_text(status_key, current=current, total=total, filename=filename, error=error_info))
                     self.progress_bar.config(mode='determinate'); self.progress_bar['value'] = (current / total) * 100 if total > 0 else 0
+                elif msg_type == "progress_batch":
+                    finished, total, running, program_name, bytes_copied, mb_per_second = payload
+                    self.status_var.set(get_text("status_batch_progress", finished=finished, total=total, running=running,
+                                                 program_name=program_name, mb=bytes_copied / (1024 * 1024), mb_s=mb_per_second))
+                    self.progress_bar.config(mode='determinate'); self.progress_bar['value'] = (finished / total) * 100 if total > 0 else 0
                 elif msg_type == "delete_error":
                      print(f"[UI] {get_text('status_delete_error_file', filename=payload[0], error=payload[1])}")
-                elif msg_type == "finished_load":
+                elif msg_type == "programs_loaded":
+                    # Rows appear now; sizes and shortcuts arrive as load_delta messages.
                     self.programs_data = payload[0]
+                    self.program_list.show(self.programs_data, self.search_var.get())
+                    # Selecting rows and refreshing again are allowed from here on; moves wait for finished_load.
+                    self.tree.config(selectmode="extended")
+                    if not self.reload_pending: self.refresh_btn.config(state=tk.NORMAL)
+                elif msg_type == "load_delta":
+                    self.update_changed_programs(payload[1], [])
+                elif msg_type == "load_cancelled":
+                    self.loading = False
+                    self.update_ui_for_long_task(False)
+                    self.status_var.set(get_text("status_load_cancelled"))
+                elif msg_type == "cancelled":
+                    self.update_ui_for_long_task(False)
+                    messagebox.showinfo(get_text("info"), payload[0])
+                    self.status_var.set(get_text("status_ready"))
+                elif msg_type == "finished_load":
+                    self.loading = False
+                    if payload[0] is not self.programs_data:
+                        self.programs_data = payload[0]
+                        self.program_list.show(self.programs_data, self.search_var.get())
                     self.update_ui_for_long_task(False)
-                    self.filter_programs()
                     self.status_var.set(get_text("status_programs_found", count=len(self.programs_data)))
+                    self.start_registry_watcher()
+                elif msg_type == "registry_changed":
+                    delta = payload[0]
+                    self.pending_registry_delta = self.pending_registry_delta.merge(delta) if self.pending_registry_delta else delta
+                elif msg_type == "programs_changed":
+                    updated_names, removed_names = payload
+                    self.update_changed_programs(updated_names, removed_names)
+                    self.progress_bar['value'] = 0
+                    self.status_var.set(get_text("status_programs_changed", updated=len(updated_names), removed=len(removed_names), count=len(self.programs_data)))
+                    self.restart_size_watch()
+                elif msg_type == "sizes_changed":
+                    self.update_changed_programs(payload[0], [])
+                    if not (self.active_thread and self.active_thread.is_alive()):
+                        self.status_var.set(get_text("status_sizes_changed", count=len(payload[0])))
                 elif msg_type == "finished_move":
                     success, shortcuts_updated, registry_updated, delete_warning, last_move_details = payload
                     self.update_ui_for_long_task(False)
@@ -855,11 +546,9 @@ class ProgramManagerUI:
                         self.last_move_info = last_move_details
                         self.revert_btn.config(state=tk.NORMAL)
                         try:
-                            if self.tree.exists(program_name_moved):
-                                new_loc = last_move_details['new_location']
-                                self.tree.set(program_name_moved, column="location", value=new_loc)
-                                if program_name_moved in self.programs_data:
-                                    self.programs_data[program_name_moved].install_location = new_loc
+                            if program_name_moved in self.programs_data:
+                                self.programs_data[program_name_moved].install_location = last_move_details['new_location']
+                                self.update_changed_programs([program_name_moved], [])
                         except Exception as e: print(f"Error updating treeview after move: {e}")
 
                         msg = get_text("move_successful_msg", program_name=program_name_moved)
@@ -871,6 +560,27 @@ class ProgramManagerUI:
                         messagebox.showinfo(get_text("info"), msg)
                     else: messagebox.showerror(get_text("error"), get_text("move_failed_msg", program_name=program_name_moved, error=self.program_manager.get_last_error()))
                     self.status_var.set(get_text("status_ready"))
+                elif msg_type == "finished_batch":
+                    jobs = payload[0]
+                    self.update_ui_for_long_task(False)
+                    for job in jobs:
+                        if job.state != MoveJob.DONE: continue
+                        self.last_move_info = job.move_details
+                        job.program_info.install_location = job.move_details['new_location']
+                    try: self.update_changed_programs([job.program_info.name for job in jobs if job.state == MoveJob.DONE], [])
+                    except Exception as e: print(f"Error updating treeview after move: {e}")
+                    self.revert_btn.config(state=tk.NORMAL if self.last_move_info else tk.DISABLED)
+                    succeeded = sum(1 for job in jobs if job.state == MoveJob.DONE)
+                    msg = get_text("batch_move_summary", succeeded=succeeded, total=len(jobs),
+                                   mb=sum(job.bytes_copied for job in jobs) / (1024 * 1024),
+                                   seconds=max((job.finished_at for job in jobs), default=0) - min((job.started_at for job in jobs if job.started_at), default=0))
+                    for job in jobs:
+                        if job.state != MoveJob.DONE:
+                            msg += get_text("batch_move_failed_item", program_name=job.program_info.name, error=job.error)
+                        elif job.delete_warning:
+                            msg += get_text("batch_move_failed_item", program_name=job.program_info.name, error=job.delete_warning)
+                    (messagebox.showinfo if succeeded == len(jobs) else messagebox.showwarning)(get_text("info"), msg)
+                    self.status_var.set(get_text("status_ready"))
                 elif msg_type == "finished_revert":
                     success, reverted_shortcuts_count, registry_reverted, delete_current_loc_warning = payload
                     self.update_ui_for_long_task(False)
@@ -878,10 +588,9 @@ class ProgramManagerUI:
                     original_location_reverted_to = self.last_move_info['original_location'] if self.last_move_info else "?"
                     if success:
                         try:
-                            if self.tree.exists(program_name_reverted):
-                                self.tree.set(program_name_reverted, column="location", value=original_location_reverted_to)
-                                if program_name_reverted in self.programs_data:
-                                    self.programs_data[program_name_reverted].install_location = original_location_reverted_to
+                            if program_name_reverted in self.programs_data:
+                                self.programs_data[program_name_reverted].install_location = original_location_reverted_to
+                                self.update_changed_programs([program_name_reverted], [])
                         except Exception as e: print(f"Error updating treeview after revert: {e}")
 
                         self.last_move_info = None
@@ -895,16 +604,22 @@ class ProgramManagerUI:
                     else: messagebox.showerror(get_text("error"), get_text("revert_failed_msg", program_name=program_name_reverted, error=self.program_manager.get_last_error()))
                     self.status_var.set(get_text("status_ready"))
                 elif msg_type == "error" or msg_type == "warning":
+                    if msg_type == "error": self.loading = False
                     self.update_ui_for_long_task(False)
                     title = get_text(msg_type)
                     message_text = payload[0]
                     (messagebox.showerror if msg_type == "error" else messagebox.showwarning)(title, message_text)
                     self.status_var.set(get_text("status_error_occurred"))
-        except queue.Empty: pass
+            if self.loading: self.update_size_priorities()
+            # Progress drained after the pause would otherwise hide it.
+            if self.operation_token and self.operation_token.paused: self.status_var.set(get_text("status_paused"))
+            if self.reload_pending and not (self.active_thread and self.active_thread.is_alive()): self.load_programs_threaded()
+            self.apply_pending_registry_delta()
+            if self.size_watch_pending: self.restart_size_watch()
         finally: self.root.after(100, self.check_queue_periodically)
 
     def show_program_details(self):
-        selected_item_id = self.tree.selection()
+        selected_item_id = self.program_list.selection()
         if not selected_item_id: messagebox.showinfo(get_text("info"), get_text("select_program_prompt")); return
         program_name = selected_item_id[0]
         program_info = self.programs_data.get(program_name)
@@ -954,7 +669,7 @@ class ProgramManagerUI:
             f_x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
             f_y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
 
-            for f_path in program_info.files[:100]: f_text_area.insert(tk.END, f"{f_path}\n")
+            for f_path in program_info.files.page(0, 100): f_text_area.insert(tk.END, f"{f_path}\n")
             if len(program_info.files) > 100:
                 f_text_area.insert(tk.END, f"\n... and {len(program_info.files) - 100} more files.")
             f_text_area.config(state=tk.DISABLED)
@@ -983,4 +698,5 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main() 
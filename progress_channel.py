@@ -0,0 +1,62 @@
+import threading
+from typing import Any, Dict, List, Tuple
+
+# Message types that only describe "where we are now"; a newer one replaces an
+# older one of the same type that the consumer has not seen yet.
+COALESCED_TYPES = frozenset({
+    "progress_programs", "progress_sizes", "progress_shortcuts", "progress_update_shortcuts",
+    "progress_copy", "progress_delete", "progress_batch",
+})
+
+
+class ProgressChannel:
+    """Drop-in replacement for the worker -> UI progress_queue.
+
+    Workers keep calling put() with the same tuples as before. Progress
+    tuples are coalesced, so only the latest one per type is held, while
+    every other message (status, warning, error, finished_*) is kept in
+    order. The UI drains the channel on its own timer; memory stays bounded
+    by the number of message types no matter how fast workers report.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._events: List[Tuple[int, tuple]] = []
+        self._latest: Dict[str, Tuple[int, tuple]] = {}
+        self.received: Dict[str, int] = {}
+        self.delivered: Dict[str, int] = {}
+
+    def put(self, message: tuple, block: bool = True, timeout: Any = None):
+        msg_type = message[0]
+        with self._lock:
+            self._seq += 1
+            self.received[msg_type] = self.received.get(msg_type, 0) + 1
+            if msg_type in COALESCED_TYPES:
+                self._latest[msg_type] = (self._seq, message)
+            else:
+                self._events.append((self._seq, message))
+
+    put_nowait = put
+
+    def drain(self) -> List[tuple]:
+        """Returns pending events plus the latest progress per type, in put() order."""
+        with self._lock:
+            pending = self._events
+            pending.extend(self._latest.values())
+            self._events = []
+            self._latest = {}
+        pending.sort(key=lambda item: item[0])
+        messages = [message for _, message in pending]
+        with self._lock:
+            for message in messages:
+                self.delivered[message[0]] = self.delivered.get(message[0], 0) + 1
+        return messages
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._events) + len(self._latest)
+
+    def coalesced_count(self) -> int:
+        with self._lock:
+            return sum(self.received.values()) - sum(self.delivered.values()) - len(self._events) - len(self._latest)
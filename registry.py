@@ -0,0 +1,240 @@
+import abc
+import errno
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+try:
+    import winreg
+except ImportError:
+    winreg = None
+
+HKLM = "HKEY_LOCAL_MACHINE"
+HKCU = "HKEY_CURRENT_USER"
+
+UNINSTALL_ROOTS: List[Tuple[str, str]] = [
+    (HKLM, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+    (HKLM, r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
+    (HKCU, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+]
+
+# FILETIME (100ns ticks since 1601) of the Unix epoch.
+_FILETIME_EPOCH = 116444736000000000
+
+
+class RegistryBackend(abc.ABC):
+    """Minimal registry access used by ProgramManager.
+
+    Roots are named by string (HKEY_LOCAL_MACHINE, HKEY_CURRENT_USER), as
+    they are in ProgramInfo.registry_keys. Missing keys and values raise
+    FileNotFoundError and denied writes raise PermissionError, like winreg.
+    A backend must implement every abstract method; close_key and refresh
+    are optional.
+    """
+
+    requires_admin = True
+
+    @abc.abstractmethod
+    def open_key(self, root: str, path: str, write: bool = False) -> Any:
+        raise NotImplementedError
+
+    def close_key(self, handle: Any):
+        pass
+
+    @abc.abstractmethod
+    def subkey_names(self, handle: Any) -> List[str]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def query_value(self, handle: Any, name: str) -> Any:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def values(self, handle: Any) -> Dict[str, Any]:
+        """All values of a key in one pass, by name."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def last_write_time(self, handle: Any) -> int:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set_value(self, handle: Any, name: str, value: str):
+        raise NotImplementedError
+
+    def refresh(self) -> bool:
+        """Picks up changes made outside this process where the backend has to (file-backed stand-ins)."""
+        return False
+
+
+class WinRegistry(RegistryBackend):
+    def __init__(self):
+        self.roots = {HKLM: winreg.HKEY_LOCAL_MACHINE, HKCU: winreg.HKEY_CURRENT_USER}
+
+    def open_key(self, root: str, path: str, write: bool = False) -> Any:
+        return winreg.OpenKey(self.roots[root], path, 0, winreg.KEY_SET_VALUE if write else winreg.KEY_READ)
+
+    def close_key(self, handle: Any):
+        try: winreg.CloseKey(handle)
+        except OSError: pass
+
+    def subkey_names(self, handle: Any) -> List[str]:
+        names = []
+        for index in range(winreg.QueryInfoKey(handle)[0]):
+            try: names.append(winreg.EnumKey(handle, index))
+            except OSError: break
+        return names
+
+    def query_value(self, handle: Any, name: str) -> Any:
+        return winreg.QueryValueEx(handle, name)[0]
+
+    def values(self, handle: Any) -> Dict[str, Any]:
+        values = {}
+        for index in range(winreg.QueryInfoKey(handle)[1]):
+            try: name, data, _value_type = winreg.EnumValue(handle, index)
+            except OSError: break
+            values[name] = data
+        return values
+
+    def last_write_time(self, handle: Any) -> int:
+        return winreg.QueryInfoKey(handle)[2]
+
+    def set_value(self, handle: Any, name: str, value: str):
+        winreg.SetValueEx(handle, name, 0, winreg.REG_SZ, value)
+
+
+class _MemoryKey:
+    __slots__ = ("path", "values", "subkeys", "last_write")
+
+    def __init__(self, path: str, last_write: int):
+        self.path = path
+        self.values: Dict[str, Any] = {}
+        self.subkeys: Dict[str, str] = {}
+        self.last_write = last_write
+
+
+class MemoryRegistry(RegistryBackend):
+    """In-memory registry that can be saved to and loaded from a JSON file.
+
+    Lookups are case-insensitive like the real registry. Holds synthetic
+    uninstall trees for profiling and for exercising the enumeration and
+    update paths off Windows; read_only=True makes every write open fail
+    with PermissionError.
+    """
+
+    requires_admin = False
+
+    def __init__(self, read_only: bool = False):
+        self.read_only = read_only
+        self._keys: Dict[str, _MemoryKey] = {}
+        self.source_path: Optional[str] = None
+        self._source_mtime_ns = 0
+
+    @staticmethod
+    def _now() -> int:
+        return _FILETIME_EPOCH + time.time_ns() // 100
+
+    def key_count(self) -> int:
+        return len(self._keys)
+
+    def add_key(self, full_path: str, values: Optional[Dict[str, Any]] = None, last_write: Optional[int] = None) -> _MemoryKey:
+        """Creates full_path (root included) and any missing parents, then merges values into it."""
+        stamp = last_write if last_write is not None else self._now()
+        parts = full_path.split("\\")
+        parent = None
+        for depth in range(1, len(parts) + 1):
+            path = "\\".join(parts[:depth])
+            key = self._keys.get(path.casefold())
+            if key is None:
+                key = self._keys[path.casefold()] = _MemoryKey(path, stamp)
+                if parent is not None:
+                    parent.subkeys[parts[depth - 1].casefold()] = parts[depth - 1]
+            parent = key
+        if values:
+            key.values.update(values)
+            key.last_write = stamp
+        return key
+
+    def get_values(self, full_path: str) -> Dict[str, Any]:
+        key = self._keys.get(full_path.casefold())
+        if key is None:
+            raise FileNotFoundError(errno.ENOENT, "registry key not found", full_path)
+        return dict(key.values)
+
+    def open_key(self, root: str, path: str, write: bool = False) -> Any:
+        full_path = f"{root}\\{path}"
+        if write and self.read_only:
+            raise PermissionError(errno.EACCES, "registry is read-only", full_path)
+        key = self._keys.get(full_path.casefold())
+        if key is None:
+            raise FileNotFoundError(errno.ENOENT, "registry key not found", full_path)
+        return key
+
+    def subkey_names(self, handle: _MemoryKey) -> List[str]:
+        return list(handle.subkeys.values())
+
+    def query_value(self, handle: _MemoryKey, name: str) -> Any:
+        try:
+            return handle.values[name]
+        except KeyError:
+            raise FileNotFoundError(errno.ENOENT, "registry value not found", f"{handle.path}\\{name}") from None
+
+    def values(self, handle: _MemoryKey) -> Dict[str, Any]:
+        return dict(handle.values)
+
+    def last_write_time(self, handle: _MemoryKey) -> int:
+        return handle.last_write
+
+    def set_value(self, handle: _MemoryKey, name: str, value: str):
+        handle.values[name] = value
+        handle.last_write = self._now()
+
+    def save(self, path: str):
+        data = {"version": 1, "keys": {key.path: {"last_write": key.last_write, "values": key.values}
+                                       for key in self._keys.values() if key.values}}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        if path == self.source_path:
+            self._source_mtime_ns = os.stat(path).st_mtime_ns
+
+    def refresh(self) -> bool:
+        """Reloads the file this registry was loaded from if it changed on disk since."""
+        if not self.source_path:
+            return False
+        try:
+            mtime_ns = os.stat(self.source_path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime_ns == self._source_mtime_ns:
+            return False
+        reloaded = self.load(self.source_path, read_only=self.read_only)
+        self._keys = reloaded._keys
+        self._source_mtime_ns = reloaded._source_mtime_ns
+        return True
+
+    @classmethod
+    def load(cls, path: str, read_only: bool = False) -> 'MemoryRegistry':
+        # Stat first, so a write that lands while reading is picked up by the next refresh().
+        mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        registry = cls(read_only=read_only)
+        for full_path, entry in data.get("keys", {}).items():
+            registry.add_key(full_path, entry.get("values"), entry.get("last_write"))
+        registry.source_path = path
+        registry._source_mtime_ns = mtime_ns
+        return registry
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[Tuple[str, Dict[str, Any]]], read_only: bool = False) -> 'MemoryRegistry':
+        registry = cls(read_only=read_only)
+        for full_path, values in keys:
+            registry.add_key(full_path, values)
+        return registry
+
+
+def default_registry() -> Optional[RegistryBackend]:
+    """The live Windows registry, or None where winreg is unavailable."""
+    return WinRegistry() if winreg is not None else None
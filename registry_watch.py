@@ -0,0 +1,199 @@
+import ctypes
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from registry import UNINSTALL_ROOTS, RegistryBackend, WinRegistry, winreg
+
+DEFAULT_POLL_INTERVAL = 5.0
+DEFAULT_SETTLE_DELAY = 1.0
+
+REG_NOTIFY_CHANGE_NAME = 0x1
+REG_NOTIFY_CHANGE_LAST_SET = 0x4
+WAIT_TIMEOUT = 0x102
+KEY_NOTIFY = 0x0010
+
+KeySnapshot = Dict[str, int]
+
+
+class RegistryDelta:
+    def __init__(self, added: List[str], removed: List[str], changed: List[str]):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def merge(self, other: 'RegistryDelta') -> 'RegistryDelta':
+        """Combines a pending delta with a newer one, as if both were seen at once."""
+        added, removed, changed = set(self.added), set(self.removed), set(self.changed)
+        for key in other.added:
+            if key in removed:
+                removed.discard(key); changed.add(key)
+            else:
+                added.add(key)
+        for key in other.removed:
+            if key in added:
+                added.discard(key)
+            else:
+                changed.discard(key); removed.add(key)
+        changed.update(key for key in other.changed if key not in added)
+        return RegistryDelta(sorted(added), sorted(removed), sorted(changed))
+
+    def __repr__(self) -> str:
+        return f"RegistryDelta(+{len(self.added)} -{len(self.removed)} ~{len(self.changed)})"
+
+
+def snapshot_uninstall_keys(registry: RegistryBackend, roots: List[Tuple[str, str]] = UNINSTALL_ROOTS) -> KeySnapshot:
+    """Maps every uninstall subkey (as in ProgramInfo.registry_keys) to its last-write time."""
+    snapshot: KeySnapshot = {}
+    for root_name, subkey_path in roots:
+        try:
+            key = registry.open_key(root_name, subkey_path)
+        except OSError:
+            continue
+        try:
+            for subkey_name in registry.subkey_names(key):
+                try: subkey = registry.open_key(root_name, f"{subkey_path}\\{subkey_name}")
+                except OSError: continue
+                try: snapshot[f"{root_name}\\{subkey_path}\\{subkey_name}"] = registry.last_write_time(subkey)
+                except OSError: pass
+                finally: registry.close_key(subkey)
+        except OSError:
+            pass
+        finally:
+            registry.close_key(key)
+    return snapshot
+
+
+def diff_snapshots(old: KeySnapshot, new: KeySnapshot) -> RegistryDelta:
+    return RegistryDelta(added=sorted(new.keys() - old.keys()),
+                         removed=sorted(old.keys() - new.keys()),
+                         changed=sorted(k for k in new.keys() & old.keys() if new[k] != old[k]))
+
+
+class _ChangeNotifier:
+    """Waits on RegNotifyChangeKeyValue for the uninstall roots (Windows only)."""
+
+    def __init__(self, registry: WinRegistry, roots: List[Tuple[str, str]]):
+        self._advapi32 = ctypes.windll.advapi32
+        self._kernel32 = ctypes.windll.kernel32
+        self._advapi32.RegNotifyChangeKeyValue.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_uint32, ctypes.c_void_p, ctypes.c_int]
+        self._kernel32.CreateEventW.restype = ctypes.c_void_p
+        self._kernel32.CreateEventW.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+        self._kernel32.WaitForMultipleObjects.argtypes = [ctypes.c_uint32, ctypes.c_void_p, ctypes.c_int, ctypes.c_uint32]
+        self._kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+        self._keys = []
+        self._events = []
+        for root_name, subkey_path in roots:
+            try:
+                key = winreg.OpenKey(registry.roots[root_name], subkey_path, 0, winreg.KEY_READ | KEY_NOTIFY)
+            except OSError:
+                continue
+            self._keys.append(key)
+            self._events.append(self._kernel32.CreateEventW(None, False, False, None))
+        for index in range(len(self._keys)):
+            self._arm(index)
+        self._handles = (ctypes.c_void_p * len(self._events))(*self._events)
+
+    def _arm(self, index: int):
+        error = self._advapi32.RegNotifyChangeKeyValue(self._keys[index].handle, True,
+                                                       REG_NOTIFY_CHANGE_NAME | REG_NOTIFY_CHANGE_LAST_SET,
+                                                       self._events[index], True)
+        if error:
+            raise OSError(error, "RegNotifyChangeKeyValue failed")
+
+    def wait(self, timeout: float) -> bool:
+        if not self._events:
+            return False
+        result = self._kernel32.WaitForMultipleObjects(len(self._events), self._handles, False, int(timeout * 1000))
+        if result == WAIT_TIMEOUT or result >= len(self._events):
+            return False
+        # Notifications are one-shot; re-arm before the snapshot so nothing is missed.
+        self._arm(result)
+        return True
+
+    def close(self):
+        for key in self._keys:
+            try: winreg.CloseKey(key)
+            except OSError: pass
+        for event in self._events:
+            self._kernel32.CloseHandle(event)
+        self._keys, self._events = [], []
+
+
+class RegistryWatcher:
+    """Reports added, removed and changed uninstall keys as RegistryDelta.
+
+    On Windows the thread sleeps in RegNotifyChangeKeyValue on the three
+    uninstall roots. Other backends (and Windows, if arming the
+    notification fails) fall back to polling every poll_interval seconds,
+    calling registry.refresh() first so a file-backed registry is reloaded.
+    Either way the changed keys are found by diffing last-write snapshots,
+    after waiting settle_delay for installers that write many keys in a row.
+    on_change runs on the watcher thread.
+    """
+
+    def __init__(self, registry: RegistryBackend, on_change: Callable[[RegistryDelta], None],
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, settle_delay: float = DEFAULT_SETTLE_DELAY,
+                 roots: List[Tuple[str, str]] = UNINSTALL_ROOTS):
+        self.registry = registry
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.settle_delay = settle_delay
+        self.roots = roots
+        self.mode = "stopped"
+        self.deltas_reported = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot: KeySnapshot = {}
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._snapshot = snapshot_uninstall_keys(self.registry, self.roots)
+        self._thread = threading.Thread(target=self._run, name="registry-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def check_now(self) -> RegistryDelta:
+        """Takes a new snapshot and reports the difference, if any; also what each wake-up does."""
+        self.registry.refresh()
+        snapshot = snapshot_uninstall_keys(self.registry, self.roots)
+        delta = diff_snapshots(self._snapshot, snapshot)
+        self._snapshot = snapshot
+        if delta:
+            self.deltas_reported += 1
+            try: self.on_change(delta)
+            except Exception as e: print(f"[RegistryWatcher] on_change failed: {e}")
+        return delta
+
+    def _run(self):
+        notifier = None
+        if isinstance(self.registry, WinRegistry) and os.name == "nt":
+            try: notifier = _ChangeNotifier(self.registry, self.roots)
+            except Exception as e: print(f"[RegistryWatcher] Change notifications unavailable, polling instead: {e}")
+        self.mode = "notify" if notifier else "poll"
+        try:
+            while not self._stop.is_set():
+                if notifier:
+                    if not notifier.wait(self.poll_interval):
+                        continue
+                    # Let the installer finish writing, then swallow the notifications it caused.
+                    if self._stop.wait(self.settle_delay):
+                        break
+                    while notifier.wait(0):
+                        pass
+                elif self._stop.wait(self.poll_interval):
+                    break
+                self.check_now()
+        finally:
+            if notifier:
+                notifier.close()
+            self.mode = "stopped"
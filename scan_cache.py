@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app_paths import app_data_dir
+from scanner import DirManifest
+
+CACHE_VERSION = 1
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def default_cache_path() -> str:
+    return os.path.join(app_data_dir(), "scan_cache.json")
+
+
+class ScanCache:
+    """On-disk cache that lets "Refresh Programs" skip unchanged work.
+
+    Three sections, each validated by the cheapest stamp that changes with it:
+      registry  - uninstall key path -> parsed values, keyed by the key's last-write time
+      trees     - install location -> directory manifest, re-validated per directory mtime
+                  by SizeScanner (a file rewritten in place without touching its
+                  directory is only picked up after invalidate_location)
+      shortcuts - .lnk path -> parsed target, keyed by the shortcut file's (mtime, size)
+
+    Every refresh is bracketed by begin_refresh()/end_refresh(); entries not used
+    during the refresh are evicted at the end, and the least recently used ones
+    are dropped once a section holds more than max_entries.
+    """
+
+    SECTIONS = ("registry", "trees", "shortcuts")
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._data: Dict[str, Dict[str, dict]] = {section: {} for section in self.SECTIONS}
+
+    def load(self):
+        with self._lock:
+            self._loaded = True
+            if not self.path or not os.path.exists(self.path):
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+                if raw.get("version") != CACHE_VERSION:
+                    print(f"[ScanCache] Ignoring cache with version {raw.get('version')} at {self.path}")
+                    return
+                self.generation = raw.get("generation", 0)
+                for section in self.SECTIONS:
+                    self._data[section] = raw.get(section, {})
+            except (OSError, ValueError) as e:
+                print(f"[ScanCache] Could not load cache {self.path}: {e}")
+
+    def save(self):
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            payload = {"version": CACHE_VERSION, "generation": self.generation}
+            payload.update(self._data)
+            tmp_path = self.path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                print(f"[ScanCache] Could not save cache {self.path}: {e}")
+
+    def release(self):
+        """Drops the in-memory copy; the next begin_refresh() reads the file again."""
+        with self._lock:
+            if self._dirty and self.path:
+                return
+            self._data = {section: {} for section in self.SECTIONS}
+            self._loaded = False
+
+    def begin_refresh(self):
+        if not self._loaded:
+            self.load()
+        with self._lock:
+            self.generation += 1
+            self.hits = self.misses = 0
+
+    def end_refresh(self):
+        with self._lock:
+            for section in self.SECTIONS:
+                entries = self._data[section]
+                stale = [k for k, e in entries.items() if e.get("gen") != self.generation]
+                for k in stale: del entries[k]
+                self._dirty = self._dirty or bool(stale)
+                self._trim(entries)
+
+    def _trim(self, entries: Dict[str, dict]):
+        overflow = len(entries) - self.max_entries
+        if overflow <= 0:
+            return
+        oldest = sorted(entries, key=lambda k: entries[k].get("used", 0))[:overflow]
+        for k in oldest: del entries[k]
+        self._dirty = True
+
+    def _get(self, section: str, key: str, stamp: Any) -> Optional[dict]:
+        with self._lock:
+            entry = self._data[section].get(key)
+            if entry is None or entry.get("stamp") != stamp:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry["gen"] = self.generation
+            entry["used"] = time.time()
+            return entry
+
+    def _put(self, section: str, key: str, stamp: Any, **fields):
+        with self._lock:
+            entries = self._data[section]
+            entries[key] = dict(fields, stamp=stamp, gen=self.generation, used=time.time())
+            self._dirty = True
+
+    # Registry: stamp is the key's last-write time (QueryInfoKey()[2]). An empty
+    # dict records a key that was skipped (no name, system component, update).
+    def get_registry_values(self, key_path: str, last_write: int) -> Optional[Dict[str, Any]]:
+        entry = self._get("registry", key_path.lower(), last_write)
+        return entry["values"] if entry else None
+
+    def put_registry_values(self, key_path: str, last_write: int, values: Dict[str, Any]):
+        self._put("registry", key_path.lower(), last_write, values=values)
+
+    # Trees: no stamp of their own, SizeScanner checks every directory mtime in the manifest.
+    def get_manifest(self, install_location: str) -> Optional[DirManifest]:
+        entry = self._get("trees", os.path.normcase(install_location), None)
+        return entry["dirs"] if entry else None
+
+    def put_manifest(self, install_location: str, dirs: DirManifest):
+        self._put("trees", os.path.normcase(install_location), None, dirs=dirs)
+
+    # Shortcuts: stamp is [mtime_ns, size] of the .lnk file; target may be None for unparseable links.
+    def get_shortcut_target(self, shortcut_path: str, mtime_ns: int, size: int) -> Optional[dict]:
+        return self._get("shortcuts", os.path.normcase(shortcut_path), [mtime_ns, size])
+
+    def put_shortcut_target(self, shortcut_path: str, mtime_ns: int, size: int, target: Optional[str]):
+        self._put("shortcuts", os.path.normcase(shortcut_path), [mtime_ns, size], target=target)
+
+    def invalidate_registry_key(self, key_path: str):
+        self._invalidate("registry", key_path.lower())
+
+    def invalidate_location(self, install_location: str):
+        self._invalidate("trees", os.path.normcase(install_location))
+
+    def invalidate_shortcut(self, shortcut_path: str):
+        self._invalidate("shortcuts", os.path.normcase(shortcut_path))
+
+    def _invalidate(self, section: str, key: str):
+        with self._lock:
+            if self._data[section].pop(key, None) is not None:
+                self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._data = {section: {} for section in self.SECTIONS}
+            self._dirty = True
+
+    def entry_count(self, section: str) -> int:
+        with self._lock:
+            return len(self._data[section])
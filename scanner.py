@@ -0,0 +1,295 @@
+import heapq
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from cancellation import CancelToken, OperationCancelled
+
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+# Directories modified this close to the scan may still be changing within the
+# same timestamp tick, so their mtime is not trusted for the next incremental scan.
+RACY_MTIME_WINDOW_NS = 2 * 1_000_000_000
+UNTRUSTED_MTIME = -1
+# Rank of roots that no prioritize() group names; groups rank 0, 1, 2... in the order given.
+BACKGROUND_PRIORITY = 1000
+
+# Directory manifest: relative dir ("" for the root) -> [mtime_ns, {file name: size}, [subdir names]]
+DirManifest = Dict[str, list]
+
+
+class LocalFileSystem:
+    def scandir(self, path: str):
+        return os.scandir(path)
+
+    def stat(self, path: str) -> os.stat_result:
+        return os.stat(path)
+
+
+LOCAL_FS = LocalFileSystem()
+
+
+class ScanResult:
+    def __init__(self, root: str):
+        self.root = root
+        self.total_size = 0
+        self.file_count = 0
+        self.dir_count = 0
+        self.reused_dir_count = 0
+        self.error_count = 0
+        self.files: List[str] = []
+        self.dirs: Optional[DirManifest] = None
+        self.cancelled = False
+
+
+class ScanQueue:
+    """Order in which SizeScanner starts its roots; may be changed while the scan runs.
+
+    Roots start in the order they were added unless the last prioritize()
+    call named them: its first group goes first, then the second, and so on,
+    each group in the order given. cancel() (or cancelling token) drops the
+    roots not started yet and stops the running ones at their next
+    directory; pausing token holds them there. Thread-safe.
+    """
+
+    def __init__(self, token: Optional[CancelToken] = None):
+        self.token = token or CancelToken()
+        self.started = 0
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[Tuple[int, int], int, Any]] = []
+        self._ranks: Dict[Any, Tuple[int, int]] = {}
+        self._order: Dict[Any, int] = {}
+        self._wanted: Dict[Any, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ranks)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def add(self, keys: Iterable[Any]):
+        with self._lock:
+            if self.cancelled: return
+            for key in keys:
+                if key in self._ranks: continue
+                order = self._order.setdefault(key, len(self._order))
+                self._push(key, self._wanted.get(key, (BACKGROUND_PRIORITY, order)))
+
+    def prioritize(self, *groups: Iterable[Any]):
+        """Ranks the keys of each group ahead of the later groups and of all other keys; replaces the previous call."""
+        wanted: Dict[Any, Tuple[int, int]] = {}
+        for level, keys in enumerate(groups):
+            for position, key in enumerate(keys):
+                wanted.setdefault(key, (level, position))
+        with self._lock:
+            previous, self._wanted = self._wanted, wanted
+            for key in previous.keys() | wanted.keys():
+                rank = self._ranks.get(key)
+                if rank is None: continue
+                new_rank = wanted.get(key) or (BACKGROUND_PRIORITY, self._order[key])
+                if new_rank != rank: self._push(key, new_rank)
+            # Re-ranked keys leave stale heap entries behind; drop them once they dominate.
+            if len(self._heap) > 2 * len(self._ranks) + 64:
+                self._heap = [(rank, self._order[key], key) for key, rank in self._ranks.items()]
+                heapq.heapify(self._heap)
+
+    def pop(self) -> Optional[Any]:
+        with self._lock:
+            while self._heap and not self.cancelled:
+                rank, _, key = heapq.heappop(self._heap)
+                if self._ranks.get(key) == rank:
+                    del self._ranks[key]
+                    self.started += 1
+                    return key
+            return None
+
+    def cancel(self):
+        self.token.cancel()
+        with self._lock:
+            self._heap.clear()
+            self._ranks.clear()
+
+    def _push(self, key: Any, rank: Tuple[int, int]):
+        self._ranks[key] = rank
+        heapq.heappush(self._heap, (rank, self._order[key], key))
+
+
+class SizeScanner:
+    """Sums file sizes under many install roots at once.
+
+    Each root starts as one task on a bounded thread pool; a task that finds
+    more subdirectories than it can handle while workers sit idle hands part
+    of its backlog off, so a single huge root is split across threads too.
+    Sizes come from DirEntry.stat(), which Windows fills from the directory
+    listing itself; on Linux it is one stat per file instead of exists+getsize.
+
+    With record_dirs=True every result carries a directory manifest. Passing
+    that manifest back as `previous` makes the next scan incremental: a
+    directory whose mtime is unchanged is not listed again, only stat'ed.
+
+    Roots are started in the order of scan_queue (see ScanQueue), a few at a
+    time, so re-prioritizing it while the scan runs takes effect for every
+    root not yet started. Once its token is cancelled the scan returns as
+    soon as the running tasks notice; unfinished results are marked
+    cancelled and never reach on_root_done.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_SCAN_WORKERS, collect_files: bool = True,
+                 record_dirs: bool = False, fs: Any = LOCAL_FS):
+        self.max_workers = max(1, max_workers)
+        self.collect_files = collect_files
+        self.record_dirs = record_dirs
+        self.fs = fs
+
+    def scan(self, roots: Dict[Any, str],
+             on_root_done: Optional[Callable[[Any, ScanResult, int, int], None]] = None,
+             previous: Optional[Dict[Any, DirManifest]] = None,
+             scan_queue: Optional[ScanQueue] = None) -> Dict[Any, ScanResult]:
+        results = {key: ScanResult(path) for key, path in roots.items()}
+        total_roots = len(results)
+        if total_roots == 0:
+            return results
+        previous = previous or {}
+        if self.record_dirs:
+            for result in results.values(): result.dirs = {}
+        racy_after_ns = time.time_ns() - RACY_MTIME_WINDOW_NS
+        scan_queue = scan_queue if scan_queue is not None else ScanQueue()
+        scan_queue.add(results)
+        token = scan_queue.token
+
+        lock = threading.Lock()
+        all_done = threading.Event()
+        pending_tasks = {key: 1 for key in results}
+        completed = [0]
+        active = [0]
+
+        def next_root() -> Optional[Any]:
+            # Keys the caller added for roots not in this scan are dropped.
+            while True:
+                key = scan_queue.pop()
+                if key is None or key in results: return key
+
+        def scan_task(executor: ThreadPoolExecutor, key: Any, start: tuple):
+            prev_dirs = previous.get(key)
+            track_mtime = self.record_dirs or prev_dirs is not None
+            size = 0
+            file_count = 0
+            files: List[str] = []
+            dirs: DirManifest = {}
+            dir_count = 0
+            reused = 0
+            errors = 0
+            stack = [start]
+            try:
+                while stack:
+                    token.check()
+                    dir_path, rel, mtime = stack.pop()
+                    dir_count += 1
+                    if track_mtime and mtime is None:
+                        try: mtime = self.fs.stat(dir_path).st_mtime_ns
+                        except OSError:
+                            errors += 1; continue
+
+                    cached = prev_dirs.get(rel) if prev_dirs else None
+                    if cached is not None and cached[0] == mtime and mtime != UNTRUSTED_MTIME:
+                        reused += 1
+                        own_files, sub_names = cached[1], cached[2]
+                        for name, file_size in own_files.items():
+                            size += file_size
+                            if self.collect_files: files.append(os.path.join(dir_path, name))
+                        file_count += len(own_files)
+                        for name in sub_names:
+                            stack.append((os.path.join(dir_path, name), os.path.join(rel, name) if rel else name, None))
+                        if self.record_dirs: dirs[rel] = cached
+                    else:
+                        own_files = {}
+                        sub_names = []
+                        listed = True
+                        entry_errors = 0
+                        try:
+                            with self.fs.scandir(dir_path) as it:
+                                for entry in it:
+                                    try:
+                                        if entry.is_dir(follow_symlinks=False):
+                                            sub_mtime = entry.stat(follow_symlinks=False).st_mtime_ns if track_mtime else None
+                                            sub_names.append(entry.name)
+                                            stack.append((entry.path, os.path.join(rel, entry.name) if rel else entry.name, sub_mtime))
+                                        elif not entry.is_dir():
+                                            file_size = entry.stat().st_size
+                                            size += file_size
+                                            file_count += 1
+                                            if self.collect_files: files.append(entry.path)
+                                            if self.record_dirs: own_files[entry.name] = file_size
+                                    except OSError:
+                                        entry_errors += 1
+                        except OSError:
+                            errors += 1
+                            listed = False
+                        errors += entry_errors
+                        # A directory that could not be listed is left out, so the next scan lists it again instead
+                        # of reusing an empty entry; one listed with errors is kept but never trusted.
+                        if self.record_dirs and listed:
+                            trusted = mtime < racy_after_ns and not entry_errors
+                            dirs[rel] = [mtime if trusted else UNTRUSTED_MTIME, own_files, sub_names]
+
+                    # Hand half of the local backlog to idle workers so one large root
+                    # does not stay pinned to a single thread.
+                    if len(stack) > 1 and active[0] < self.max_workers:
+                        with lock:
+                            idle = self.max_workers - active[0]
+                            offload = stack[:max(0, min(idle, len(stack) // 2))]
+                            del stack[:len(offload)]
+                            pending_tasks[key] += len(offload)
+                            active[0] += len(offload)
+                        for sub in offload:
+                            executor.submit(scan_task, executor, key, sub)
+            except OperationCancelled:
+                results[key].cancelled = True
+            except Exception as e:
+                errors += 1
+                print(f"[SizeScanner] Unexpected error scanning under {start[0]}: {e}")
+
+            next_key = None
+            with lock:
+                active[0] -= 1
+                result = results[key]
+                result.total_size += size
+                result.file_count += file_count
+                result.dir_count += dir_count
+                result.reused_dir_count += reused
+                result.error_count += errors
+                if files:
+                    result.files.extend(files)
+                if dirs:
+                    result.dirs.update(dirs)
+                pending_tasks[key] -= 1
+                if pending_tasks[key] == 0 and not result.cancelled:
+                    completed[0] += 1
+                    if on_root_done:
+                        try: on_root_done(key, result, completed[0], total_roots)
+                        except Exception as e: print(f"[SizeScanner] on_root_done callback failed for {result.root}: {e}")
+                # Each finished task makes room for the next root, so at most max_workers are queued.
+                next_key = next_root()
+                if next_key is not None:
+                    active[0] += 1
+                elif active[0] == 0:
+                    all_done.set()
+            if next_key is not None:
+                executor.submit(scan_task, executor, next_key, (results[next_key].root, "", None))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="size-scan") as executor:
+            with lock:
+                first_keys = []
+                while len(first_keys) < self.max_workers:
+                    key = next_root()
+                    if key is None: break
+                    first_keys.append(key)
+                active[0] = len(first_keys)
+            if not first_keys:
+                return results
+            for key in first_keys:
+                executor.submit(scan_task, executor, key, (results[key].root, "", None))
+            all_done.wait()
+        return results
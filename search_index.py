@@ -0,0 +1,139 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+from program_core import ProgramInfo
+
+GRAM = 3
+DEFAULT_CACHE_SIZE = 64
+_NO_IDS: FrozenSet[int] = frozenset()
+
+
+def haystack(info: ProgramInfo) -> str:
+    # NUL cannot be typed into the search box, so no query matches across two fields.
+    return "\0".join((info.name.lower(), (info.publisher or "").lower(), (info.version or "").lower()))
+
+
+class SearchIndex:
+    """Trigram index over the lowercased name, publisher and version of every program.
+
+    Gives the same answers as ProgramListModel.matches. A query of three or
+    more characters is checked only against the programs holding its rarest
+    trigram (intersected with the others); shorter queries scan every
+    program. Results of recent queries are kept, so typing one more
+    character only re-checks the matches of the query before it, and
+    backspacing is a cache hit. Safe to use from several threads.
+    """
+
+    def __init__(self, programs: Optional[Dict[str, ProgramInfo]] = None, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.stats = {"queries": 0, "cache_hits": 0, "narrowed": 0, "indexed": 0, "scanned": 0, "checked": 0}
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._names: List[Optional[str]] = []
+        self._haystacks: List[str] = []
+        self._grams: Dict[str, Set[int]] = {}
+        self._free: List[int] = []
+        self._cache: 'OrderedDict[str, FrozenSet[int]]' = OrderedDict()
+        for name, info in (programs or {}).items():
+            self._add(name, info)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def update(self, programs: Dict[str, ProgramInfo], updated_names: Iterable[str], removed_names: Iterable[str]):
+        with self._lock:
+            changed = False
+            for name in removed_names:
+                changed |= self._remove(name)
+            for name in updated_names:
+                info = programs.get(name)
+                if info is None:
+                    changed |= self._remove(name)
+                    continue
+                program_id = self._ids.get(name)
+                if program_id is not None and self._haystacks[program_id] == haystack(info):
+                    continue
+                self._remove(name)
+                self._add(name, info)
+                changed = True
+            if changed:
+                self._cache.clear()
+
+    def sync(self, programs: Dict[str, ProgramInfo]):
+        """Brings the whole index in line with programs."""
+        with self._lock:
+            stale = [name for name in self._ids if name not in programs]
+        self.update(programs, list(programs), stale)
+
+    def search(self, query: str) -> Set[str]:
+        """Names of the programs whose name, publisher or version contains query."""
+        query = query.lower()
+        with self._lock:
+            self.stats["queries"] += 1
+            ids = self._cache.get(query)
+            if ids is not None:
+                self._cache.move_to_end(query)
+                self.stats["cache_hits"] += 1
+            else:
+                ids = self._match(query)
+                self._cache[query] = ids
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            names = self._names
+            return {names[program_id] for program_id in ids}
+
+    def _match(self, query: str) -> FrozenSet[int]:
+        candidates = None
+        # Anything matching query also matched each cached query it contains.
+        for previous, previous_ids in self._cache.items():
+            if previous in query and (candidates is None or len(previous_ids) < len(candidates)):
+                candidates = previous_ids
+        narrowed = candidates is not None
+        if len(query) >= GRAM:
+            gram_sets = sorted((self._grams.get(query[i:i + GRAM], _NO_IDS) for i in range(len(query) - GRAM + 1)), key=len)
+            if candidates is None or len(gram_sets[0]) < len(candidates):
+                candidates = gram_sets[0].intersection(*gram_sets[1:4]) if gram_sets[0] else _NO_IDS
+                narrowed = False
+                self.stats["indexed"] += 1
+        if candidates is None:
+            candidates = self._ids.values()
+            self.stats["scanned"] += 1
+        elif narrowed:
+            self.stats["narrowed"] += 1
+        haystacks = self._haystacks
+        self.stats["checked"] += len(candidates)
+        return frozenset(program_id for program_id in candidates if query in haystacks[program_id])
+
+    def _add(self, name: str, info: ProgramInfo):
+        text = haystack(info)
+        if self._free:
+            program_id = self._free.pop()
+            self._names[program_id], self._haystacks[program_id] = name, text
+        else:
+            program_id = len(self._names)
+            self._names.append(name)
+            self._haystacks.append(text)
+        self._ids[name] = program_id
+        grams = self._grams
+        for gram in {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}:
+            ids = grams.get(gram)
+            if ids is None:
+                grams[gram] = {program_id}
+            else:
+                ids.add(program_id)
+
+    def _remove(self, name: str) -> bool:
+        program_id = self._ids.pop(name, None)
+        if program_id is None:
+            return False
+        text = self._haystacks[program_id]
+        for gram in {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}:
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(program_id)
+                if not ids:
+                    del self._grams[gram]
+        self._names[program_id], self._haystacks[program_id] = None, ""
+        self._free.append(program_id)
+        return True
@@ -0,0 +1,228 @@
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+try:
+    import pylnk3
+except ImportError:
+    pylnk3 = None
+
+DEFAULT_PARSE_WORKERS = max(1, min(8, (os.cpu_count() or 1)))
+
+
+def split_windows_path(path: str) -> List[str]:
+    """Case-folded components of a Windows path, independent of the host OS."""
+    return [part for part in path.replace('/', '\\').casefold().split('\\') if part]
+
+
+class InstallLocationIndex:
+    """Path-component trie over install locations.
+
+    longest_match() walks the target path once, so matching a shortcut costs
+    O(path depth) no matter how many programs are indexed, and a program
+    installed inside another program's folder wins over its parent.
+    Components are compared whole: C:\\Foo does not claim C:\\Foobar\\app.exe.
+    """
+
+    _KEY = object()
+
+    def __init__(self):
+        self._root: Dict[Any, Any] = {}
+        self._size = 0
+
+    def add(self, install_location: str, key: Any) -> bool:
+        parts = split_windows_path(install_location)
+        if not parts:
+            return False
+        node = self._root
+        for part in parts:
+            node = node.setdefault(part, {})
+        if self._KEY in node:
+            return False
+        node[self._KEY] = key
+        self._size += 1
+        return True
+
+    def longest_match(self, path: str) -> Optional[Any]:
+        node = self._root
+        best = None
+        for part in split_windows_path(path):
+            node = node.get(part)
+            if node is None:
+                break
+            best = node.get(self._KEY, best)
+        return best
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def from_programs(cls, programs: Dict[str, Any]) -> 'InstallLocationIndex':
+        index = cls()
+        for name, info in programs.items():
+            if info.install_location:
+                index.add(info.install_location, name)
+        return index
+
+
+class ShortcutWalkStats:
+    def __init__(self):
+        self.roots_requested = 0
+        self.roots_walked = 0
+        self.dirs_visited = 0
+        self.entries_visited = 0
+        self.duplicates_skipped = 0
+        self.errors = 0
+
+    def __repr__(self) -> str:
+        return (f"roots {self.roots_walked}/{self.roots_requested}, {self.dirs_visited} dirs, "
+                f"{self.entries_visited} entries, {self.duplicates_skipped} duplicates, {self.errors} errors")
+
+
+def collapse_roots(roots: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+    """Drops duplicate roots and roots already covered by an ancestor's walk.
+
+    Each root is (path, max_depth) with max_depth -1 for unlimited. A nested
+    root is only dropped when the ancestor's depth limit reaches all of it.
+    """
+    merged: Dict[Tuple[str, ...], Tuple[str, int]] = {}
+    for path, max_depth in roots:
+        if not path:
+            continue
+        path = os.path.normpath(path)
+        key = tuple(split_windows_path(path))
+        if not key:
+            continue
+        if key in merged:
+            kept_depth = merged[key][1]
+            if kept_depth == -1 or (max_depth != -1 and max_depth <= kept_depth):
+                continue
+        merged[key] = (path, max_depth)
+
+    kept: Dict[Tuple[str, ...], int] = {}
+    collapsed = []
+    for key in sorted(merged, key=len):
+        path, max_depth = merged[key]
+        covered = False
+        for i in range(1, len(key)):
+            ancestor_depth = kept.get(key[:i])
+            if ancestor_depth is None:
+                continue
+            below = len(key) - i
+            if ancestor_depth == -1 or (max_depth != -1 and below + max_depth <= ancestor_depth):
+                covered = True
+                break
+        if not covered:
+            kept[key] = max_depth
+            collapsed.append((path, max_depth))
+    return collapsed
+
+
+def find_shortcut_files(roots: List[Tuple[str, int]], extension: str = ".lnk") -> Tuple[List[str], ShortcutWalkStats]:
+    """Single scandir pass over the collapsed roots, deduplicating case-insensitively."""
+    stats = ShortcutWalkStats()
+    stats.roots_requested = len(roots)
+    seen = set()
+    found: List[str] = []
+    for root, max_depth in collapse_roots(roots):
+        if not os.path.isdir(root):
+            continue
+        stats.roots_walked += 1
+        stack = [(root, 0)]
+        while stack:
+            dir_path, depth = stack.pop()
+            try:
+                it = os.scandir(dir_path)
+            except OSError as e:
+                stats.errors += 1
+                print(f"[find_shortcut_files] Error walking {dir_path}: {e}")
+                continue
+            stats.dirs_visited += 1
+            descend = max_depth == -1 or depth < max_depth
+            with it:
+                for entry in it:
+                    stats.entries_visited += 1
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if descend and not entry.is_symlink():
+                            stack.append((entry.path, depth + 1))
+                    elif entry.name.lower().endswith(extension):
+                        key = entry.path.casefold()
+                        if key in seen:
+                            stats.duplicates_skipped += 1
+                        else:
+                            seen.add(key)
+                            found.append(entry.path)
+    return found, stats
+
+
+def read_lnk_targets(shortcut_paths: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """Parses a batch of .lnk files; runs inside pool worker processes."""
+    results = []
+    for shortcut_path in shortcut_paths:
+        target_path = None
+        if pylnk3 is not None:
+            try: target_path = pylnk3.Lnk(shortcut_path).path
+            except Exception: pass
+        results.append((shortcut_path, target_path))
+    return results
+
+
+class ShortcutParsePool:
+    """Parses .lnk files in batches on a process pool.
+
+    pylnk3 is pure Python, so threads would serialise on the GIL. Results are
+    yielded batch by batch as workers finish, letting the caller match and
+    report progress while the rest is still being parsed. Small inputs, or a
+    pool that cannot be started, fall back to parsing in the calling process.
+    The reader must be a picklable module-level function.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_PARSE_WORKERS, batch_size: int = 64, min_parallel: int = 256,
+                 reader: Callable[[List[str]], List[Tuple[str, Optional[str]]]] = read_lnk_targets):
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+        self.min_parallel = min_parallel
+        self.reader = reader
+
+    def parse(self, shortcut_paths: List[str]) -> Iterator[Tuple[str, Optional[str]]]:
+        batches = [shortcut_paths[i:i + self.batch_size] for i in range(0, len(shortcut_paths), self.batch_size)]
+        if self.max_workers == 1 or len(shortcut_paths) < self.min_parallel:
+            for batch in batches:
+                yield from self.reader(batch)
+            return
+
+        done = set()
+        executor = None
+        futures = {}
+        pool_failed = False
+        try:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            futures = {executor.submit(self.reader, batch): i for i, batch in enumerate(batches)}
+            for future in as_completed(futures):
+                results = future.result()
+                done.add(futures[future])
+                yield from results
+        except (OSError, BrokenProcessPool, NotImplementedError) as e:
+            print(f"[ShortcutParsePool] Process pool unavailable, parsing in-process: {e}")
+            pool_failed = True
+        finally:
+            # Also runs when the caller stops early (a cancelled load closes the generator):
+            # batches not started yet are dropped instead of waited for.
+            if executor is not None: _shutdown_now(executor, futures)
+        if pool_failed:
+            for i, batch in enumerate(batches):
+                if i not in done:
+                    yield from self.reader(batch)
+
+
+def _shutdown_now(executor: ProcessPoolExecutor, futures: Iterable[Future]):
+    try:
+        executor.shutdown(wait=True, cancel_futures=True)
+    except TypeError:
+        # cancel_futures is new in Python 3.9.
+        for future in futures: future.cancel()
+        executor.shutdown(wait=True)
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+from cli import build_parser, resolve_target
+from program_core import ProgramInfo, ProgramManager
+from registry import HKLM, MemoryRegistry, UNINSTALL_ROOTS
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MACHINE = f"{HKLM}\\{UNINSTALL_ROOTS[0][1]}"
+
+
+def run_cli(tmp_path, *argv):
+    env = dict(os.environ, LOCALAPPDATA=str(tmp_path / "appdata"), APPDATA=str(tmp_path / "appdata"),
+               USERPROFILE=str(tmp_path / "profile"), PYTHONIOENCODING="utf-8")
+    return subprocess.run([sys.executable, os.path.join(REPO, "cli.py"), *argv], cwd=REPO, env=env,
+                          capture_output=True, text=True, encoding="utf-8", timeout=120)
+
+
+def test_scan_json_stdout_holds_only_the_program_list(tmp_path):
+    location = tmp_path / "Editor"
+    location.mkdir()
+    (location / "editor.exe").write_bytes(b"x" * 100)
+    registry_file = tmp_path / "registry.json"
+    MemoryRegistry.from_keys([
+        (f"{MACHINE}\\Editor", {"DisplayName": "Editor", "DisplayVersion": "2.1", "InstallLocation": str(location)}),
+    ]).save(str(registry_file))
+
+    result = run_cli(tmp_path, "--quiet", "--no-cache", "--registry-file", str(registry_file), "scan", "--json")
+
+    assert result.returncode == 0, result.stderr
+    programs = json.loads(result.stdout)
+    assert [program["name"] for program in programs] == ["Editor"]
+    assert programs[0]["install_location"] == str(location)
+
+
+def test_programs_moved_to_the_same_drive_get_their_own_folders():
+    first = ProgramInfo("First", install_location="C:\\Games\\First")
+    second = ProgramInfo("Second", install_location="C:\\Program Files\\Second\\")
+    other_drive = ProgramInfo("Third", install_location="E:\\Apps\\Third")
+
+    moves = [(info, resolve_target(info, "d:", batch=True)) for info in (first, second, other_drive)]
+
+    assert [target for _, target in moves] == ["D:\\Games\\First", "D:\\Program Files\\Second", "D:\\Third"]
+    assert ProgramManager(registry=MemoryRegistry()).batch_conflict_error(moves) == ""
+
+
+def test_verify_flag_is_offered_for_move_and_revert():
+    parser = build_parser()
+    assert parser.parse_args(["move", "Editor", "--target", "D:", "--verify"]).verify
+    assert parser.parse_args(["revert", "--verify"]).verify
+    assert not parser.parse_args(["move", "Editor", "--target", "D:"]).verify
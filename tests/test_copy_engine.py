@@ -0,0 +1,23 @@
+import os
+
+import copy_engine
+from copy_engine import CopyEngine
+
+
+def test_unexpected_errors_are_counted_as_failed_files(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    src.mkdir()
+    for name in ("good.txt", "bad.txt"):
+        (src / name).write_bytes(name.encode())
+    real_copyfile = copy_engine.shutil.copyfile
+
+    def copyfile(src_file, dst_file):
+        if os.path.basename(src_file) == "bad.txt":
+            raise ValueError("unexpected")
+        return real_copyfile(src_file, dst_file)
+
+    monkeypatch.setattr(copy_engine.shutil, "copyfile", copyfile)
+    stats = CopyEngine(max_workers=2).copy_tree(str(src), str(tmp_path / "dst"))
+
+    assert stats.files_copied == 1 and stats.files_failed == 1
+    assert stats.errors == [(str(src / "bad.txt"), "unexpected")]
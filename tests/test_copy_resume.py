@@ -0,0 +1,78 @@
+import filecmp
+import os
+import subprocess
+import sys
+
+from copy_engine import CopyEngine, CopyJournal
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Copies src to dst with a journal, slowly enough to be killed halfway; prints a line per finished file.
+SLOW_COPY = """
+import sys, time
+from copy_engine import CopyEngine, CopyJournal
+src, dst, journal_path = sys.argv[1:4]
+journal = CopyJournal(journal_path, src, dst, flush_every=8)
+journal.load()
+def on_file_done(path, error, stats):
+    print(stats.files_done, flush=True)
+    time.sleep(0.01)
+CopyEngine(max_workers=2).copy_tree(src, dst, on_file_done, journal=journal)
+"""
+
+
+def build_tree(root, count):
+    for i in range(count):
+        folder = os.path.join(root, f"dir{i % 7}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"file{i}.bin"), "wb") as f:
+            f.write(os.urandom(512 + i))
+
+
+def assert_same_tree(src, dst):
+    for dir_path, _, files in os.walk(src):
+        rel = os.path.relpath(dir_path, src)
+        for name in files:
+            assert filecmp.cmp(os.path.join(dir_path, name), os.path.join(dst, rel, name), shallow=False), name
+
+
+def test_copy_killed_halfway_resumes_from_its_journal(tmp_path):
+    src, dst, journal_path = str(tmp_path / "src"), str(tmp_path / "dst"), str(tmp_path / "copy.jsonl")
+    build_tree(src, 400)
+    proc = subprocess.Popen([sys.executable, "-c", SLOW_COPY, src, dst, journal_path], cwd=REPO_ROOT,
+                            stdout=subprocess.PIPE, text=True)
+    for line in proc.stdout:
+        if int(line) >= 100:
+            break
+    proc.kill()
+    proc.wait()
+
+    journal = CopyJournal(journal_path, src, dst)
+    journaled = journal.load()
+    assert 0 < journaled < 400
+    stats = CopyEngine().copy_tree(src, dst, journal=journal)
+
+    assert not stats.errors
+    assert stats.files_resumed >= journaled - 2 * 2  # files in flight when killed may have been rewritten
+    assert stats.files_resumed + stats.files_skipped + stats.files_copied == 400
+    assert_same_tree(src, dst)
+
+
+def test_journaled_files_missing_or_changed_at_the_destination_are_copied_again(tmp_path):
+    src, dst, journal_path = str(tmp_path / "src"), str(tmp_path / "dst"), str(tmp_path / "copy.jsonl")
+    build_tree(src, 50)
+    journal = CopyJournal(journal_path, src, dst)
+    CopyEngine().copy_tree(src, dst, journal=journal)
+
+    removed = os.path.join(dst, "dir0", "file0.bin")
+    os.remove(removed)
+    truncated = os.path.join(dst, "dir1", "file1.bin")
+    with open(truncated, "r+b") as f:
+        f.truncate(10)
+
+    journal = CopyJournal(journal_path, src, dst)
+    assert journal.load() == 50
+    stats = CopyEngine().copy_tree(src, dst, journal=journal)
+
+    assert stats.files_copied == 2 and stats.files_resumed == 48
+    assert_same_tree(src, dst)
@@ -0,0 +1,79 @@
+import os
+import stat
+from types import SimpleNamespace
+
+import pytest
+
+import delete_engine
+from delete_engine import DeleteEngine, DeleteFailure
+
+
+def write(path, data=b"x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+def test_links_are_removed_without_deleting_their_targets(tmp_path):
+    outside = tmp_path / "outside"
+    write(str(outside / "keep" / "data.bin"))
+    write(str(tmp_path / "outside_file.txt"))
+    program = tmp_path / "program"
+    write(str(program / "bin" / "app.exe"))
+    try:
+        os.symlink(str(outside), str(program / "bin" / "linked_dir"), target_is_directory=True)
+        os.symlink(str(tmp_path / "outside_file.txt"), str(program / "linked_file.txt"))
+    except OSError as e:
+        pytest.skip(f"cannot create symlinks here: {e}")
+
+    report = DeleteEngine(max_workers=2).delete_tree(str(program))
+
+    assert report.ok, report.failures
+    assert not program.exists()
+    assert (outside / "keep" / "data.bin").is_file()
+    assert (tmp_path / "outside_file.txt").is_file()
+
+
+class FakeEntry:
+    def __init__(self, attributes, symlink=False):
+        self.attributes = attributes
+        self.symlink = symlink
+
+    def is_symlink(self):
+        return self.symlink
+
+    def stat(self, follow_symlinks=True):
+        return SimpleNamespace(st_file_attributes=self.attributes)
+
+
+def test_junctions_count_as_links_without_is_junction(monkeypatch):
+    # Python < 3.12 on Windows: a junction is no symlink and has no is_junction(), only the reparse attribute.
+    monkeypatch.setattr(delete_engine.os, "name", "nt")
+    junction = FakeEntry(stat.FILE_ATTRIBUTE_REPARSE_POINT | stat.FILE_ATTRIBUTE_DIRECTORY)
+    plain_dir = FakeEntry(stat.FILE_ATTRIBUTE_DIRECTORY)
+
+    assert delete_engine._is_link(junction)
+    assert delete_engine._link_is_dir(junction)
+    assert not delete_engine._is_link(plain_dir)
+    assert delete_engine._is_link(FakeEntry(0, symlink=True))
+
+
+def test_directory_that_cannot_be_listed_is_reported_once(tmp_path, monkeypatch):
+    program = tmp_path / "program"
+    write(str(program / "app.exe"))
+    write(str(program / "locked" / "data.bin"))
+    locked = str(program / "locked")
+    scandir = os.scandir
+
+    def failing_scandir(path):
+        if path == locked:
+            raise PermissionError(13, "Access is denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(delete_engine.os, "scandir", failing_scandir)
+    report = DeleteEngine(max_workers=2).delete_tree(str(program))
+
+    assert [(failure.path, failure.kind) for failure in report.failures if failure.path == locked] == [(locked, DeleteFailure.PERMISSION)]
+    assert (program / "locked" / "data.bin").is_file()
+    assert not (program / "app.exe").exists()
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from io_throttle import ADAPTIVE_BASELINE_PROBES, IoThrottle
+
+MB = 1024 * 1024
+
+
+def acquire_in_background(throttle, nbytes):
+    done = threading.Event()
+    worker = threading.Thread(target=lambda: (throttle.acquire(nbytes), done.set()), daemon=True)
+    worker.start()
+    time.sleep(0.2)
+    assert not done.is_set()
+    return done
+
+
+def test_removing_the_cap_wakes_sleepers():
+    throttle = IoThrottle(mb_per_second=1)
+    done = acquire_in_background(throttle, 20 * MB)
+
+    throttle.configure(0)
+
+    assert done.wait(0.5)
+
+
+def test_raising_the_cap_applies_to_sleepers_and_drops_the_old_backlog():
+    throttle = IoThrottle(mb_per_second=1)
+    done = acquire_in_background(throttle, 20 * MB)
+
+    throttle.configure(1000)
+
+    assert done.wait(0.5)
+    start = time.perf_counter()
+    throttle.acquire(10 * MB)
+    assert time.perf_counter() - start < 0.2
+
+
+def test_baseline_follows_recent_probes():
+    latencies = iter([0.001] + [0.05] * (ADAPTIVE_BASELINE_PROBES + 5))
+    throttle = IoThrottle(adaptive=True, probe=lambda: next(latencies))
+
+    throttle._adapt(time.perf_counter())
+    assert throttle.baseline_latency == 0.001
+    for _ in range(ADAPTIVE_BASELINE_PROBES):
+        throttle._next_probe = 0.0
+        throttle._adapt(time.perf_counter())
+
+    assert throttle.baseline_latency == 0.05
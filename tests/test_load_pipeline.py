@@ -0,0 +1,71 @@
+import queue
+import threading
+import time
+
+import scanner
+from load_pipeline import DeltaBatcher
+from program_core import ProgramManager
+from registry import HKLM, MemoryRegistry, UNINSTALL_ROOTS
+
+
+def test_single_add_is_posted_within_the_interval():
+    progress = queue.Queue()
+    batcher = DeltaBatcher(progress, "sizes", interval=0.05)
+
+    batcher.add("Editor")
+
+    assert progress.get(timeout=1) == ("load_delta", "sizes", ["Editor"])
+    assert batcher.posted == 1
+
+
+def test_flush_posts_pending_names_once():
+    progress = queue.Queue()
+    batcher = DeltaBatcher(progress, "sizes", interval=0.05)
+    batcher.add("Editor")
+    batcher.add("Game")
+
+    batcher.flush()
+    time.sleep(0.15)
+
+    assert progress.get_nowait() == ("load_delta", "sizes", ["Editor", "Game"])
+    assert progress.empty() and batcher.posted == 1
+
+
+def test_prioritized_row_is_posted_while_a_later_root_is_still_scanning(tmp_path, monkeypatch):
+    machine = f"{HKLM}\\{UNINSTALL_ROOTS[0][1]}"
+    slow, quick = tmp_path / "Slow", tmp_path / "Quick"
+    for location in (slow, quick):
+        location.mkdir()
+        (location / "app.exe").write_bytes(b"x" * 10)
+    registry = MemoryRegistry.from_keys([
+        (f"{machine}\\Slow", {"DisplayName": "Slow", "InstallLocation": str(slow)}),
+        (f"{machine}\\Quick", {"DisplayName": "Quick", "InstallLocation": str(quick)}),
+    ])
+    release_slow = threading.Event()
+    local_scandir = scanner.LOCAL_FS.scandir
+
+    def scandir(path):
+        if path == str(slow): release_slow.wait(10)
+        return local_scandir(path)
+
+    monkeypatch.setattr(scanner.LOCAL_FS, "scandir", scandir)
+    manager = ProgramManager(registry=registry)
+    progress = queue.Queue()
+    load = threading.Thread(target=manager.get_installed_programs_threaded, args=(progress,), daemon=True)
+    load.start()
+    try:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            message = progress.get(timeout=5)
+            if message[0] == "programs_loaded":
+                manager.prioritize_sizes(["Quick"], [], [])
+            elif message[0] == "load_delta" and message[1] == "sizes":
+                assert message[2] == ["Quick"]
+                assert not release_slow.is_set()
+                break
+        else:
+            raise AssertionError("no sizes delta while Slow was still scanning")
+    finally:
+        release_slow.set()
+        load.join(10)
+    assert manager.programs["Quick"].size_bytes == 10
@@ -0,0 +1,69 @@
+import os
+import queue
+import threading
+import time
+
+from move_queue import MoveQueue, find_conflicts, paths_overlap
+from program_core import ProgramInfo, ProgramManager
+
+
+def test_paths_overlap():
+    assert paths_overlap("/data/App", "/data/App/")
+    assert paths_overlap("/data/App", "/data/App/Plugin")
+    assert paths_overlap("/data/App/Plugin", "/data/App")
+    assert not paths_overlap("/data/App", "/data/Application")
+    assert not paths_overlap("/data/App", "/data/Other")
+
+
+def test_find_conflicts(tmp_path):
+    base = str(tmp_path)
+    src = lambda name: os.path.join(base, "src", name)
+    dst = lambda name: os.path.join(base, "dst", name)
+    moves = [
+        (src("A"), dst("A")),
+        (src("B"), dst("A")),               # same target as 0
+        (src("C"), dst(os.path.join("A", "C"))),  # target nested in 0's target
+        (src("D"), dst("D")),
+        (src(os.path.join("D", "E")), dst("E")),  # source nested in 3's source
+        (src("F"), src(os.path.join("G", "F"))),  # target inside 6's source
+        (src("G"), dst("G")),
+        (src("H"), dst("H")),
+    ]
+    conflicts = set(find_conflicts(moves))
+    assert conflicts == {(0, 1), (0, 2), (1, 2), (3, 4), (5, 6)}
+
+
+def test_batch_conflict_error_names_both_programs(tmp_path):
+    first = ProgramInfo("First", install_location=str(tmp_path / "src" / "First"))
+    second = ProgramInfo("Second", install_location=str(tmp_path / "src" / "Second"))
+    target = str(tmp_path / "dst" / "Shared")
+    manager = ProgramManager()
+
+    message = manager.batch_conflict_error([(first, target), (second, target)])
+
+    assert "First" in message and "Second" in message
+    assert manager.batch_conflict_error([(first, target), (second, str(tmp_path / "dst" / "Second"))]) == ""
+
+
+def test_overlapping_jobs_never_run_at_the_same_time(tmp_path):
+    lock = threading.Lock()
+    running = []
+    overlaps_seen = []
+
+    def move(info, target, delete_source, sink):
+        with lock:
+            overlaps_seen.extend(other for other in running if other == target)
+            running.append(target)
+        time.sleep(0.05)
+        with lock:
+            running.remove(target)
+        sink.put(("finished_move", info.name, 0, False, None, {}))
+
+    batch = MoveQueue(move, max_parallel=4, per_disk=4)
+    shared = str(tmp_path / "dst" / "Shared")
+    for name in ("A", "B", "C"):
+        batch.add(ProgramInfo(name, install_location=str(tmp_path / "src" / name)), shared)
+    jobs = batch.run(queue.Queue())
+
+    assert not overlaps_seen
+    assert all(job.state == job.DONE for job in jobs)
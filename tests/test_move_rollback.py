@@ -0,0 +1,55 @@
+import os
+import queue
+
+from cancellation import CancelToken
+from program_core import ProgramManager, first_missing_dir
+
+
+def write(path, data=b"x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def cancelled_token(keep_partial=False):
+    token = CancelToken()
+    token.cancel(keep_partial=keep_partial)
+    return token
+
+
+def test_rollback_keeps_a_shared_parent_another_job_copied_into(tmp_path):
+    shared = tmp_path / "Program Files"
+    target_a, target_b = shared / "A", shared / "B"
+    # Both jobs started before the shared parent existed.
+    created_b = first_missing_dir(str(target_b))
+    assert created_b == str(shared)
+    write(str(target_a / "a.exe"))
+    write(str(target_b / "partial.bin"))
+
+    message = ProgramManager()._roll_back_copy(str(target_b), created_b, cancelled_token(), queue.Queue())
+
+    assert str(target_b) in message
+    assert not target_b.exists()
+    assert (target_a / "a.exe").is_file()
+
+
+def test_rollback_removes_parents_it_created_once_empty(tmp_path):
+    target = tmp_path / "new" / "deeper" / "App"
+    created = first_missing_dir(str(target))
+    write(str(target / "partial.bin"))
+
+    ProgramManager()._roll_back_copy(str(target), created, cancelled_token(), queue.Queue())
+
+    assert not (tmp_path / "new").exists()
+    assert tmp_path.exists()
+
+
+def test_rollback_leaves_kept_and_preexisting_targets(tmp_path):
+    target = tmp_path / "App"
+    write(str(target / "partial.bin"))
+    manager = ProgramManager()
+
+    manager._roll_back_copy(str(target), str(target), cancelled_token(keep_partial=True), queue.Queue())
+    manager._roll_back_copy(str(target), None, cancelled_token(), queue.Queue())
+
+    assert (target / "partial.bin").is_file()
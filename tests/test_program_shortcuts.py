@@ -0,0 +1,59 @@
+import os
+import queue
+
+import program_core
+from program_core import ProgramInfo, ProgramManager
+from shortcuts import ShortcutWalkStats
+
+
+class FakeParsePool:
+    targets = {}
+    parsed = []
+
+    def parse(self, shortcut_paths):
+        for path in shortcut_paths:
+            FakeParsePool.parsed.append(path)
+            yield path, FakeParsePool.targets[path]
+
+
+def setup_shortcuts(monkeypatch, tmp_path, targets):
+    paths = {}
+    for name, target in targets.items():
+        path = str(tmp_path / f"{name}.lnk")
+        with open(path, "wb") as f:
+            f.write(b"lnk")
+        paths[path] = target
+    FakeParsePool.targets = paths
+    FakeParsePool.parsed = []
+    monkeypatch.setattr(program_core, "PYLNK_AVAILABLE", True)
+    monkeypatch.setattr(program_core, "ShortcutParsePool", FakeParsePool)
+    monkeypatch.setattr(program_core, "find_shortcut_files", lambda roots: (sorted(paths), ShortcutWalkStats()))
+    return paths
+
+
+def test_subset_match_does_not_hand_a_nested_programs_shortcut_to_its_parent(monkeypatch, tmp_path):
+    setup_shortcuts(monkeypatch, tmp_path, {"app": "C:\\App\\app.exe", "plugin": "C:\\App\\Plugin\\plugin.exe"})
+    manager = ProgramManager()
+    manager.programs = {"App": ProgramInfo("App", install_location="C:\\App"),
+                        "Plugin": ProgramInfo("Plugin", install_location="C:\\App\\Plugin")}
+
+    manager._find_program_shortcuts(queue.Queue(), names=["App"])
+
+    assert [os.path.basename(p) for p in manager.programs["App"].shortcuts] == ["app.lnk"]
+    assert manager.programs["Plugin"].shortcuts == []
+
+
+def test_later_matches_reuse_parsed_targets(monkeypatch, tmp_path):
+    paths = setup_shortcuts(monkeypatch, tmp_path, {"app": "C:\\App\\app.exe", "tool": "C:\\Tool\\tool.exe"})
+    manager = ProgramManager()
+    manager.programs = {"App": ProgramInfo("App", install_location="C:\\App"),
+                        "Tool": ProgramInfo("Tool", install_location="C:\\Tool")}
+
+    manager._find_program_shortcuts(queue.Queue())
+    assert sorted(FakeParsePool.parsed) == sorted(paths)
+    FakeParsePool.parsed = []
+    manager._find_program_shortcuts(queue.Queue(), names=["Tool"])
+
+    assert FakeParsePool.parsed == []
+    assert [os.path.basename(p) for p in manager.programs["Tool"].shortcuts] == ["tool.lnk"]
+    assert [os.path.basename(p) for p in manager.programs["App"].shortcuts] == ["app.lnk"]
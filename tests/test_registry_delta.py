@@ -0,0 +1,75 @@
+import queue
+
+import pytest
+
+from program_core import ProgramManager
+from registry import HKCU, HKLM, MemoryRegistry, RegistryBackend, UNINSTALL_ROOTS
+from registry_watch import RegistryDelta
+
+MACHINE = f"{HKLM}\\{UNINSTALL_ROOTS[0][1]}"
+USER = f"{HKCU}\\{UNINSTALL_ROOTS[2][1]}"
+
+
+def load(registry):
+    manager = ProgramManager(registry=registry)
+    manager._enumerate_uninstall_keys(queue.Queue())
+    return manager
+
+
+def test_changed_install_location_of_a_multi_key_program_is_applied(tmp_path):
+    old, new = tmp_path / "old" / "Game", tmp_path / "new" / "Game"
+    old.mkdir(parents=True)
+    new.mkdir(parents=True)
+    registry = MemoryRegistry.from_keys([
+        (f"{MACHINE}\\Game", {"DisplayName": "Game", "InstallLocation": str(old)}),
+        (f"{USER}\\Game", {"DisplayName": "Game", "DisplayVersion": "1.0"}),
+    ])
+    manager = load(registry)
+    assert manager.programs["Game"].install_location == str(old)
+
+    registry.add_key(f"{MACHINE}\\Game", {"InstallLocation": str(new)})
+    updated, removed = manager.apply_registry_delta(RegistryDelta([], [], [f"{MACHINE}\\Game"]), queue.Queue())
+
+    assert updated == ["Game"] and removed == []
+    assert manager.programs["Game"].install_location == str(new)
+    assert sorted(manager.programs["Game"].registry_keys) == sorted([f"{MACHINE}\\Game", f"{USER}\\Game"])
+
+
+def test_renamed_key_leaves_its_old_program(tmp_path):
+    location = tmp_path / "Tool"
+    location.mkdir()
+    registry = MemoryRegistry.from_keys([
+        (f"{MACHINE}\\Tool", {"DisplayName": "Tool", "InstallLocation": str(location)}),
+        (f"{USER}\\Tool", {"DisplayName": "Tool"}),
+    ])
+    manager = load(registry)
+
+    registry.add_key(f"{MACHINE}\\Tool", {"DisplayName": "Tool Pro"})
+    updated, removed = manager.apply_registry_delta(RegistryDelta([], [], [f"{MACHINE}\\Tool"]), queue.Queue())
+
+    assert updated == ["Tool", "Tool Pro"] and removed == []
+    assert manager.programs["Tool Pro"].install_location == str(location)
+    assert manager.programs["Tool"].registry_keys == [f"{USER}\\Tool"]
+    assert manager.programs["Tool"].install_location == ""
+
+
+def test_program_whose_last_key_is_removed_disappears(tmp_path):
+    registry = MemoryRegistry.from_keys([(f"{MACHINE}\\Gone", {"DisplayName": "Gone"})])
+    manager = load(registry)
+
+    updated, removed = manager.apply_registry_delta(RegistryDelta([], [f"{MACHINE}\\Gone"], []), queue.Queue())
+
+    assert updated == [] and removed == ["Gone"]
+    assert "Gone" not in manager.programs
+
+
+def test_backend_missing_a_method_cannot_be_created():
+    class NoWrites(RegistryBackend):
+        def open_key(self, root, path, write=False): return None
+        def subkey_names(self, handle): return []
+        def query_value(self, handle, name): raise FileNotFoundError(name)
+        def values(self, handle): return {}
+        def last_write_time(self, handle): return 0
+
+    with pytest.raises(TypeError):
+        NoWrites()
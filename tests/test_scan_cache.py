@@ -0,0 +1,144 @@
+import json
+import os
+import queue
+import time
+
+import scan_cache as scan_cache_module
+from program_core import ProgramManager
+from registry import HKLM, MemoryRegistry, UNINSTALL_ROOTS
+from scan_cache import CACHE_VERSION, ScanCache
+from scanner import LocalFileSystem, SizeScanner
+
+MACHINE = f"{HKLM}\\{UNINSTALL_ROOTS[0][1]}"
+
+
+class CountingFileSystem(LocalFileSystem):
+    def __init__(self):
+        self.listed = []
+
+    def scandir(self, path):
+        self.listed.append(path)
+        return super().scandir(path)
+
+
+def build_tree(root):
+    os.makedirs(os.path.join(root, "data"))
+    with open(os.path.join(root, "app.exe"), "wb") as f: f.write(b"a" * 100)
+    with open(os.path.join(root, "data", "pack.bin"), "wb") as f: f.write(b"b" * 1000)
+    # Back-date everything past the racy window so the manifest trusts the mtimes.
+    old = time.time() - 60
+    for path in (os.path.join(root, "data", "pack.bin"), os.path.join(root, "data"), os.path.join(root, "app.exe"), root):
+        os.utime(path, (old, old))
+
+
+def test_entries_not_used_during_a_refresh_are_evicted():
+    cache = ScanCache()
+    cache.begin_refresh()
+    cache.put_registry_values(f"{MACHINE}\\Kept", 1, {"DisplayName": "Kept"})
+    cache.put_registry_values(f"{MACHINE}\\Gone", 1, {"DisplayName": "Gone"})
+    cache.end_refresh()
+
+    cache.begin_refresh()
+    assert cache.get_registry_values(f"{MACHINE}\\Kept", 1) == {"DisplayName": "Kept"}
+    cache.end_refresh()
+
+    assert cache.entry_count("registry") == 1
+    assert cache.get_registry_values(f"{MACHINE}\\Gone", 1) is None
+
+
+def test_least_recently_used_entries_go_first_when_a_section_is_full(monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr(scan_cache_module.time, "time", lambda: next(clock))
+    cache = ScanCache(max_entries=2)
+    cache.begin_refresh()
+    for name in ("a", "b", "c"):
+        cache.put_shortcut_target(f"{name}.lnk", 1, 10, f"{name}.exe")
+    assert cache.get_shortcut_target("a.lnk", 1, 10)["target"] == "a.exe"
+    cache.end_refresh()
+
+    assert cache.entry_count("shortcuts") == 2
+    assert cache.get_shortcut_target("b.lnk", 1, 10) is None
+    assert cache.get_shortcut_target("a.lnk", 1, 10) is not None
+    assert cache.get_shortcut_target("c.lnk", 1, 10) is not None
+
+
+def test_registry_entry_is_reread_once_the_key_is_written(tmp_path):
+    location = tmp_path / "Editor"
+    location.mkdir()
+    registry = MemoryRegistry.from_keys([
+        (f"{MACHINE}\\Editor", {"DisplayName": "Editor", "DisplayVersion": "1.0", "InstallLocation": str(location)}),
+    ])
+    cache = ScanCache(str(tmp_path / "cache.json"))
+    ProgramManager(scan_cache=cache, registry=registry).get_installed_programs_threaded(queue.Queue())
+    last_write = registry.last_write_time(registry.open_key(HKLM, f"{UNINSTALL_ROOTS[0][1]}\\Editor"))
+
+    def load():
+        manager = ProgramManager(scan_cache=cache, registry=registry)
+        manager.get_installed_programs_threaded(queue.Queue())
+        return manager.programs["Editor"].version
+
+    # Same last-write time: the cached values are used even though the key says otherwise.
+    registry.add_key(f"{MACHINE}\\Editor", {"DisplayVersion": "1.5"}, last_write=last_write)
+    assert load() == "1.0"
+    registry.add_key(f"{MACHINE}\\Editor", {"DisplayVersion": "2.0"}, last_write=last_write + 1)
+    assert load() == "2.0"
+
+
+def test_trees_and_shortcuts_survive_a_save_and_load(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = ScanCache(path)
+    cache.begin_refresh()
+    cache.put_manifest(str(tmp_path / "App"), {"": [5, {"app.exe": 100}, []]})
+    cache.put_shortcut_target(str(tmp_path / "App.lnk"), 7, 200, str(tmp_path / "App" / "app.exe"))
+    cache.put_shortcut_target(str(tmp_path / "Broken.lnk"), 7, 50, None)
+    cache.end_refresh()
+    cache.save()
+
+    loaded = ScanCache(path)
+    loaded.begin_refresh()
+    assert loaded.get_manifest(str(tmp_path / "App")) == {"": [5, {"app.exe": 100}, []]}
+    assert loaded.get_shortcut_target(str(tmp_path / "App.lnk"), 7, 200)["target"] == str(tmp_path / "App" / "app.exe")
+    assert loaded.get_shortcut_target(str(tmp_path / "Broken.lnk"), 7, 50)["target"] is None
+    # A shortcut rewritten since (other mtime or size) is parsed again.
+    assert loaded.get_shortcut_target(str(tmp_path / "App.lnk"), 8, 200) is None
+    assert loaded.get_shortcut_target(str(tmp_path / "App.lnk"), 7, 201) is None
+
+
+def test_corrupt_or_old_cache_file_starts_empty(tmp_path):
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text('{"version": 1, "registry": {', encoding="utf-8")
+    old = tmp_path / "old.json"
+    old.write_text(json.dumps({"version": CACHE_VERSION - 1, "generation": 3,
+                               "registry": {"key": {"stamp": 1, "gen": 3, "used": 0, "values": {}}}}), encoding="utf-8")
+
+    for path in (corrupt, old):
+        cache = ScanCache(str(path))
+        cache.begin_refresh()
+        assert cache.generation == 1
+        assert all(cache.entry_count(section) == 0 for section in ScanCache.SECTIONS)
+        cache.put_registry_values("key", 2, {"DisplayName": "Editor"})
+        cache.end_refresh()
+        cache.save()
+        assert json.loads(path.read_text(encoding="utf-8"))["version"] == CACHE_VERSION
+
+
+def test_cached_manifest_lets_the_scanner_skip_unchanged_directories(tmp_path):
+    root = str(tmp_path / "App")
+    build_tree(root)
+    path = str(tmp_path / "cache.json")
+    cache = ScanCache(path)
+    cache.begin_refresh()
+    cache.put_manifest(root, SizeScanner(record_dirs=True).scan({"App": root})["App"].dirs)
+    cache.end_refresh()
+    cache.save()
+
+    loaded = ScanCache(path)
+    loaded.begin_refresh()
+    fs = CountingFileSystem()
+    result = SizeScanner(record_dirs=True, fs=fs).scan({"App": root}, previous={"App": loaded.get_manifest(root)})["App"]
+    assert result.total_size == 1100 and fs.listed == []
+
+    with open(os.path.join(root, "data", "new.bin"), "wb") as f: f.write(b"c" * 10)
+    fs = CountingFileSystem()
+    result = SizeScanner(record_dirs=True, fs=fs).scan({"App": root}, previous={"App": loaded.get_manifest(root)})["App"]
+    assert result.total_size == 1110 and fs.listed == [os.path.join(root, "data")]
@@ -0,0 +1,48 @@
+import os
+import time
+
+from scanner import LocalFileSystem, SizeScanner
+
+
+class FlakyFileSystem(LocalFileSystem):
+    def __init__(self, failing):
+        self.failing = set(failing)
+
+    def scandir(self, path):
+        if path in self.failing:
+            raise PermissionError(13, "Access is denied", path)
+        return super().scandir(path)
+
+
+def build(root):
+    os.makedirs(os.path.join(root, "data"))
+    with open(os.path.join(root, "app.exe"), "wb") as f: f.write(b"a" * 100)
+    with open(os.path.join(root, "data", "pack.bin"), "wb") as f: f.write(b"b" * 1000)
+    # Back-date everything past the racy window so the manifest trusts the mtimes.
+    old = time.time() - 60
+    for path in (os.path.join(root, "data", "pack.bin"), os.path.join(root, "data"), os.path.join(root, "app.exe"), root):
+        os.utime(path, (old, old))
+
+
+def test_directory_that_failed_to_list_is_listed_again_next_scan(tmp_path):
+    root = str(tmp_path / "App")
+    build(root)
+
+    first = SizeScanner(record_dirs=True, fs=FlakyFileSystem([os.path.join(root, "data")])).scan({"App": root})["App"]
+    assert first.total_size == 100 and first.error_count == 1
+    assert "data" not in first.dirs
+
+    second = SizeScanner(record_dirs=True).scan({"App": root}, previous={"App": first.dirs})["App"]
+    assert second.total_size == 1100 and second.error_count == 0
+    assert second.reused_dir_count == 1
+
+
+def test_unchanged_tree_is_reused_from_the_manifest(tmp_path):
+    root = str(tmp_path / "App")
+    build(root)
+
+    first = SizeScanner(record_dirs=True).scan({"App": root})["App"]
+    second = SizeScanner(record_dirs=True).scan({"App": root}, previous={"App": first.dirs})["App"]
+
+    assert first.total_size == second.total_size == 1100
+    assert second.reused_dir_count == 2
@@ -0,0 +1,67 @@
+import os
+import time
+
+import pytest
+
+from shortcuts import ShortcutParsePool
+
+PARENT_PID_VARIABLE = "SHORTCUT_PARSE_TEST_PARENT"
+
+
+def slow_reader(batch):
+    time.sleep(0.2)
+    return [(path, None) for path in batch]
+
+
+def crashing_reader(batch):
+    # Kills any pool worker it runs in, which breaks the pool; in the test process it parses normally.
+    if os.environ.get(PARENT_PID_VARIABLE) != str(os.getpid()):
+        os._exit(1)
+    return [(path, path + ".exe") for path in batch]
+
+
+def test_closing_the_parse_drops_batches_not_started():
+    paths = [f"shortcut{i}.lnk" for i in range(40)]
+    pool = ShortcutParsePool(max_workers=2, batch_size=1, min_parallel=1, reader=slow_reader)
+
+    parsed = pool.parse(paths)
+    first = next(parsed)
+    start = time.perf_counter()
+    parsed.close()
+
+    assert first[0] in paths
+    # Waiting for the 38 queued batches would take about 4 s on two workers.
+    assert time.perf_counter() - start < 1.5
+
+
+def test_parse_yields_every_shortcut():
+    paths = [f"shortcut{i}.lnk" for i in range(10)]
+    pool = ShortcutParsePool(max_workers=2, batch_size=3, min_parallel=1, reader=slow_reader)
+
+    assert sorted(path for path, _ in pool.parse(paths)) == sorted(paths)
+
+
+def test_pool_and_in_process_parsing_read_the_same_targets(tmp_path):
+    pylnk3 = pytest.importorskip("pylnk3")
+    expected = {}
+    for i in range(12):
+        path = str(tmp_path / f"App{i:02d}.lnk")
+        expected[path] = f"C:\\Program Files\\Vendor{i % 3}\\App{i:02d}\\app.exe"
+        pylnk3.for_file(expected[path], path)
+    broken = tmp_path / "Broken.lnk"
+    broken.write_bytes(b"not a shortcut")
+    expected[str(broken)] = None
+    paths = sorted(expected)
+
+    in_process = dict(ShortcutParsePool(max_workers=1).parse(paths))
+    pooled = dict(ShortcutParsePool(max_workers=2, batch_size=3, min_parallel=1).parse(paths))
+
+    assert in_process == pooled == expected
+
+
+def test_broken_pool_falls_back_to_parsing_in_process(monkeypatch):
+    monkeypatch.setenv(PARENT_PID_VARIABLE, str(os.getpid()))
+    paths = [f"shortcut{i}.lnk" for i in range(6)]
+    pool = ShortcutParsePool(max_workers=2, batch_size=2, min_parallel=1, reader=crashing_reader)
+
+    assert sorted(pool.parse(paths)) == sorted((path, path + ".exe") for path in paths)
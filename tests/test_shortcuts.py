@@ -0,0 +1,72 @@
+import os
+
+from shortcuts import InstallLocationIndex, collapse_roots, find_shortcut_files
+
+
+def test_nested_install_wins_over_its_parent():
+    index = InstallLocationIndex()
+    index.add("C:\\App", "App")
+    index.add("C:\\App\\Plugin", "Plugin")
+
+    assert index.longest_match("C:\\App\\Plugin\\plugin.exe") == "Plugin"
+    assert index.longest_match("C:\\App\\bin\\app.exe") == "App"
+    assert index.longest_match("C:\\App") == "App"
+    assert index.longest_match("C:\\Other\\x.exe") is None
+
+
+def test_matching_ignores_case_separators_and_partial_components():
+    index = InstallLocationIndex()
+    index.add("C:\\Program Files\\Foo\\", "Foo")
+
+    assert index.longest_match("c:\\PROGRAM FILES\\foo\\foo.exe") == "Foo"
+    assert index.longest_match("C:/Program Files/Foo/foo.exe") == "Foo"
+    assert index.longest_match("C:\\Program Files\\Foobar\\foobar.exe") is None
+    assert index.longest_match("C:\\Program Files\\Fo\\fo.exe") is None
+
+
+def test_first_program_keeps_a_shared_location():
+    index = InstallLocationIndex()
+    assert index.add("C:\\Shared", "First")
+    assert not index.add("c:\\shared\\", "Second")
+    assert not index.add("", "Empty")
+
+    assert index.longest_match("C:\\Shared\\tool.exe") == "First"
+    assert len(index) == 1
+
+
+def test_duplicate_roots_differing_in_case_or_trailing_separator_collapse():
+    roots = [("C:\\Users\\me\\Desktop", -1), ("c:\\users\\ME\\Desktop\\", -1), ("", -1)]
+
+    assert collapse_roots(roots) == [("C:\\Users\\me\\Desktop", -1)]
+
+
+def test_start_menu_under_userprofile_is_covered_by_the_appdata_one():
+    appdata_start_menu = "C:\\Users\\me\\AppData\\Roaming\\Microsoft\\Windows\\Start Menu"
+    userprofile_programs = "C:\\Users\\me\\AppData\\Roaming\\Microsoft\\Windows\\Start Menu\\Programs"
+    roots = [("C:\\Users\\me\\Desktop", -1), (userprofile_programs, -1), (appdata_start_menu, -1)]
+
+    assert collapse_roots(roots) == [("C:\\Users\\me\\Desktop", -1), (appdata_start_menu, -1)]
+
+
+def test_nested_root_is_kept_when_the_ancestor_depth_limit_does_not_reach_it():
+    roots = [("C:\\Program Files", 3), ("C:\\Program Files\\Vendor\\App", 1), ("C:\\Program Files\\Vendor\\Deep", 2)]
+
+    assert collapse_roots(roots) == [("C:\\Program Files", 3), ("C:\\Program Files\\Vendor\\Deep", 2)]
+
+
+def test_duplicate_root_keeps_the_deeper_limit():
+    assert collapse_roots([("C:\\Program Files", 2), ("C:\\Program Files", 3)]) == [("C:\\Program Files", 3)]
+    assert collapse_roots([("C:\\Program Files", 2), ("C:\\Program Files", -1)]) == [("C:\\Program Files", -1)]
+
+
+def test_walk_of_nested_roots_finds_each_shortcut_once(tmp_path):
+    start_menu = tmp_path / "Start Menu"
+    (start_menu / "Programs" / "Vendor").mkdir(parents=True)
+    for path in (start_menu / "a.lnk", start_menu / "Programs" / "b.lnk", start_menu / "Programs" / "Vendor" / "c.LNK"):
+        path.write_bytes(b"lnk")
+    (start_menu / "Programs" / "readme.txt").write_bytes(b"")
+
+    found, stats = find_shortcut_files([(str(start_menu / "Programs"), -1), (str(start_menu), -1), (str(start_menu), -1)])
+
+    assert sorted(os.path.basename(p) for p in found) == ["a.lnk", "b.lnk", "c.LNK"]
+    assert stats.roots_requested == 3 and stats.roots_walked == 1